@@ -0,0 +1,259 @@
+"""
+Fit the thermal conductivity model without the Streamlit UI.
+
+Usage:
+    python batch.py sample1.json sample2.json --preset fast --output result.json
+    python batch.py a1.json a2.json b1.json b2.json --jobs 4 --output results.json
+    python batch.py --store experiments.db --import-only *.json
+    python batch.py --store experiments.db --from-store <experiment id 1> <experiment id 2>
+    python batch.py sample1.json sample2.json --preset exhaustive --checkpoint-dir checkpoints
+
+Experiments are fitted in pairs (sample 1, sample 2). Their measurements are cleaned as in the app
+(internal/cleaning.py); a table that cannot be fitted stops the command with an error. With several
+pairs, ``--jobs`` fits them in parallel processes. The experiment files use the JSON format of internal/experiment.py (write_interface).
+With ``--store`` the experiments and fit results are saved to the experiment store; ``--from-store``
+reads the experiments from the store by id instead of from files. With ``--checkpoint-dir`` the
+fits write checkpoints every few generations; Ctrl+C / SIGTERM stops them after the current
+generation, and running the same command again resumes where they stopped. ``--bin-hours`` /
+``--tolerance`` (aggregation), ``--reject-outliers``, ``--jobs`` and ``--checkpoint-dir`` are
+alternative fit modes and cannot be combined.
+"""
+import argparse
+import json
+import signal
+import sys
+from dataclasses import asdict
+from typing import List, Optional
+
+from internal.aggregation import fit_aggregated, series_from_frame
+from internal.backends import SOLVER_BACKENDS
+from internal.calculator import (DEFAULT_SOLVER_PRESET, SOLVER_PRESETS, FitCancelledError, FitResults, ModelParams,
+                                 OptimizeParam, fit_results, get_solver_config, minimize_solver, table_fit_results)
+from internal.checkpoint import DEFAULT_CHECKPOINT_EVERY, CancellationToken, checkpointed_minimize_solver
+from internal.cleaning import (MeasurementValidationError, clean_experiment, experiment_with_measurements,
+                               measurement_frame, measurement_frame_from_dict, validate_measurements)
+from internal.converter import experiment_converter
+from internal.experiment import experiment_from_dict, read_interface
+from internal.kernel import pack_series
+from internal.manifest import FitManifest, write_manifest
+from internal.parallel import fit_series_jobs
+from internal.report import ReportSample, export_report
+from internal.robust import robust_minimize_solver
+from internal.store import ExperimentStore
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Fit λgas, E and k₀ to pairs of exposure experiments.")
+    parser.add_argument("experiments", nargs="+",
+                        help="JSON files (or store ids with --from-store), two per fit (sample 1, sample 2)")
+    parser.add_argument("--preset", choices=list(SOLVER_PRESETS), default=DEFAULT_SOLVER_PRESET,
+                        help="solver preset (default: %(default)s)")
+    parser.add_argument("--backend", choices=list(SOLVER_BACKENDS), default=None,
+                        help="solver backend (default: differential evolution)")
+    parser.add_argument("--seed", type=int, default=None, help="override the solver seed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes evaluating the population of a single fit")
+    parser.add_argument("--jobs", type=int, default=1, help="fit several pairs in parallel processes")
+    parser.add_argument("--reject-outliers", action="store_true",
+                        help="exclude measurements with large residuals and refit")
+    parser.add_argument("--bin-hours", type=float, default=None,
+                        help="average the measurements in bins of this many hours before fitting")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="keep only the measurements needed to reproduce each series within this "
+                             "deviation [W/(m･K)] before fitting")
+    parser.add_argument("--checkpoint-dir",
+                        help="checkpoint the fits in this directory and resume interrupted ones")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                        help="generations between two checkpoints (default: %(default)s)")
+    parser.add_argument("--output", help="write the fitted parameters to this JSON file")
+    parser.add_argument("--manifest", help="write the fit manifest(s) to this JSON file")
+    parser.add_argument("--report", metavar="PREFIX",
+                        help="write PREFIX.pdf, PREFIX.html and PREFIX.zip (CSVs) for all fitted samples")
+    parser.add_argument("--store", help="experiment store (SQLite file) to read from and save results to")
+    parser.add_argument("--from-store", action="store_true", help="the experiments are ids in --store")
+    parser.add_argument("--import-only", action="store_true",
+                        help="import the JSON files into --store and exit without fitting")
+    return parser
+
+
+def alternative_dicts(manifest: FitManifest) -> Optional[List[dict]]:
+    if manifest.alternatives is None:
+        return None
+    digit_conf = manifest.solver_config['digit_conf']
+    return [{**ModelParams.from_solver(alternative['solver_params'], digit_conf)._asdict(), 'score': alternative['score']}
+            for alternative in manifest.alternatives]
+
+
+def result_dict(preset: str, optimized_params: OptimizeParam, results: FitResults) -> dict:
+    return {
+        'preset': preset,
+        'lamda_gas': optimized_params.lamda_gas.actual_value,
+        'e_dash': optimized_params.e_dash.actual_value,
+        'k_0': optimized_params.k_0.actual_value,
+        'score': optimized_params.manifest.score,
+        'rejected_points': optimized_params.manifest.rejected_points,
+        'alternatives': alternative_dicts(optimized_params.manifest),
+        'samples': results.to_dicts(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.from_store or args.import_only) and not args.store:
+        parser.error("--from-store and --import-only require --store")
+    store = ExperimentStore(args.store) if args.store else None
+
+    if args.import_only:
+        for experiment_id in store.import_json_files(args.experiments):
+            print(experiment_id)
+        return 0
+    if len(args.experiments) % 2:
+        parser.error("experiments must be given in pairs")
+
+    overrides = {'disp': False}
+    if args.seed is not None:
+        overrides['seed'] = args.seed
+    if args.workers is not None:
+        overrides['workers'] = args.workers
+    if args.backend is not None:
+        overrides['backend'] = args.backend
+    solver_config = get_solver_config(args.preset, **overrides)
+
+    aggregate = args.bin_hours is not None or args.tolerance is not None
+    modes = [name for name, selected in (("--bin-hours/--tolerance", aggregate),
+                                         ("--reject-outliers", args.reject_outliers),
+                                         ("--jobs", args.jobs > 1),
+                                         ("--checkpoint-dir", args.checkpoint_dir is not None)) if selected]
+    if len(modes) > 1:
+        parser.error(f"{' and '.join(modes)} cannot be combined")
+
+    json_data, experiments, frames = [], None, []
+    if aggregate and not args.from_store:
+        # 集約するときは MeasurementData を作らずに JSON の表から直接系列を作る
+        for source in args.experiments:
+            with open(source, 'r') as f:
+                json_data.append(json.load(f))
+            try:
+                frame, _ = validate_measurements(measurement_frame_from_dict(json_data[-1]), label=source)
+            except MeasurementValidationError as e:
+                parser.error(str(e))
+            frames.append(frame)
+        temperatures = [data.get('temperature', 0.0) for data in json_data]
+    else:
+        load = store.get_experiment if args.from_store else read_interface
+        experiments = []
+        for source in args.experiments:
+            # 入力はフォームと同じクリーニングを通してからフィットする
+            try:
+                experiment, _ = clean_experiment(load(source), label=source)
+            except MeasurementValidationError as e:
+                parser.error(str(e))
+            experiments.append(experiment)
+        if aggregate:
+            frames = [measurement_frame(experiment) for experiment in experiments]
+        temperatures = [experiment.temperature for experiment in experiments]
+    temperature_pairs = list(zip(temperatures[::2], temperatures[1::2]))
+    pairs = list(zip(experiments[::2], experiments[1::2])) if experiments is not None else []
+    tables = [] if aggregate else [(experiment_converter(experiment_1), experiment_converter(experiment_2))
+                                   for experiment_1, experiment_2 in pairs]
+
+    aggregated = []
+    if aggregate:
+        bin_sec = args.bin_hours * 3600 if args.bin_hours is not None else None
+        series = [(*series_from_frame(frame), temperature) for frame, temperature in zip(frames, temperatures)]
+        series_pairs = list(zip(series[::2], series[1::2]))
+        aggregated = [fit_aggregated(pair_series, solver_config, tolerance=args.tolerance, bin_sec=bin_sec)
+                      for pair_series in series_pairs]
+        results = [aggregated_fit.optimized_params for aggregated_fit in aggregated]
+        pair_results = [fit_results(optimized_params.model_params, pack_series(pair_series),
+                                    normalizer_sec=float(pair_series[0][0][-1]))
+                        for pair_series, optimized_params in zip(series_pairs, results)]
+    elif args.reject_outliers:
+        results = [
+            robust_minimize_solver(calculate_table_1, calculate_table_2, temperature_1, temperature_2,
+                                   solver_config=solver_config).optimized_params
+            for (temperature_1, temperature_2), (calculate_table_1, calculate_table_2) in zip(temperature_pairs, tables)
+        ]
+    elif args.jobs > 1 and len(tables) > 1:
+        jobs = [
+            [(*calculate_table_1.as_arrays(), temperature_1), (*calculate_table_2.as_arrays(), temperature_2)]
+            for (temperature_1, temperature_2), (calculate_table_1, calculate_table_2) in zip(temperature_pairs, tables)
+        ]
+        results = [
+            OptimizeParam.from_solver(solver_params, solver_config.digit_conf, manifest=manifest)
+            for solver_params, manifest in fit_series_jobs(jobs, solver_config, max_workers=args.jobs)
+        ]
+    elif args.checkpoint_dir:
+        # 割り込み（Ctrl+C / SIGTERM）は世代の区切りで止めて、チェックポイントを残す
+        cancel_token = CancellationToken()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signal_number, lambda *_: cancel_token.cancel())
+        try:
+            results = [
+                checkpointed_minimize_solver(calculate_table_1, calculate_table_2, temperature_1, temperature_2,
+                                             solver_config=solver_config, checkpoint_dir=args.checkpoint_dir,
+                                             checkpoint_every=args.checkpoint_every, stop_check=cancel_token)
+                for (temperature_1, temperature_2), (calculate_table_1, calculate_table_2)
+                in zip(temperature_pairs, tables)
+            ]
+        except FitCancelledError:
+            print(f"Interrupted; run the same command again to resume from {args.checkpoint_dir}", file=sys.stderr)
+            return 130
+    else:
+        results = [
+            minimize_solver(calculate_table_1, calculate_table_2, temperature_1, temperature_2,
+                            solver_config=solver_config)
+            for (temperature_1, temperature_2), (calculate_table_1, calculate_table_2) in zip(temperature_pairs, tables)
+        ]
+    if not aggregate:
+        pair_results = [
+            table_fit_results(pair_tables, pair_temperatures, optimized_params.model_params,
+                              rejected_points=optimized_params.manifest.rejected_points)
+            for pair_tables, pair_temperatures, optimized_params in zip(tables, temperature_pairs, results)
+        ]
+    if experiments is None and (store is not None or args.report):
+        # 保存とレポートにだけ Experiment を作る
+        experiments = [experiment_with_measurements(experiment_from_dict({**data, 'measurements': []}), frame)
+                       for data, frame in zip(json_data, frames)]
+        pairs = list(zip(experiments[::2], experiments[1::2]))
+
+    if store is not None:
+        for (experiment_1, experiment_2), optimized_params in zip(pairs, results):
+            store.save_fit([experiment_1, experiment_2], optimized_params, preset=args.preset)
+
+    output = [result_dict(args.preset, optimized_params, results_of_pair)
+              for optimized_params, results_of_pair in zip(results, pair_results)]
+    for result, aggregated_fit in zip(output, aggregated):
+        result['full_score'] = aggregated_fit.full_score
+        result['aggregation'] = [asdict(report) for report in aggregated_fit.reports]
+    if len(output) == 1:
+        output = output[0]
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        print()
+
+    if args.report:
+        samples = [
+            ReportSample.from_fit(experiment, optimized_params.model_params)
+            for pair, optimized_params in zip(pairs, results)
+            for experiment in pair
+        ]
+        for report_format, report_data in export_report(samples).items():
+            with open(f"{args.report}.{report_format}", 'wb') as f:
+                f.write(report_data)
+
+    if args.manifest:
+        if len(results) == 1:
+            write_manifest(results[0].manifest, args.manifest)
+        else:
+            with open(args.manifest, 'w') as f:
+                json.dump([vars(optimized_params.manifest) for optimized_params in results], f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Benchmarks of the fitting pipeline on synthetic data.
+
+Usage:
+    python benchmark.py presets [--repeats 3]
+    python benchmark.py workers [--points 20000] [--workers 1 2 4 8 16 32 64]
+    python benchmark.py backends [--synthetic 3] [--experiments a1.json a2.json ...] [--store experiments.db]
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from internal.backends import SOLVER_BACKENDS, get_backend
+from internal.calculator import (DEFAULT_SOLVER_PRESET, SOLVER_PRESETS, AreaObjective, get_solver_config,
+                                 minimize_solver)
+from internal.cli import print_table
+from internal.converter import experiment_converter
+from internal.experiment import read_interface
+from internal.kernel import PackedSeries, pack_series
+from internal.parallel import fit_series_jobs
+from internal.store import ExperimentStore
+from internal.synthetic import generate_experiment, true_params
+
+
+def make_dataset(seed: int, n_points: int = 20, noise_std: float = 5e-5, duration_days: int = 365):
+    """Two synthetic experiments at 23 °C and 70 °C sharing the default true parameters."""
+    rng = np.random.default_rng(seed)
+    params = true_params()
+    experiment_1 = generate_experiment(params, temperature=23.0, n_points=n_points, duration_days=duration_days,
+                                       noise_std=noise_std, rng=rng)
+    experiment_2 = generate_experiment(params, temperature=70.0, n_points=n_points, duration_days=duration_days,
+                                       noise_std=noise_std, rng=rng)
+    return params, experiment_1, experiment_2
+
+
+def curve_rmse(calculate_table, truth_table) -> float:
+    """RMSE between the fitted curve and the noise-free truth at the measurement times."""
+    estimated = np.array([row.estimated_conductivity for row in calculate_table.rows])
+    truth = np.array([row.thermal_conductivity for row in truth_table.rows])
+    return float(np.sqrt(np.mean((estimated - truth) ** 2)))
+
+
+def benchmark_presets(presets: List[str], repeats: int = 3) -> List[dict]:
+    """
+    Fit the same synthetic datasets with each preset and collect latency and accuracy.
+
+    Returns:
+        List[dict]: One row per preset with the mean wall time, evaluations, score and curve RMSE.
+    """
+    rows = []
+    for preset in presets:
+        wall_times, evaluations, scores, errors = [], [], [], []
+        for repeat in range(repeats):
+            _, experiment_1, experiment_2 = make_dataset(seed=repeat)
+            _, truth_1, truth_2 = make_dataset(seed=repeat, noise_std=0.0)
+            calculate_table_1 = experiment_converter(experiment_1)
+            calculate_table_2 = experiment_converter(experiment_2)
+            optimized_params = minimize_solver(calculate_table_1, calculate_table_2,
+                                               experiment_1.temperature, experiment_2.temperature,
+                                               solver_config=get_solver_config(preset, disp=False))
+            wall_times.append(optimized_params.manifest.wall_time_sec)
+            evaluations.append(optimized_params.manifest.n_evaluations)
+            scores.append(optimized_params.manifest.score)
+            errors.append(max(curve_rmse(calculate_table_1, experiment_converter(truth_1)),
+                              curve_rmse(calculate_table_2, experiment_converter(truth_2))))
+        rows.append({
+            'preset': preset,
+            'wall_time_sec': float(np.mean(wall_times)),
+            'n_evaluations': float(np.mean(evaluations)),
+            'score': float(np.mean(scores)),
+            'curve_rmse': float(np.mean(errors)),
+        })
+    return rows
+
+
+def benchmark_workers(worker_counts: List[int], n_points: int = 20000, n_jobs: int = 16) -> List[dict]:
+    """
+    Scaling of the shared-memory parallel paths with the number of worker processes.
+
+    ``de``: one fit of two long series, population evaluated by ``workers`` processes.
+    ``jobs``: ``n_jobs`` independent fits spread over ``workers`` processes.
+    Both use a fixed number of generations so every run does the same amount of work.
+    """
+    _, experiment_1, experiment_2 = make_dataset(seed=0, n_points=n_points, duration_days=n_points)
+    calculate_table_1 = experiment_converter(experiment_1)
+    calculate_table_2 = experiment_converter(experiment_2)
+    job = [(*calculate_table_1.as_arrays(), experiment_1.temperature),
+           (*calculate_table_2.as_arrays(), experiment_2.temperature)]
+    rows = []
+    for workers in worker_counts:
+        solver_config = get_solver_config('fast', maxiter=10, tol=0, atol=-1, polish=False, disp=False,
+                                          workers=workers)
+        start_time = time.perf_counter()
+        minimize_solver(calculate_table_1, calculate_table_2, experiment_1.temperature, experiment_2.temperature,
+                        solver_config=solver_config)
+        de_sec = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        fit_series_jobs([job] * n_jobs, solver_config, max_workers=workers)
+        jobs_sec = time.perf_counter() - start_time
+        rows.append({'workers': workers, 'de_sec': de_sec, 'jobs_sec': jobs_sec})
+
+    for row in rows:
+        row['de_speedup'] = rows[0]['de_sec'] / row['de_sec']
+        row['jobs_speedup'] = rows[0]['jobs_sec'] / row['jobs_sec']
+    return rows
+
+
+class TracingObjective:
+    """Wraps an objective and records the best score found after every evaluated candidate."""
+
+    def __init__(self, objective):
+        self.objective = objective
+        self.best_scores: List[np.ndarray] = []
+        self.best = np.inf
+
+    def __call__(self, params):
+        scores = self.objective(params)
+        best_scores = np.minimum.accumulate(np.append(self.best, np.atleast_1d(scores)))[1:]
+        self.best = best_scores[-1]
+        self.best_scores.append(best_scores)
+        return scores
+
+    def evaluations_to_reach(self, target: float) -> Optional[int]:
+        """Number of evaluations after which the best score was at most ``target`` (None if never)."""
+        best_scores = np.concatenate(self.best_scores) if self.best_scores else np.empty(0)
+        reached = np.flatnonzero(best_scores <= target)
+        return int(reached[0]) + 1 if len(reached) else None
+
+
+def pair_dataset(name: str, experiment_1, experiment_2) -> Tuple[str, PackedSeries, float]:
+    """(name, packed series, normalizer) of a pair of experiments, as fitted by minimize_solver."""
+    elapsed_sec_1, thermal_conductivity_1 = experiment_converter(experiment_1).as_arrays()
+    elapsed_sec_2, thermal_conductivity_2 = experiment_converter(experiment_2).as_arrays()
+    packed = pack_series([(elapsed_sec_1, thermal_conductivity_1, experiment_1.temperature),
+                          (elapsed_sec_2, thermal_conductivity_2, experiment_2.temperature)])
+    return name, packed, float(elapsed_sec_1[-1])
+
+
+def benchmark_backends(backends: List[str], datasets: List[Tuple[str, PackedSeries, float]],
+                       preset: str = DEFAULT_SOLVER_PRESET, rel_tol: float = 0.01) -> List[dict]:
+    """
+    Run every backend on the same array objective of every dataset.
+
+    The target score of a dataset is the best score found by any backend, plus ``rel_tol``;
+    ``evals_to_target`` is the number of evaluations a backend needed to get there.
+
+    Returns:
+        List[dict]: One row per dataset and backend.
+    """
+    rows = []
+    for name, packed, normalizer_sec in datasets:
+        dataset_rows = []
+        for backend_name in backends:
+            solver_config = get_solver_config(preset, backend=backend_name, disp=False)
+            objective = TracingObjective(AreaObjective(packed, solver_config.digit_conf, normalizer_sec))
+            bounds = [tuple(bound) for bound in solver_config.bounds]
+            start_time = time.perf_counter()
+            result = get_backend(backend_name)(objective, bounds, solver_config)
+            wall_time_sec = time.perf_counter() - start_time
+            dataset_rows.append(({
+                'dataset': name,
+                'backend': backend_name,
+                'score': result.fun,
+                'n_evaluations': objective.objective.n_evaluations,
+                'evals_to_target': None,
+                'wall_time_sec': wall_time_sec,
+            }, objective))
+        target = min(row['score'] for row, _ in dataset_rows) * (1 + rel_tol)
+        for row, objective in dataset_rows:
+            row['evals_to_target'] = objective.evaluations_to_reach(target)
+            rows.append(row)
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    presets_parser = subparsers.add_parser("presets", help="latency/accuracy of each solver preset")
+    presets_parser.add_argument("--preset", action="append", choices=list(SOLVER_PRESETS),
+                                help="preset to run (repeatable, default: all)")
+    presets_parser.add_argument("--repeats", type=int, default=3)
+
+    workers_parser = subparsers.add_parser("workers", help="shared-memory parallel fits over 1-64 workers")
+    workers_parser.add_argument("--points", type=int, default=20000, help="measurements per series")
+    workers_parser.add_argument("--jobs", type=int, default=16, help="independent fits in the jobs benchmark")
+    workers_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+
+    backends_parser = subparsers.add_parser("backends", help="evaluations and wall time of each solver backend")
+    backends_parser.add_argument("--backend", action="append", choices=list(SOLVER_BACKENDS),
+                                 help="backend to run (repeatable, default: all)")
+    backends_parser.add_argument("--preset", choices=list(SOLVER_PRESETS), default=DEFAULT_SOLVER_PRESET)
+    backends_parser.add_argument("--synthetic", type=int, default=3, help="number of synthetic datasets")
+    backends_parser.add_argument("--experiments", nargs="+", default=[],
+                                 help="archived experiment JSON files, two per dataset")
+    backends_parser.add_argument("--store", help="also use the experiment pairs of the latest fits in this store")
+    backends_parser.add_argument("--store-fits", type=int, default=5, help="number of fits taken from --store")
+    backends_parser.add_argument("--rel-tol", type=float, default=0.01,
+                                 help="target = best score of all backends × (1 + rel-tol)")
+
+    args = parser.parse_args(argv)
+    if args.command == "presets":
+        print_table(benchmark_presets(args.preset or list(SOLVER_PRESETS), repeats=args.repeats))
+    elif args.command == "workers":
+        print_table(benchmark_workers(args.workers, n_points=args.points, n_jobs=args.jobs))
+    elif args.command == "backends":
+        if len(args.experiments) % 2:
+            parser.error("experiments must be given in pairs")
+        datasets = [pair_dataset(f"synthetic-{seed}", *make_dataset(seed)[1:]) for seed in range(args.synthetic)]
+        datasets += [
+            pair_dataset(args.experiments[i], read_interface(args.experiments[i]), read_interface(args.experiments[i + 1]))
+            for i in range(0, len(args.experiments), 2)
+        ]
+        if args.store:
+            store = ExperimentStore(args.store)
+            for record in store.query_fits(limit=args.store_fits):
+                if len(record.experiment_ids) == 2:
+                    datasets.append(pair_dataset(f"fit-{record.id}",
+                                                 *(store.get_experiment(i) for i in record.experiment_ids)))
+        print_table(benchmark_backends(args.backend or list(SOLVER_BACKENDS), datasets,
+                                       preset=args.preset, rel_tol=args.rel_tol))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from internal.calculator import AreaObjective, OptimizeParam, SolverConfig, resolve_seed, solve_packed
+from internal.cleaning import CONDUCTIVITY_COLUMN, DATE_COLUMN
+from internal.kernel import pack_series
+
+Series = Tuple[np.ndarray, np.ndarray, float]
+
+
+@dataclass
+class AggregationReport:
+    """
+    Error introduced by reducing one measurement series.
+
+    ``max_abs_deviation`` is the largest difference between the original measurements and the
+    reduced series (linearly interpolated) at the original times [W/(m･K)]; ``area_deviation`` is
+    the trapezoid area of that difference [W/(m･K)･s]. Both are measured, not bounds: only
+    simplification alone guarantees ``max_abs_deviation <= tolerance`` (the vertical distance of
+    every measurement), binning averages points away. Neither bounds the change of the fit
+    objective, whose trapezoids run over different points; compare AggregatedFit.full_score.
+    """
+    n_input: int
+    n_output: int
+    max_abs_deviation: float
+    area_deviation: float
+
+
+def reduction_report(elapsed_sec: np.ndarray, thermal_conductivity: np.ndarray,
+                     reduced_elapsed_sec: np.ndarray, reduced_thermal_conductivity: np.ndarray
+                     ) -> AggregationReport:
+    """Compare a reduced series with the original one (see AggregationReport)."""
+    deviation = np.abs(thermal_conductivity - np.interp(elapsed_sec, reduced_elapsed_sec,
+                                                        reduced_thermal_conductivity))
+    return AggregationReport(
+        n_input=len(elapsed_sec),
+        n_output=len(reduced_elapsed_sec),
+        max_abs_deviation=float(deviation.max()) if len(deviation) else 0.0,
+        area_deviation=float(np.sum((deviation[1:] + deviation[:-1]) / 2 * np.diff(elapsed_sec))),
+    )
+
+
+def simplify_series(elapsed_sec: np.ndarray, thermal_conductivity: np.ndarray,
+                    tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the measurements needed to reproduce the series within ``tolerance`` by linear interpolation.
+
+    Ramer-Douglas-Peucker on the vertical distance, split level by level: in every pass all segments
+    whose worst measurement deviates by more than ``tolerance`` are split at that measurement at once,
+    so the number of passes grows with the depth of the splits, not with the number of points. The
+    first and last measurements are always kept. Choose ``tolerance`` above the measurement noise,
+    otherwise the noise itself is kept (bin_series averages it out instead).
+
+    Returns:
+        tuple: (elapsed_sec, thermal_conductivity) of the kept measurements.
+    """
+    elapsed_sec = np.asarray(elapsed_sec, dtype=np.float64)
+    thermal_conductivity = np.asarray(thermal_conductivity, dtype=np.float64)
+    n = len(elapsed_sec)
+    if n <= 2:
+        return elapsed_sec, thermal_conductivity
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    index = np.arange(n)
+    while True:
+        kept = np.flatnonzero(keep)
+        segment = np.minimum(np.searchsorted(kept, index, side='right') - 1, len(kept) - 2)
+        left, right = kept[segment], kept[segment + 1]
+        span = elapsed_sec[right] - elapsed_sec[left]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(span > 0, (elapsed_sec - elapsed_sec[left]) / span, 0.0)
+        deviation = np.abs(thermal_conductivity - (thermal_conductivity[left]
+                                                   + weight * (thermal_conductivity[right]
+                                                               - thermal_conductivity[left])))
+        deviation[keep] = 0.0
+        segment_max = np.maximum.reduceat(deviation, kept[:-1])
+        split = (deviation > tolerance) & (deviation == segment_max[segment])
+        if not split.any():
+            break
+        # one split point (the first worst) per segment
+        _, first = np.unique(segment[split], return_index=True)
+        keep[np.flatnonzero(split)[first]] = True
+    return elapsed_sec[keep], thermal_conductivity[keep]
+
+
+def bin_series(elapsed_sec: np.ndarray, thermal_conductivity: np.ndarray,
+               bin_sec: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Average the measurements in time bins of ``bin_sec``.
+
+    Each bin is replaced by its mean time and mean value. The first measurement is kept as it is,
+    since the model is anchored at it (λ0).
+
+    Returns:
+        tuple: (elapsed_sec, thermal_conductivity) with one value per non-empty bin.
+    """
+    elapsed_sec = np.asarray(elapsed_sec, dtype=np.float64)
+    thermal_conductivity = np.asarray(thermal_conductivity, dtype=np.float64)
+    if len(elapsed_sec) <= 1:
+        return elapsed_sec, thermal_conductivity
+    bins = np.floor((elapsed_sec[1:] - elapsed_sec[0]) / bin_sec).astype(np.int64)
+    _, bins = np.unique(bins, return_inverse=True)
+    counts = np.bincount(bins)
+    reduced_elapsed = np.bincount(bins, weights=elapsed_sec[1:]) / counts
+    reduced_values = np.bincount(bins, weights=thermal_conductivity[1:]) / counts
+    return (np.concatenate([elapsed_sec[:1], reduced_elapsed]),
+            np.concatenate([thermal_conductivity[:1], reduced_values]))
+
+
+def reduce_series(elapsed_sec: np.ndarray, thermal_conductivity: np.ndarray,
+                  tolerance: Optional[float] = None, bin_sec: Optional[float] = None
+                  ) -> Tuple[np.ndarray, np.ndarray, AggregationReport]:
+    """
+    Bin (if ``bin_sec`` is given) and then simplify (if ``tolerance`` is given) a series.
+
+    Returns:
+        tuple: (elapsed_sec, thermal_conductivity, AggregationReport against the original series)
+    """
+    reduced_elapsed, reduced_values = np.asarray(elapsed_sec, dtype=np.float64), np.asarray(
+        thermal_conductivity, dtype=np.float64)
+    if bin_sec is not None:
+        reduced_elapsed, reduced_values = bin_series(reduced_elapsed, reduced_values, bin_sec)
+    if tolerance is not None:
+        reduced_elapsed, reduced_values = simplify_series(reduced_elapsed, reduced_values, tolerance)
+    report = reduction_report(np.asarray(elapsed_sec, dtype=np.float64),
+                              np.asarray(thermal_conductivity, dtype=np.float64), reduced_elapsed, reduced_values)
+    return reduced_elapsed, reduced_values, report
+
+
+def series_from_frame(measurements: pd.DataFrame, date_column: str = DATE_COLUMN,
+                      value_column: str = CONDUCTIVITY_COLUMN) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Elapsed seconds and conductivities of a measurement table, without building MeasurementData objects.
+
+    The table must be sorted by date (see internal.cleaning.clean_measurements).
+    """
+    dates = pd.to_datetime(measurements[date_column]).to_numpy(dtype='datetime64[ns]')
+    elapsed_sec = (dates - dates[0]).astype(np.int64) / 1e9 if len(dates) else np.empty(0)
+    return elapsed_sec, measurements[value_column].to_numpy(dtype=np.float64)
+
+
+@dataclass
+class AggregatedFit:
+    """Fit on reduced series, with the reduction errors and the score on the full data."""
+    optimized_params: OptimizeParam
+    reports: List[AggregationReport]
+    full_score: float
+
+    @property
+    def score_error(self) -> float:
+        """Difference between the score on the reduced series and on the full series."""
+        return abs(self.optimized_params.manifest.score - self.full_score)
+
+
+def fit_aggregated(series: Sequence[Series], solver_config: Optional[SolverConfig] = None,
+                   tolerance: Optional[float] = None, bin_sec: Optional[float] = None) -> AggregatedFit:
+    """
+    Fit the model to reduced series so the fit cost depends on the number of kept points.
+
+    Every series is reduced with reduce_series; the score is normalized by the last elapsed time of
+    the original first series, as in minimize_solver. After the fit the score of the solution is
+    evaluated once on the full series, so the total error of the reduction is reported as well.
+
+    Args:
+        series: (elapsed_sec, thermal_conductivity, temperature) of every experiment.
+        solver_config (SolverConfig, optional): Solver settings. Defaults to SolverConfig().
+        tolerance (float, optional): Maximum deviation of the simplified series [W/(m･K)].
+        bin_sec (float, optional): Width of the averaging bins [s].
+
+    Returns:
+        AggregatedFit: The fit, one AggregationReport per series and the full-data score.
+    """
+    if solver_config is None:
+        solver_config = SolverConfig()
+    solver_config = resolve_seed(solver_config)
+
+    reduced, reports = [], []
+    for elapsed_sec, thermal_conductivity, temperature in series:
+        reduced_elapsed, reduced_values, report = reduce_series(elapsed_sec, thermal_conductivity,
+                                                                tolerance=tolerance, bin_sec=bin_sec)
+        reduced.append((reduced_elapsed, reduced_values, temperature))
+        reports.append(report)
+
+    first_elapsed_sec = series[0][0] if len(series) else ()
+    normalizer_sec = float(first_elapsed_sec[-1]) if len(first_elapsed_sec) else 0.0
+    solver_params, manifest = solve_packed(pack_series(reduced), normalizer_sec, solver_config)
+
+    full_objective = AreaObjective(pack_series(series), solver_config.digit_conf, normalizer_sec)
+    return AggregatedFit(
+        optimized_params=OptimizeParam.from_solver(solver_params, solver_config.digit_conf, manifest=manifest),
+        reports=reports,
+        full_score=float(full_objective(solver_params)),
+    )
@@ -0,0 +1,240 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from scipy import optimize
+from scipy.stats import qmc
+
+# A backend minimizes ``objective`` within ``bounds`` and returns a BackendResult.
+# ``objective`` accepts a single candidate (shape (n,)) and, unless ``parallel`` is set,
+# a whole population at once (shape (n, S)) returning S scores.
+# ``solver_config`` is the SolverConfig of the fit; backends read the fields that apply to them.
+SolverBackend = Callable[..., 'BackendResult']
+
+SOLVER_BACKENDS: Dict[str, SolverBackend] = {}
+
+DEFAULT_SOLVER_BACKEND = 'differential_evolution'
+
+
+@dataclass
+class BackendResult:
+    """
+    Best solver parameters found by a backend, their score and the reported evaluation count.
+
+    Backends that find several distinct minima list them, best first, in ``alternatives``
+    as (solver parameters, score); the first one is ``x``.
+    """
+    x: np.ndarray
+    fun: float
+    nfev: int
+    alternatives: List[Tuple[np.ndarray, float]] = field(default_factory=list)
+
+
+def register_backend(name: str):
+    """Decorator registering a solver backend under ``name``."""
+    def decorator(backend: SolverBackend) -> SolverBackend:
+        SOLVER_BACKENDS[name] = backend
+        return backend
+    return decorator
+
+
+def get_backend(name: str) -> SolverBackend:
+    """
+    Look up a registered solver backend.
+
+    Raises:
+        ValueError: If no backend has this name.
+    """
+    if name not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown solver backend: {name} (choose from {', '.join(SOLVER_BACKENDS)})")
+    return SOLVER_BACKENDS[name]
+
+
+def _local_search(objective, x0: np.ndarray, bounds: List[Tuple[float, float]]) -> optimize.OptimizeResult:
+    # The area objective is not smooth (absolute differences): use a derivative-free local method
+    return optimize.minimize(objective, x0=x0, bounds=bounds, method='Nelder-Mead')
+
+
+def _polish_job(objective, x0: np.ndarray, bounds: List[Tuple[float, float]]) -> optimize.OptimizeResult:
+    # Runs in a worker process of the hybrid backend; the pool's workers run several polishes
+    try:
+        return _local_search(objective, x0, bounds)
+    finally:
+        release = getattr(objective, 'release', None)
+        if release is not None:
+            release()
+
+
+@register_backend('differential_evolution')
+def differential_evolution_backend(objective, bounds, solver_config, parallel: bool = False) -> BackendResult:
+    """scipy differential evolution with all SolverConfig settings (the long-standing default)."""
+    # workers=1 では vectorized=True で世代ごとに集団全体をまとめて評価する（numba があれば並列スレッドで評価）
+    result = optimize.differential_evolution(
+        func=objective,
+        bounds=bounds,
+        strategy=solver_config.strategy,
+        maxiter=solver_config.maxiter,
+        popsize=solver_config.popsize,
+        mutation=solver_config.mutation,
+        recombination=solver_config.recombination,
+        tol=solver_config.tol,
+        atol=solver_config.atol,
+        polish=solver_config.polish,
+        rng=solver_config.seed,  # 乱数シードを固定して再現性を確保する
+        updating='deferred',   # vectorized / 並列評価には deferred が必要
+        vectorized=not parallel,
+        workers=solver_config.workers,
+        disp=solver_config.disp,
+    )
+    return BackendResult(x=result.x, fun=float(result.fun), nfev=int(result.nfev))
+
+
+@register_backend('shgo')
+def shgo_backend(objective, bounds, solver_config, parallel: bool = False) -> BackendResult:
+    """
+    scipy simplicial homology global optimization on ``popsize`` × n Sobol points,
+    with bounded Nelder-Mead local searches.
+    """
+    result = optimize.shgo(
+        objective,
+        bounds,
+        n=solver_config.popsize * len(bounds),
+        sampling_method='sobol',
+        minimizer_kwargs={'method': 'Nelder-Mead'},
+        workers=solver_config.workers,
+    )
+    return BackendResult(x=result.x, fun=float(result.fun), nfev=int(result.nfev))
+
+
+@register_backend('dual_annealing')
+def dual_annealing_backend(objective, bounds, solver_config, parallel: bool = False) -> BackendResult:
+    """scipy dual annealing for ``maxiter`` iterations; ``polish`` enables its (Nelder-Mead) local search."""
+    result = optimize.dual_annealing(
+        objective,
+        bounds,
+        maxiter=solver_config.maxiter,
+        minimizer_kwargs={'method': 'Nelder-Mead'},
+        rng=solver_config.seed,
+        no_local_search=not solver_config.polish,
+    )
+    return BackendResult(x=result.x, fun=float(result.fun), nfev=int(result.nfev))
+
+
+@register_backend('grid_local')
+def grid_local_backend(objective, bounds, solver_config, parallel: bool = False,
+                       n_starts: int = 3) -> BackendResult:
+    """
+    Evaluate at least ``popsize`` × ``maxiter`` scrambled Sobol points (rounded up to a power of two,
+    as one population when possible),
+    then run bounded Nelder-Mead from the ``n_starts`` best points and keep the best result.
+    """
+    lower = np.array([bound[0] for bound in bounds], dtype=np.float64)
+    upper = np.array([bound[1] for bound in bounds], dtype=np.float64)
+    sampler = qmc.Sobol(d=len(bounds), scramble=True, rng=solver_config.seed)
+    points = qmc.scale(sampler.random_base2(m=math.ceil(math.log2(solver_config.popsize * solver_config.maxiter))),
+                       lower, upper)
+    n_points = len(points)
+    if parallel:
+        scores = np.array([objective(point) for point in points])
+    else:
+        scores = np.asarray(objective(points.T))
+    nfev = n_points
+
+    best = None
+    for start in points[np.argsort(scores)[:n_starts]]:
+        result = _local_search(objective, start, list(bounds))
+        nfev += int(result.nfev)
+        if best is None or result.fun < best.fun:
+            best = result
+    return BackendResult(x=best.x, fun=float(best.fun), nfev=nfev)
+
+
+# Share of the maxiter generations run by the global pass of the hybrid backend
+HYBRID_GLOBAL_FRACTION = 0.25
+
+# Distance (in bounds-normalized units, i.e. each parameter scaled to [0, 1]) below which two
+# points belong to the same basin
+BASIN_RADIUS = 0.05
+
+
+def distinct_basins(points: np.ndarray, scores: np.ndarray, bounds: List[Tuple[float, float]],
+                    n_basins: int, radius: float = BASIN_RADIUS) -> List[int]:
+    """
+    Indices of the best point of up to ``n_basins`` distinct basins, best first.
+
+    Points are taken in order of their score; a point within ``radius`` (bounds-normalized
+    Euclidean distance) of an already taken point belongs to its basin and is skipped.
+    """
+    lower = np.array([bound[0] for bound in bounds], dtype=np.float64)
+    span = np.array([bound[1] for bound in bounds], dtype=np.float64) - lower
+    unit = (np.asarray(points, dtype=np.float64) - lower) / span
+    taken: List[int] = []
+    for index in np.argsort(scores, kind='stable'):
+        if not np.isfinite(scores[index]):
+            break
+        if taken and np.min(np.linalg.norm(unit[taken] - unit[index], axis=1)) < radius:
+            continue
+        taken.append(int(index))
+        if len(taken) == n_basins:
+            break
+    return taken
+
+
+def _n_processes(workers: int) -> int:
+    return (os.cpu_count() or 1) if workers == -1 else workers
+
+
+@register_backend('hybrid')
+def hybrid_backend(objective, bounds, solver_config, parallel: bool = False, n_starts: int = 4) -> BackendResult:
+    """
+    Short differential evolution pass without polish, then bounded Nelder-Mead from the best point
+    of each of the ``n_starts`` best distinct basins of its final population.
+
+    The global pass runs ``HYBRID_GLOBAL_FRACTION`` of ``maxiter`` generations; the local searches
+    run in up to ``workers`` processes when ``parallel`` is set. Local searches that end in the same
+    basin are merged, and the remaining minima are returned as ranked ``alternatives`` — in this
+    model a high E with a high k₀ often fits almost as well as a low E with a low k₀.
+    """
+    result = optimize.differential_evolution(
+        func=objective,
+        bounds=bounds,
+        strategy=solver_config.strategy,
+        maxiter=max(1, int(solver_config.maxiter * HYBRID_GLOBAL_FRACTION)),
+        popsize=solver_config.popsize,
+        mutation=solver_config.mutation,
+        recombination=solver_config.recombination,
+        tol=solver_config.tol,
+        atol=solver_config.atol,
+        polish=False,
+        rng=solver_config.seed,
+        updating='deferred',
+        vectorized=not parallel,
+        workers=solver_config.workers,
+        disp=solver_config.disp,
+    )
+    nfev = int(result.nfev)
+    population = result.population  # already scaled to the bounds
+    starts = population[distinct_basins(population, result.population_energies, bounds, n_starts)]
+
+    n_processes = min(_n_processes(solver_config.workers), len(starts)) if parallel else 1
+    if n_processes > 1:
+        # 各局所探索を別プロセスで並列に実行する（目的関数は共有メモリを参照する）
+        with ProcessPoolExecutor(max_workers=n_processes) as executor:
+            local_results = list(executor.map(_polish_job, repeat(objective), starts, repeat(list(bounds))))
+    else:
+        local_results = [_local_search(objective, start, list(bounds)) for start in starts]
+    nfev += sum(int(local_result.nfev) for local_result in local_results)
+
+    minima = np.array([local_result.x for local_result in local_results]).reshape(-1, len(bounds))
+    scores = np.array([float(local_result.fun) for local_result in local_results])
+    alternatives = [(minima[index], float(scores[index]))
+                    for index in distinct_basins(minima, scores, bounds, len(minima))]
+    if not alternatives:
+        # no finite score in the population or after the local searches: keep the global pass's result
+        return BackendResult(x=result.x, fun=float(result.fun), nfev=nfev)
+    best_x, best_fun = alternatives[0]
+    return BackendResult(x=best_x, fun=best_fun, nfev=nfev, alternatives=alternatives)
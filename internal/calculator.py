@@ -1,11 +1,16 @@
-from dataclasses import dataclass, field
-from typing import List
+import json
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
 
 import numpy as np
-from scipy import optimize
 
+from internal.backends import DEFAULT_SOLVER_BACKEND, get_backend
 from internal.const import R_gas_constant, kelvin_constant
 from internal.interface import Experiment
+from internal.kernel import PackedSeries, pack_series, population_area, total_area
+from internal.manifest import FitManifest, hash_inputs, library_versions
+from internal.shared import SharedSeries, SharedSeriesHandle, attach_series, detach_series
 
 
 @dataclass
@@ -47,34 +52,149 @@ class K_0:
         self.actual_value = self.digit_conf * self.solver_param
 
 
+class ModelParams(NamedTuple):
+    """
+    Actual values of the model parameters as a compact immutable vector.
+
+    This is the type used inside the calculator; OptimizeParam is only built at the API boundary.
+    """
+    lamda_gas: float
+    e_dash: float
+    k_0: float
+
+    @classmethod
+    def from_solver(cls, solver_params: Sequence[float], digit_conf: Sequence[float]) -> 'ModelParams':
+        """Scale solver parameters to actual values."""
+        return cls(*(float(p) * float(c) for p, c in zip(solver_params, digit_conf)))
+
+
 @dataclass
 class OptimizeParam:
     lamda_gas: LamdaGas
     e_dash: Edash
     k_0: K_0
+    manifest: Optional[FitManifest] = None
+
+    @classmethod
+    def from_solver(cls, solver_params: Sequence[float], digit_conf: Sequence[float],
+                    manifest: Optional[FitManifest] = None) -> 'OptimizeParam':
+        """Create an OptimizeParam from solver parameters and their scaling."""
+        lamda_gas_param, e_dash_param, k_0_param = solver_params
+        return cls(
+            lamda_gas=LamdaGas(digit_conf=digit_conf[0], solver_param=float(lamda_gas_param)),
+            e_dash=Edash(digit_conf=digit_conf[1], solver_param=float(e_dash_param)),
+            k_0=K_0(digit_conf=digit_conf[2], solver_param=float(k_0_param)),
+            manifest=manifest,
+        )
+
+    @property
+    def model_params(self) -> ModelParams:
+        return ModelParams(self.lamda_gas.actual_value, self.e_dash.actual_value, self.k_0.actual_value)
+
+
+@dataclass(frozen=True)
+class SolverConfig:
+    """
+    Settings of the optimizer run in minimize_solver.
+
+    ``bounds`` are given in solver units; ``digit_conf`` scales them to the actual values of
+    (lamda_gas, e_dash, k_0). With a fixed ``seed`` two runs on the same data give bit-for-bit
+    identical results. If ``seed`` is None a random seed is drawn and recorded in the fit manifest.
+    With ``workers`` > 1 the population is evaluated by that many processes reading the
+    measurement arrays from shared memory; otherwise it is evaluated in-process, vectorized.
+    ``backend`` names the optimizer (see internal/backends.py); the differential evolution
+    settings (strategy, mutation, ...) only apply to the default backend.
+    """
+    bounds: Tuple[Tuple[float, float], ...] = ((1.0, 100.0), (1.0, 1000.0), (1.0, 1000.0))
+    digit_conf: Tuple[float, float, float] = (0.0001, 100, 0.001)
+    strategy: str = 'rand1bin'
+    maxiter: int = 100
+    popsize: int = 50
+    mutation: Tuple[float, float] = (0.5, 1.0)
+    recombination: float = 0.9
+    tol: float = 0
+    atol: float = -1
+    polish: bool = True
+    seed: Optional[int] = 0
+    workers: int = 1
+    disp: bool = True
+    backend: str = DEFAULT_SOLVER_BACKEND
+
+    def to_dict(self) -> dict:
+        """JSON-compatible representation, as stored in the fit manifest."""
+        return json.loads(json.dumps(asdict(self)))
+
+
+# Named solver presets.
+#   fast:       small population that may stop early, finished by the local polish (interactive use)
+#   balanced:   the long-standing default (popsize=50, always runs maxiter generations)
+#   exhaustive: large population and many generations for final reports
+SOLVER_PRESETS = {
+    'fast': SolverConfig(maxiter=30, popsize=10, tol=0.01, atol=0),
+    'balanced': SolverConfig(),
+    'exhaustive': SolverConfig(maxiter=300, popsize=100),
+}
+
+DEFAULT_SOLVER_PRESET = 'balanced'
+
+
+def get_solver_config(preset: str = DEFAULT_SOLVER_PRESET, **overrides) -> SolverConfig:
+    """
+    Return the SolverConfig of a named preset, optionally with some fields overridden.
+
+    Args:
+        preset (str): One of SOLVER_PRESETS.
+        **overrides: SolverConfig fields to replace, e.g. ``seed=1``.
+
+    Returns:
+        SolverConfig: The configuration.
+
+    Raises:
+        ValueError: If the preset name is unknown.
+    """
+    if preset not in SOLVER_PRESETS:
+        raise ValueError(f"Unknown solver preset: {preset} (choose from {', '.join(SOLVER_PRESETS)})")
+    return replace(SOLVER_PRESETS[preset], **overrides)
 
 
 def estimate_thermal_conductivity(
-        e_dash: Edash,
+        e_dash: float,
         experiment_temperature: float,
-        measurement_time_sec: float,
-        lamda_gas: LamdaGas,
+        measurement_time_sec,
+        lamda_gas: float,
         initial_thermal_conductivity: float,
-        k_0: K_0,
-) -> float:
-    e_dash.update_actual_value()
-    lamda_gas.update_actual_value()
-    k_0.update_actual_value()
+        k_0: float,
+):
+    """
+    Estimate the thermal conductivity after ``measurement_time_sec`` of exposure.
+
+    The parameters are actual values (see ModelParams). ``measurement_time_sec`` may be a
+    float or an array, in which case an array of the same shape is returned.
+    """
     abs_temperature = experiment_temperature + kelvin_constant
 
-    inner_exponent = -e_dash.actual_value / (R_gas_constant * abs_temperature)
-    middle_term = k_0.actual_value * measurement_time_sec * np.exp(inner_exponent)
+    inner_exponent = -e_dash / (R_gas_constant * abs_temperature)
+    middle_term = k_0 * measurement_time_sec * np.exp(inner_exponent)
     term = np.exp(-middle_term) - 1
-    result = -lamda_gas.actual_value * term + initial_thermal_conductivity
+    result = -lamda_gas * term + initial_thermal_conductivity
 
     return result
 
 
+def rate_constant(params: ModelParams, temperature):
+    """Rate constant k = k₀·exp(−E/(R·T)) [1/s] of the model at ``temperature`` [°C] (float or array)."""
+    return params.k_0 * np.exp(-params.e_dash / (R_gas_constant * (np.asarray(temperature) + kelvin_constant)))
+
+
+def time_to_fraction_sec(params: ModelParams, temperature, fraction):
+    """
+    Exposure time [s] after which the increase λ − λ0 reaches ``fraction`` of λgas.
+
+    Closed form of the model: t = −ln(1 − fraction) / k. Broadcasts over arrays.
+    """
+    return -np.log1p(-np.asarray(fraction, dtype=np.float64)) / rate_constant(params, temperature)
+
+
 @dataclass
 class CalculateRow:
     elapsed_sec: float
@@ -107,17 +227,32 @@ class CalculateTable:
             total += row.diff_area
         return total
 
-    def estimate_thermal_conductivity(self, e_dash: Edash, lamda_gas: LamdaGas, experiment_temperature: float, k_0: K_0):
-        initial_thermal_conductivity = self.rows[0].thermal_conductivity
-        for row in self.rows:
-            row.estimated_conductivity = estimate_thermal_conductivity(
-                e_dash=e_dash,
-                experiment_temperature=experiment_temperature,
-                measurement_time_sec=row.elapsed_sec,
-                lamda_gas=lamda_gas,
-                initial_thermal_conductivity=initial_thermal_conductivity,
-                k_0=k_0,
-            )
+    def estimate_thermal_conductivity(self, params: ModelParams, experiment_temperature: float):
+        if not self.rows:
+            return
+        elapsed_sec, thermal_conductivity = self.as_arrays()
+        estimated = estimate_thermal_conductivity(
+            e_dash=params.e_dash,
+            experiment_temperature=experiment_temperature,
+            measurement_time_sec=elapsed_sec,
+            lamda_gas=params.lamda_gas,
+            initial_thermal_conductivity=thermal_conductivity[0],
+            k_0=params.k_0,
+        )
+        for row, value in zip(self.rows, estimated.tolist()):
+            row.estimated_conductivity = value
+
+    def as_arrays(self):
+        """
+        Return the measurement columns as float64 arrays.
+
+        Returns:
+            tuple: (elapsed_sec, thermal_conductivity)
+        """
+        elapsed_sec = np.fromiter((row.elapsed_sec for row in self.rows), dtype=np.float64, count=len(self.rows))
+        thermal_conductivity = np.fromiter((row.thermal_conductivity for row in self.rows), dtype=np.float64,
+                                           count=len(self.rows))
+        return elapsed_sec, thermal_conductivity
 
     def update_all_metrix(self):
         for i in range(len(self.rows)):
@@ -130,14 +265,311 @@ def create_calculate_table(experiment: Experiment) -> CalculateTable:
     rows = []
     for i, measurement in enumerate(experiment.measurements):
         rows.append(CalculateRow(
-            elapsed_sec=measurement.elapsed_days * 86400,
+            elapsed_sec=measurement.elapsed_sec,
             thermal_conductivity=measurement.thermal_conductivity,
         ))
     return CalculateTable(rows=rows)
 
 
+class AreaObjective:
+    """
+    Objective minimized by the solver: total difference area of all series divided by a time normalizer.
+
+    The instance is a plain picklable callable. It accepts a single candidate of solver parameters
+    (shape (3,)) or, for vectorized differential evolution, a whole population (shape (3, S)).
+    Candidates that produce a non-finite score are assigned 1e20.
+    ``n_evaluations`` counts the evaluated candidates in this process.
+
+    When created with a SharedSeriesHandle the measurement arrays are not pickled; worker
+    processes attach to the shared memory block on their first call instead.
+    """
+
+    def __init__(self, packed: Optional[PackedSeries], digit_conf: np.ndarray, normalizer_sec: float,
+                 use_jit: bool = True, shared_handle: Optional[SharedSeriesHandle] = None):
+        self._packed = packed
+        self.digit_conf = np.asarray(digit_conf, dtype=np.float64)
+        self.normalizer_sec = np.float64(normalizer_sec)
+        self.use_jit = use_jit
+        self.shared_handle = shared_handle
+        self.n_evaluations = 0
+
+    @property
+    def packed(self) -> PackedSeries:
+        if self._packed is None:
+            self._packed = attach_series(self.shared_handle)
+        return self._packed
+
+    def release(self):
+        """Drop the mapping of the shared block in this process (a later call attaches again)."""
+        if self.shared_handle is not None and self._packed is not None:
+            self._packed = None
+            detach_series(self.shared_handle)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.shared_handle is not None:
+            state['_packed'] = None
+        return state
+
+    def __call__(self, params):
+        params = np.asarray(params, dtype=np.float64)
+        with np.errstate(all='ignore'):
+            if params.ndim == 2:
+                self.n_evaluations += params.shape[1]
+                population = params.T * self.digit_conf
+                scores = population_area(population, self.packed, use_jit=self.use_jit) / self.normalizer_sec
+                return np.where(np.isfinite(scores), scores, 1e20)
+
+            self.n_evaluations += 1
+            score = total_area(params * self.digit_conf, self.packed, use_jit=self.use_jit) / self.normalizer_sec
+            if not np.isfinite(score):
+                return 1e20
+            return float(score)
+
+
+def resolve_seed(solver_config: SolverConfig) -> SolverConfig:
+    """Return the configuration with a concrete seed, drawing a random one if ``seed`` is None."""
+    if solver_config.seed is None:
+        return replace(solver_config, seed=int(np.random.SeedSequence().generate_state(1)[0]))
+    return solver_config
+
+
+class FitCancelledError(Exception):
+    """Raised from a ``stop_check`` to abort a fit that was cancelled (e.g. superseded by a newer submission)."""
+
+
+class CheckedObjective:
+    """Objective wrapper calling ``stop_check`` before every evaluation; ``stop_check`` aborts the fit by raising."""
+
+    def __init__(self, objective, stop_check: Callable[[], None]):
+        self.objective = objective
+        self.stop_check = stop_check
+
+    def __call__(self, params):
+        self.stop_check()
+        return self.objective(params)
+
+
+def solve_packed(packed: PackedSeries, normalizer_sec: float, solver_config: SolverConfig,
+                 shared_handle: Optional[SharedSeriesHandle] = None,
+                 stop_check: Optional[Callable[[], None]] = None) -> Tuple[np.ndarray, FitManifest]:
+    """
+    Run the configured solver backend (differential evolution by default) on packed measurement series.
+
+    Args:
+        packed (PackedSeries): The measurement series of all experiments fitted together.
+        normalizer_sec (float): Elapsed time the total area is divided by.
+        solver_config (SolverConfig): Solver settings; ``seed`` must be set (see resolve_seed).
+        shared_handle (SharedSeriesHandle, optional): Shared memory block holding ``packed``,
+            passed to the worker processes instead of the arrays when ``workers`` > 1.
+        stop_check (callable, optional): Called before every objective evaluation (each generation
+            when vectorized); raising an exception from it aborts the fit. Requires ``workers`` == 1.
+
+    Returns:
+        tuple: (solver parameters, FitManifest)
+
+    Raises:
+        ValueError: If ``stop_check`` is given with ``workers`` > 1.
+    """
+    # lamda_gas, e_dash, k0の範囲設定とスケーリング係数は SolverConfig で管理する
+    bounds = [tuple(bound) for bound in solver_config.bounds]
+    digit_conf = np.array(solver_config.digit_conf, dtype=np.float64)
+
+    parallel = solver_config.workers != 1
+    if parallel and stop_check is not None:
+        raise ValueError("stop_check requires workers == 1")
+    shared = None
+    if parallel and shared_handle is None:
+        shared = SharedSeries(packed)
+        shared_handle = shared.handle
+
+    objective_function = AreaObjective(
+        packed=packed,
+        digit_conf=digit_conf,
+        normalizer_sec=normalizer_sec,
+        shared_handle=shared_handle if parallel else None,
+    )
+
+    # Run the optimization with the configured backend (differential evolution by default)
+    backend = get_backend(solver_config.backend)
+    start_time = time.perf_counter()
+    try:
+        objective = objective_function if stop_check is None else CheckedObjective(objective_function, stop_check)
+        result = backend(objective, bounds, solver_config, parallel=parallel)
+    finally:
+        if shared is not None:
+            shared.close()
+    wall_time_sec = time.perf_counter() - start_time
+
+    manifest = FitManifest(
+        input_hash=hash_inputs(packed),
+        solver_config=solver_config.to_dict(),
+        library_versions=library_versions(),
+        # 並列評価ではワーカー側のカウンタが見えないため scipy の nfev を使う
+        n_evaluations=int(result.nfev) if parallel else objective_function.n_evaluations,
+        wall_time_sec=wall_time_sec,
+        solver_params=[float(x) for x in result.x],
+        score=float(result.fun),
+        alternatives=[{'solver_params': [float(x) for x in params], 'score': score}
+                      for params, score in result.alternatives] or None,
+    )
+    return result.x, manifest
+
+
+def pack_tables(calculate_tables: Sequence[CalculateTable],
+                experiment_temperatures: Sequence[float]) -> Tuple[PackedSeries, float]:
+    """
+    Pack the measurement tables of a fit for the solver.
+
+    Returns:
+        tuple: (PackedSeries, normalizer_sec); the score is normalized by the last elapsed time of the first table.
+    """
+    arrays = [calculate_table.as_arrays() for calculate_table in calculate_tables]
+    packed = pack_series([(elapsed_sec, thermal_conductivity, experiment_temperature)
+                          for (elapsed_sec, thermal_conductivity), experiment_temperature
+                          in zip(arrays, experiment_temperatures)])
+    # スコアはサンプル1の最終経過時間で正規化する
+    elapsed_sec_1 = arrays[0][0] if arrays else ()
+    normalizer_sec = float(elapsed_sec_1[-1]) if len(elapsed_sec_1) else 0.0
+    return packed, normalizer_sec
+
+
+def fill_tables(calculate_tables: Sequence[CalculateTable], experiment_temperatures: Sequence[float],
+                params: ModelParams):
+    """Fill the estimates and difference areas of the tables from the model with ``params``."""
+    for calculate_table, experiment_temperature in zip(calculate_tables, experiment_temperatures):
+        calculate_table.estimate_thermal_conductivity(params, experiment_temperature)
+        calculate_table.update_all_metrix()
+
+
+@dataclass
+class FitResults:
+    """
+    Derived metrics of a fit, one array element per sample (series).
+
+    ``lconv`` is the long-term converged value λ0 + λgas, ``rate_constant`` the effective rate
+    k [1/s] at the sample temperature, ``t50_days`` / ``t90_days`` the exposure time until
+    λ − λ0 reaches 50 / 90 % of λgas. ``rmse`` and ``r2`` compare the measurements with the model,
+    ``area`` is the difference area [W/(m･K)･s] of each sample and ``score`` the solver objective
+    (total area divided by ``normalizer_sec``). After an outlier-rejecting fit these four only cover
+    the kept measurements, like the fit itself; ``n_rejected`` counts the others (included in
+    ``n_points``). Samples without measurements get NaN.
+    """
+    params: ModelParams
+    temperatures: np.ndarray
+    n_points: np.ndarray
+    n_rejected: np.ndarray
+    initial_thermal_conductivity: np.ndarray
+    lconv: np.ndarray
+    rate_constant: np.ndarray
+    t50_days: np.ndarray
+    t90_days: np.ndarray
+    rmse: np.ndarray
+    r2: np.ndarray
+    area: np.ndarray
+    score: float
+
+    @property
+    def n_samples(self) -> int:
+        return len(self.temperatures)
+
+    def sample(self, index: int) -> dict:
+        """Metrics of one sample as plain floats (JSON-compatible: None instead of NaN)."""
+        metrics = {
+            'temperature': self.temperatures[index],
+            'initial_thermal_conductivity': self.initial_thermal_conductivity[index],
+            'lconv': self.lconv[index],
+            'rate_constant': self.rate_constant[index],
+            't50_days': self.t50_days[index],
+            't90_days': self.t90_days[index],
+            'rmse': self.rmse[index],
+            'r2': self.r2[index],
+            'area': self.area[index],
+        }
+        return {
+            'n_points': int(self.n_points[index]),
+            'n_rejected': int(self.n_rejected[index]),
+            **{name: float(value) if np.isfinite(value) else None for name, value in metrics.items()},
+        }
+
+    def to_dicts(self) -> List[dict]:
+        return [self.sample(index) for index in range(self.n_samples)]
+
+
+def fit_results(params: ModelParams, packed: PackedSeries, normalizer_sec: float,
+                rejected_points: Optional[Sequence[int]] = None) -> FitResults:
+    """
+    Compute the FitResults of ``params`` on packed series, vectorized over all samples and measurements.
+
+    Each series is anchored at its first measurement (λ0), as in the fit. ``rejected_points`` are the
+    packed indices excluded by an outlier-rejecting fit (FitManifest.rejected_points); the error
+    metrics, areas and score are computed without them.
+    """
+    n_points = np.diff(packed.offsets)
+    if rejected_points:
+        keep = np.ones(len(packed.elapsed_sec), dtype=bool)
+        keep[np.asarray(rejected_points, dtype=np.int64)] = False
+        packed = packed.select(keep)  # the anchors (first points) are never rejected
+    n_series = packed.n_series
+    counts = np.diff(packed.offsets)
+    series_index = packed.series_index()
+    has_points = counts > 0
+    initial = np.full(n_series, np.nan)
+    initial[has_points] = packed.thermal_conductivity[packed.offsets[:-1][has_points]]
+    predicted = estimate_thermal_conductivity(
+        e_dash=params.e_dash,
+        experiment_temperature=packed.temperatures[series_index],
+        measurement_time_sec=packed.elapsed_sec,
+        lamda_gas=params.lamda_gas,
+        initial_thermal_conductivity=initial[series_index],
+        k_0=params.k_0,
+    )
+    residuals = packed.thermal_conductivity - predicted
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.bincount(series_index, weights=packed.thermal_conductivity, minlength=n_series) / counts
+        ss_res = np.bincount(series_index, weights=residuals ** 2, minlength=n_series)
+        ss_tot = np.bincount(series_index, weights=(packed.thermal_conductivity - mean[series_index]) ** 2,
+                             minlength=n_series)
+        rmse = np.where(has_points, np.sqrt(ss_res / counts), np.nan)
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan)
+
+    # 台形則の面積（同じ系列内の隣接点のみ）
+    deviation = np.abs(residuals)
+    same_series = series_index[1:] == series_index[:-1]
+    segments = (deviation[1:] + deviation[:-1]) / 2 * np.diff(packed.elapsed_sec)
+    area = np.bincount(series_index[1:][same_series], weights=segments[same_series], minlength=n_series)
+    area = np.where(has_points, area, np.nan)
+
+    k = rate_constant(params, packed.temperatures)
+    score = float(np.nansum(area) / normalizer_sec) if normalizer_sec else float('nan')
+    return FitResults(
+        params=params,
+        temperatures=packed.temperatures.copy(),
+        n_points=n_points,
+        n_rejected=n_points - counts,
+        initial_thermal_conductivity=initial,
+        lconv=initial + params.lamda_gas,
+        rate_constant=k,
+        t50_days=time_to_fraction_sec(params, packed.temperatures, 0.5) / 86400,
+        t90_days=time_to_fraction_sec(params, packed.temperatures, 0.9) / 86400,
+        rmse=rmse,
+        r2=r2,
+        area=area,
+        score=score,
+    )
+
+
+def table_fit_results(calculate_tables: Sequence[CalculateTable], experiment_temperatures: Sequence[float],
+                      params: ModelParams, rejected_points: Optional[Sequence[int]] = None) -> FitResults:
+    """FitResults of measurement tables, normalized like minimize_solver (see pack_tables and fit_results)."""
+    packed, normalizer_sec = pack_tables(calculate_tables, experiment_temperatures)
+    return fit_results(params, packed, normalizer_sec, rejected_points=rejected_points)
+
+
 def minimize_solver(calculate_table_1: CalculateTable, calculate_table_2: CalculateTable,
-                    experiment_temperature_1: float, experiment_temperature_2: float) -> OptimizeParam:
+                    experiment_temperature_1: float, experiment_temperature_2: float,
+                    solver_config: Optional[SolverConfig] = None) -> OptimizeParam:
     """
     Find the optimal solver parameters that minimize the difference between 
     estimated and actual thermal conductivity measurements.
@@ -145,103 +577,22 @@ def minimize_solver(calculate_table_1: CalculateTable, calculate_table_2: Calcul
     Args:
         calculate_table (CalculateTable): Table containing thermal conductivity measurements
         experiment_temperature (float): Temperature at which the experiment was conducted
+        solver_config (SolverConfig, optional): Solver settings. Defaults to SolverConfig().
 
     Returns:
-        OptimizeParam: Optimized parameters for LamdaGas and Edash
-    """
-    # Initial parameter guesses
-    # initial_params = np.array([6.0, 3.0])
-
-    # Parameter bounds (adjust as needed)
-    # lamda_gas, e_dash, k0の範囲設定
-    bounds = [(1.0, 100.0), (1.0, 1000.0), (1.0, 1000.0), ]
-
-
-    # Define the objective function to minimize
-    def objective_function(params: List[float]) -> float:
-        # 【変更点1】関数の最初から try を開始します（これで準備段階のエラーも逃しません）
-        try:
-            lamda_gas_param, e_dash_param, k0_param = params
-
-            # Create parameter objects with the current values
-            lamda_gas = LamdaGas(digit_conf=0.0001, solver_param=lamda_gas_param)
-            e_dash = Edash(digit_conf=100, solver_param=e_dash_param)
-            k_0 = K_0(digit_conf=0.001, solver_param=k0_param)
-
-            # Update the actual values
-            lamda_gas.update_actual_value()
-            e_dash.update_actual_value()
-            k_0.update_actual_value()
-
-            # Calculate estimated thermal conductivity for each row
-            calculate_table_1.estimate_thermal_conductivity(
-                e_dash=e_dash,
-                lamda_gas=lamda_gas,
-                experiment_temperature=experiment_temperature_1,
-                k_0=k_0,
-            )
-
-            # Update metrics and calculate total difference area
-            calculate_table_1.update_all_metrix()
-            total_diff_area_1 = calculate_table_1.total_area()
-            
-            # Calculate estimated thermal conductivity for each row
-            calculate_table_2.estimate_thermal_conductivity(
-                e_dash=e_dash,
-                lamda_gas=lamda_gas,
-                experiment_temperature=experiment_temperature_2,
-                k_0=k_0,
-            )
-
-            # Update metrics and calculate total difference area
-            calculate_table_2.update_all_metrix()
-            total_diff_area_2 = calculate_table_2.total_area()
-
-            total_diff_area = total_diff_area_1 + total_diff_area_2
-
-            elapsed_sec = calculate_table_1.rows[-1].elapsed_sec
-            
-            # スコア計算
-            final_score = total_diff_area / elapsed_sec
-            if not np.isfinite(final_score):
-                 return 1e20
-
-            return final_score
-
-        except Exception as e:
-            # 【変更点3】エラー内容を flush=True で強制表示させる
-            print(f"★計算エラー発生: {e}", flush=True) 
-            import traceback
-            traceback.print_exc() # 詳しいエラー場所を表示
-            # ---------------------------------------
-            return 1e20
-
-    # Run the optimization
-    result = optimize.differential_evolution(
-        func=objective_function,
-        bounds=bounds,
-        strategy='rand1bin',   # 広く探す設定（OKです）
-        maxiter=100,          # 収束が遅いので多めに（OKです）
-        popsize=50,            # 【修正】1000→50（これで十分性能が出ます）
-        mutation=(0.5, 1.0),   # 【修正】上限を1.9→1.0に（これで安定します）
-        recombination=0.9,     # 交叉率高め（OKです）
-        tol=0,                 # 【奥の手】収束判定を0にします（＝どんなに値が揃っても止まらない）
-        atol=-1,               # 【奥の手】絶対誤差判定も無効化します（＝maxiterまで必ず走り続ける）
-        polish=True,           # 必須（OKです）
-        workers=1,             # OKです
-        disp=True              # OKです
-    )
+        OptimizeParam: Optimized parameters for LamdaGas and Edash, with the manifest of the fit
+    """
+    if solver_config is None:
+        solver_config = SolverConfig()
+    solver_config = resolve_seed(solver_config)
 
-    # Extract the optimized parameters
-    optimized_lamda_gas_param, optimized_e_dash_param, optimized_k_0_param = result.x
-    # Create and return the optimized parameters
-    lamda_gas = LamdaGas(digit_conf=0.0001, solver_param=optimized_lamda_gas_param)
-    e_dash = Edash(digit_conf=100, solver_param=optimized_e_dash_param)
-    k_0 = K_0(digit_conf=0.001, solver_param=optimized_k_0_param)
+    calculate_tables = (calculate_table_1, calculate_table_2)
+    experiment_temperatures = (experiment_temperature_1, experiment_temperature_2)
+    packed, normalizer_sec = pack_tables(calculate_tables, experiment_temperatures)
+    solver_params, manifest = solve_packed(packed, normalizer_sec, solver_config)
 
-    # Update the actual values
-    lamda_gas.update_actual_value()
-    e_dash.update_actual_value()
-    k_0.update_actual_value()
+    # Fill the tables with the estimates of the optimized model for display and export
+    fill_tables(calculate_tables, experiment_temperatures,
+                ModelParams.from_solver(solver_params, solver_config.digit_conf))
 
-    return OptimizeParam(lamda_gas=lamda_gas, e_dash=e_dash, k_0=k_0)
+    return OptimizeParam.from_solver(solver_params, solver_config.digit_conf, manifest=manifest)
@@ -0,0 +1,337 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import scipy
+from scipy import optimize
+
+try:
+    from scipy.optimize._differentialevolution import DifferentialEvolutionSolver
+except ImportError:  # moved or renamed in another scipy version, see _check_solver
+    DifferentialEvolutionSolver = None
+
+from internal.backends import DEFAULT_SOLVER_BACKEND
+from internal.calculator import (AreaObjective, CalculateTable, FitCancelledError, ModelParams, OptimizeParam,
+                                 SolverConfig, fill_tables, pack_tables, resolve_seed)
+from internal.kernel import PackedSeries
+from internal.manifest import FitManifest, hash_inputs, library_versions
+from internal.shared import SharedSeries, SharedSeriesHandle
+
+DEFAULT_CHECKPOINT_DIR = os.environ.get("EXPOSURE_CHECKPOINT_DIR",
+                                        os.path.join(tempfile.gettempdir(), "exposure_checkpoints"))
+
+# Generations between two checkpoints
+DEFAULT_CHECKPOINT_EVERY = 10
+
+# Checkpoints step scipy's DifferentialEvolutionSolver one generation at a time and save its private
+# sampling state, which is not part of scipy's API: they are tested with this version only (requirements.txt)
+TESTED_SCIPY_VERSION = "1.17.0"
+_SOLVER_ATTRIBUTES = ("population", "population_energies", "random_number_generator",
+                      "_random_population_index", "_nfev")
+
+logger = logging.getLogger(__name__)
+
+
+def _check_solver(solver=None):
+    """
+    Raises:
+        RuntimeError: If the installed scipy lacks the solver internals the checkpoints rely on.
+    """
+    if DifferentialEvolutionSolver is None:
+        missing = ["scipy.optimize._differentialevolution.DifferentialEvolutionSolver"]
+    else:
+        missing = [name for name in _SOLVER_ATTRIBUTES if solver is not None and not hasattr(solver, name)]
+    if missing:
+        raise RuntimeError(
+            f"Checkpointed fits need scipy=={TESTED_SCIPY_VERSION} (installed: {scipy.__version__}); "
+            f"missing: {', '.join(missing)}. Install the version of requirements.txt or fit without checkpoints.")
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation flag, usable as ``stop_check``: calling it raises FitCancelledError once
+    ``cancel()`` was called (e.g. from a signal handler or another thread).
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def __call__(self):
+        if self._event.is_set():
+            raise FitCancelledError("cancelled")
+
+
+@dataclass
+class Checkpoint:
+    """
+    State of a differential evolution run after ``generation`` generations.
+
+    ``population`` is in the solver's unit scale ([0, 1] per parameter); ``rng_state`` is the state of
+    its random generator and ``sample_index`` the permutation it shuffles to pick mutation samples, so a
+    resumed run continues bit-for-bit like an uninterrupted one.
+    ``input_hash`` and ``solver_config`` identify the fit the checkpoint belongs to.
+    """
+    input_hash: str
+    solver_config: dict
+    generation: int
+    n_evaluations: int
+    population: np.ndarray
+    population_energies: np.ndarray
+    rng_state: dict
+    sample_index: np.ndarray
+
+    def matches(self, packed: PackedSeries, solver_config: SolverConfig) -> bool:
+        return self.input_hash == hash_inputs(packed) and self.solver_config == _resumable_config(solver_config)
+
+
+def _resumable_config(solver_config: SolverConfig) -> dict:
+    # disp and workers do not change the result, so a run may be resumed with other values
+    config = solver_config.to_dict()
+    del config['disp'], config['workers']
+    return config
+
+
+def checkpoint_path(directory: str, packed: PackedSeries, solver_config: SolverConfig) -> str:
+    """Checkpoint file of a fit in ``directory``, named after its inputs and solver settings."""
+    key = hash_inputs(packed) + json.dumps(_resumable_config(solver_config), sort_keys=True)
+    return os.path.join(directory, hashlib.sha256(key.encode()).hexdigest()[:24] + ".npz")
+
+
+def save_checkpoint(checkpoint: Checkpoint, file_path: str):
+    """Write a checkpoint atomically (a crash while writing keeps the previous checkpoint)."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            input_hash=np.array(checkpoint.input_hash),
+            solver_config=np.array(json.dumps(checkpoint.solver_config)),
+            generation=np.array(checkpoint.generation),
+            n_evaluations=np.array(checkpoint.n_evaluations),
+            population=checkpoint.population,
+            population_energies=checkpoint.population_energies,
+            rng_state=np.array(json.dumps(checkpoint.rng_state)),
+            sample_index=checkpoint.sample_index,
+        )
+    os.replace(tmp_path, file_path)
+
+
+def load_checkpoint(file_path: str) -> Checkpoint:
+    """Read a checkpoint written by save_checkpoint."""
+    with np.load(file_path) as arrays:
+        return Checkpoint(
+            input_hash=str(arrays["input_hash"]),
+            solver_config=json.loads(str(arrays["solver_config"])),
+            generation=int(arrays["generation"]),
+            n_evaluations=int(arrays["n_evaluations"]),
+            population=arrays["population"],
+            population_energies=arrays["population_energies"],
+            rng_state=json.loads(str(arrays["rng_state"])),
+            sample_index=arrays["sample_index"],
+        )
+
+
+def checkpointed_solve_packed(packed: PackedSeries, normalizer_sec: float, solver_config: SolverConfig,
+                              checkpoint_file: str, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+                              stop_check: Optional[Callable[[], None]] = None,
+                              shared_handle: Optional[SharedSeriesHandle] = None,
+                              keep_checkpoint: bool = False) -> Tuple[np.ndarray, FitManifest]:
+    """
+    solve_packed with differential evolution run generation by generation, resumable from a checkpoint.
+
+    If ``checkpoint_file`` holds a checkpoint of the same inputs and settings, the run continues from
+    it; the result is identical to an uninterrupted run. The population, its scores and the random
+    generator state are written every ``checkpoint_every`` generations, so a killed process loses at
+    most that many generations. ``stop_check`` is called between generations (and before the polish);
+    when it raises (e.g. CancellationToken), a checkpoint of the finished generations is written first.
+    The checkpoint is removed when the fit completes unless ``keep_checkpoint`` is set.
+
+    Args:
+        packed (PackedSeries): The measurement series of all experiments fitted together.
+        normalizer_sec (float): Elapsed time the total area is divided by.
+        solver_config (SolverConfig): Solver settings; ``seed`` must be set (see resolve_seed).
+        checkpoint_file (str): Checkpoint file to resume from and write to (see checkpoint_path).
+        checkpoint_every (int): Generations between two checkpoints.
+        stop_check (callable, optional): Abort hook called between generations.
+        shared_handle (SharedSeriesHandle, optional): Shared memory block holding ``packed`` (workers > 1).
+        keep_checkpoint (bool): Keep the checkpoint file of the completed fit.
+
+    Returns:
+        tuple: (solver parameters, FitManifest)
+
+    Raises:
+        ValueError: If the backend is not differential evolution, or if ``checkpoint_file`` belongs to
+            another fit.
+        RuntimeError: If the installed scipy is not compatible (see TESTED_SCIPY_VERSION).
+    """
+    if solver_config.backend != DEFAULT_SOLVER_BACKEND:
+        raise ValueError(f"checkpoints require the {DEFAULT_SOLVER_BACKEND} backend")
+    _check_solver()
+    try:
+        checkpoint = load_checkpoint(checkpoint_file)
+    except FileNotFoundError:
+        checkpoint = None
+    if checkpoint is not None and not checkpoint.matches(packed, solver_config):
+        raise ValueError(f"{checkpoint_file} is a checkpoint of another fit")
+
+    parallel = solver_config.workers != 1
+    shared = None
+    if parallel and shared_handle is None:
+        shared = SharedSeries(packed)
+        shared_handle = shared.handle
+    objective_function = AreaObjective(
+        packed=packed,
+        digit_conf=np.array(solver_config.digit_conf, dtype=np.float64),
+        normalizer_sec=normalizer_sec,
+        shared_handle=shared_handle if parallel else None,
+    )
+    input_hash = hash_inputs(packed)
+
+    start_time = time.perf_counter()
+    try:
+        # Same settings as the differential_evolution backend
+        with DifferentialEvolutionSolver(
+                objective_function,
+                [tuple(bound) for bound in solver_config.bounds],
+                strategy=solver_config.strategy,
+                maxiter=solver_config.maxiter,
+                popsize=solver_config.popsize,
+                mutation=solver_config.mutation,
+                recombination=solver_config.recombination,
+                tol=solver_config.tol,
+                atol=solver_config.atol,
+                polish=False,  # polished below, after the last generation
+                rng=np.random.default_rng(solver_config.seed),  # as differential_evolution does for integer seeds
+                updating='deferred',
+                vectorized=not parallel,
+                workers=solver_config.workers,
+        ) as solver:
+            _check_solver(solver)
+            generation = 0
+            previous_evaluations = checkpoint.n_evaluations if checkpoint is not None else 0
+            polish_evaluations = 0
+
+            def n_evaluations() -> int:
+                # counted like solve_packed, including the evaluations before the checkpoint
+                if parallel:
+                    return previous_evaluations + int(solver._nfev) + polish_evaluations
+                return previous_evaluations + objective_function.n_evaluations
+
+            if checkpoint is not None:
+                # 初期集団の代わりにチェックポイントの状態を復元する
+                solver.population = checkpoint.population.copy()
+                solver.population_energies = checkpoint.population_energies.copy()
+                solver.random_number_generator.bit_generator.state = checkpoint.rng_state
+                solver._random_population_index = checkpoint.sample_index.copy()
+                generation = checkpoint.generation
+
+            def save():
+                save_checkpoint(Checkpoint(
+                    input_hash=input_hash,
+                    solver_config=_resumable_config(solver_config),
+                    generation=generation,
+                    n_evaluations=n_evaluations(),
+                    population=solver.population,
+                    population_energies=solver.population_energies,
+                    rng_state=solver.random_number_generator.bit_generator.state,
+                    sample_index=solver._random_population_index,
+                ), checkpoint_file)
+
+            def check():
+                if stop_check is None:
+                    return
+                try:
+                    stop_check()
+                except BaseException:
+                    if generation > 0:
+                        save()
+                    raise
+
+            while generation < solver_config.maxiter:
+                check()
+                next(solver)
+                generation += 1
+                if solver_config.disp:
+                    logger.info("differential_evolution step %d: f(x)= %s", generation, solver.population_energies[0])
+                if solver.converged():
+                    break
+                if generation % checkpoint_every == 0:
+                    save()
+            check()
+
+            x, fun = solver.x, float(solver.population_energies[0])
+            if solver_config.polish:
+                # 最良個体を L-BFGS-B で仕上げる (differential_evolution の polish と同じ手順)
+                lower, upper = np.array(solver_config.bounds, dtype=np.float64).T
+                polished = optimize.minimize(objective_function, np.copy(x), method='L-BFGS-B',
+                                             bounds=optimize.Bounds(lower, upper))
+                polish_evaluations = polished.nfev
+                if (polished.fun < fun and polished.success
+                        and np.all(lower <= polished.x) and np.all(polished.x <= upper)):
+                    x, fun = polished.x, float(polished.fun)
+            total_evaluations = n_evaluations()
+    finally:
+        if shared is not None:
+            shared.close()
+    wall_time_sec = time.perf_counter() - start_time
+    if not keep_checkpoint:
+        try:
+            os.remove(checkpoint_file)
+        except FileNotFoundError:
+            pass  # never written, or removed by a concurrent run of the same fit
+
+    manifest = FitManifest(
+        input_hash=input_hash,
+        solver_config=solver_config.to_dict(),
+        library_versions=library_versions(),
+        n_evaluations=total_evaluations,
+        wall_time_sec=wall_time_sec,
+        solver_params=[float(value) for value in x],
+        score=fun,
+    )
+    return x, manifest
+
+
+def checkpointed_minimize_solver(calculate_table_1: CalculateTable, calculate_table_2: CalculateTable,
+                                 experiment_temperature_1: float, experiment_temperature_2: float,
+                                 solver_config: Optional[SolverConfig] = None,
+                                 checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR,
+                                 checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+                                 stop_check: Optional[Callable[[], None]] = None) -> OptimizeParam:
+    """
+    minimize_solver that checkpoints to ``checkpoint_dir`` and resumes an interrupted run of the same fit.
+
+    See checkpointed_solve_packed.
+
+    Raises:
+        FitCancelledError: If ``stop_check`` (e.g. a CancellationToken) cancelled the fit.
+    """
+    if solver_config is None:
+        solver_config = SolverConfig()
+    solver_config = resolve_seed(solver_config)
+
+    calculate_tables = (calculate_table_1, calculate_table_2)
+    experiment_temperatures = (experiment_temperature_1, experiment_temperature_2)
+    packed, normalizer_sec = pack_tables(calculate_tables, experiment_temperatures)
+    solver_params, manifest = checkpointed_solve_packed(
+        packed, normalizer_sec, solver_config, checkpoint_path(checkpoint_dir, packed, solver_config),
+        checkpoint_every=checkpoint_every, stop_check=stop_check)
+
+    fill_tables(calculate_tables, experiment_temperatures,
+                ModelParams.from_solver(solver_params, solver_config.digit_conf))
+    return OptimizeParam.from_solver(solver_params, solver_config.digit_conf, manifest=manifest)
@@ -0,0 +1,242 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from internal.interface import Experiment, create_experiment_with_measurement
+
+# Column names of the measurement data editor
+DATE_COLUMN = "測定日"
+CONDUCTIVITY_COLUMN = "熱伝導率"
+
+# A fit needs at least two measurements (one trapezoid)
+MIN_MEASUREMENTS = 2
+
+# Modified z-score above which a measurement is flagged as an outlier
+OUTLIER_THRESHOLD = 3.5
+
+
+@dataclass
+class MeasurementIssue:
+    """
+    A problem found in the measurement table.
+
+    ``rows`` are row labels of the input frame; for outliers they are positions in the cleaned frame.
+    """
+    kind: str
+    severity: str  # "error" rejects the input, "warning" is fixed or only reported
+    message: str
+    rows: List = field(default_factory=list)
+
+
+@dataclass
+class CleaningReport:
+    """Structured diagnostics of clean_measurements."""
+    n_input: int
+    n_output: int = 0
+    issues: List[MeasurementIssue] = field(default_factory=list)
+
+    @property
+    def errors(self) -> List[MeasurementIssue]:
+        return [issue for issue in self.issues if issue.severity == "error"]
+
+    @property
+    def warnings(self) -> List[MeasurementIssue]:
+        return [issue for issue in self.issues if issue.severity == "warning"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def add(self, kind: str, severity: str, message: str, rows=()):
+        self.issues.append(MeasurementIssue(kind=kind, severity=severity, message=message, rows=pd.Index(rows).tolist()))
+
+    def to_dict(self) -> dict:
+        return {
+            'n_input': self.n_input,
+            'n_output': self.n_output,
+            'issues': [vars(issue) for issue in self.issues],
+        }
+
+
+class MeasurementValidationError(ValueError):
+    """Raised when a measurement table cannot be fitted. ``report`` holds the diagnostics."""
+
+    def __init__(self, report: CleaningReport, label: str = ""):
+        self.report = report
+        prefix = f"{label}: " if label else ""
+        super().__init__(prefix + "; ".join(issue.message for issue in report.errors))
+
+
+def flag_outliers(thermal_conductivity: np.ndarray, threshold: float = OUTLIER_THRESHOLD) -> np.ndarray:
+    """
+    Flag measurements that deviate from their neighbours.
+
+    Each value (sorted by date) is compared with the median of its two preceding and two following
+    measurements, which excludes the value itself and stays close to a smooth curve. The residuals
+    are scored with the modified z-score (median absolute deviation), so the outliers themselves do
+    not widen the threshold. The first two and last two measurements are not scored.
+
+    Returns:
+        np.ndarray: Boolean mask of the outliers.
+    """
+    values = np.asarray(thermal_conductivity, dtype=np.float64)
+    mask = np.zeros(len(values), dtype=bool)
+    if len(values) < 5:
+        return mask
+    neighbours = np.stack([values[:-4], values[1:-3], values[3:-1], values[4:]])
+    residuals = values[2:-2] - np.median(neighbours, axis=0)
+    deviation = np.abs(residuals - np.median(residuals))
+    mad = np.median(deviation)
+    if mad == 0:
+        return mask
+    mask[2:-2] = 0.6745 * deviation / mad > threshold
+    return mask
+
+
+def clean_measurements(measurements: pd.DataFrame, date_column: str = DATE_COLUMN,
+                       value_column: str = CONDUCTIVITY_COLUMN,
+                       outlier_threshold: Optional[float] = OUTLIER_THRESHOLD
+                       ) -> Tuple[pd.DataFrame, CleaningReport]:
+    """
+    Validate and clean a measurement table before it is converted and fitted.
+
+    All checks are vectorized over the frame:
+
+    - blank rows (e.g. the unused rows of the editor template) are dropped silently,
+    - rows with only a date or only a value, or an invalid value (non-numeric, non-finite, <= 0),
+      are dropped with a warning,
+    - the rows are sorted by date,
+    - exact duplicates are dropped; several values on the same date are averaged (warning),
+    - outliers are flagged (warning) but kept,
+    - fewer than MIN_MEASUREMENTS remaining measurements (on different dates) is an error.
+
+    Args:
+        measurements (pd.DataFrame): The measurement table (date and thermal conductivity columns).
+        date_column (str): Name of the date column.
+        value_column (str): Name of the thermal conductivity column.
+        outlier_threshold (float, optional): Modified z-score of the outlier check; None disables it.
+
+    Returns:
+        tuple: (cleaned frame with a fresh index, CleaningReport)
+    """
+    report = CleaningReport(n_input=len(measurements))
+    dates = pd.to_datetime(measurements[date_column], errors='coerce', format='mixed')
+    values = pd.to_numeric(measurements[value_column], errors='coerce')
+    raw_values = measurements[value_column]
+
+    # 未入力の行（テンプレートの空行）は黙って除く
+    blank = dates.isna() & raw_values.isna()
+    missing_date = dates.isna() & ~blank
+    missing_value = values.isna() & ~dates.isna()
+    invalid_value = ~values.isna() & (~np.isfinite(values) | (values <= 0))
+    if missing_date.any():
+        report.add("missing_date", "warning", f"{missing_date.sum()} rows without a valid date were dropped",
+                   measurements.index[missing_date])
+    if missing_value.any():
+        report.add("missing_value", "warning", f"{missing_value.sum()} rows without a valid value were dropped",
+                   measurements.index[missing_value])
+    if invalid_value.any():
+        report.add("invalid_value", "warning",
+                   f"{invalid_value.sum()} rows with a non-positive or non-finite value were dropped",
+                   measurements.index[invalid_value])
+
+    keep = ~(blank | missing_date | missing_value | invalid_value)
+    frame = pd.DataFrame({date_column: dates[keep], value_column: values[keep].astype(np.float64)})
+
+    if not frame[date_column].is_monotonic_increasing:
+        report.add("unsorted", "warning", "measurements were sorted by date")
+        frame = frame.sort_values(date_column, kind='stable')
+
+    exact_duplicates = frame.duplicated()
+    if exact_duplicates.any():
+        report.add("duplicate", "warning", f"{exact_duplicates.sum()} duplicate rows were dropped",
+                   frame.index[exact_duplicates])
+        frame = frame[~exact_duplicates]
+    same_date = frame.duplicated(subset=date_column, keep=False)
+    if same_date.any():
+        report.add("same_date", "warning",
+                   f"{frame.loc[same_date, date_column].nunique()} dates with several values were averaged",
+                   frame.index[same_date])
+        frame = frame.groupby(date_column, as_index=False, sort=True)[value_column].mean()
+    frame = frame.reset_index(drop=True)
+
+    report.n_output = len(frame)
+    if len(frame) < MIN_MEASUREMENTS:
+        report.add("too_few", "error",
+                   f"at least {MIN_MEASUREMENTS} measurements on different dates are required, got {len(frame)}")
+        return frame, report
+
+    if outlier_threshold is not None:
+        outliers = flag_outliers(frame[value_column].to_numpy(), outlier_threshold)
+        if outliers.any():
+            report.add("outlier", "warning", f"{outliers.sum()} measurements look like outliers",
+                       frame.index[outliers])
+    return frame, report
+
+
+def validate_measurements(measurements: pd.DataFrame, label: str = "", **kwargs
+                          ) -> Tuple[pd.DataFrame, CleaningReport]:
+    """
+    clean_measurements that raises on errors.
+
+    Raises:
+        MeasurementValidationError: If the table cannot be fitted.
+    """
+    frame, report = clean_measurements(measurements, **kwargs)
+    if not report.ok:
+        raise MeasurementValidationError(report, label)
+    return frame, report
+
+
+def measurement_frame(experiment: Experiment) -> pd.DataFrame:
+    """The measurements of an experiment as a table in the data editor layout."""
+    return pd.DataFrame({
+        DATE_COLUMN: [measurement.measurement_date for measurement in experiment.measurements],
+        CONDUCTIVITY_COLUMN: [measurement.thermal_conductivity for measurement in experiment.measurements],
+    })
+
+
+def measurement_frame_from_dict(json_data: dict) -> pd.DataFrame:
+    """
+    The measurements of an experiment JSON dictionary (write_interface format) as a table in the data
+    editor layout, without building MeasurementData objects.
+    """
+    measurements = json_data.get('measurements', [])
+    return pd.DataFrame({
+        DATE_COLUMN: [measurement.get('measurement_date') for measurement in measurements],
+        CONDUCTIVITY_COLUMN: [measurement.get('thermal_conductivity') for measurement in measurements],
+    })
+
+
+def experiment_with_measurements(experiment: Experiment, measurements: pd.DataFrame) -> Experiment:
+    """
+    A copy of ``experiment`` (id and sample data) with the measurements of a cleaned table.
+
+    Elapsed times are recomputed from the measurement dates, as for the form input.
+    """
+    cleaned = create_experiment_with_measurement(
+        sample_name=experiment.sample_name,
+        thickness_mm=experiment.thickness_mm,
+        initial_density=experiment.initial_density,
+        temperature=experiment.temperature,
+        humidity_memo=experiment.humidity_memo,
+        measurements=measurements,
+    )
+    cleaned.id = experiment.id
+    return cleaned
+
+
+def clean_experiment(experiment: Experiment, label: str = "", **kwargs) -> Tuple[Experiment, CleaningReport]:
+    """
+    Validate and clean the measurements of an experiment read from a file, the store or a request.
+
+    Returns:
+        tuple: (experiment with the cleaned measurements, CleaningReport)
+
+    Raises:
+        MeasurementValidationError: If the measurements cannot be fitted.
+    """
+    frame, report = validate_measurements(measurement_frame(experiment), label=label, **kwargs)
+    return experiment_with_measurements(experiment, frame), report
@@ -0,0 +1,12 @@
+from typing import List
+
+
+def print_table(rows: List[dict]):
+    """Print rows of equal keys as a Markdown table (floats with 4 significant digits)."""
+    if not rows:
+        return
+    columns = list(rows[0])
+    print(" | ".join(columns))
+    print(" | ".join("---" for _ in columns))
+    for row in rows:
+        print(" | ".join(f"{value:.4g}" if isinstance(value, float) else str(value) for value in row.values()))
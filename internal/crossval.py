@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from internal.calculator import ModelParams, SolverConfig, estimate_thermal_conductivity
+from internal.parallel import fit_series_jobs
+
+# Default forecast horizons [days after the training cutoff]
+DEFAULT_HORIZONS_DAYS = (30, 90, 180, 365, 730)
+
+Series = Tuple[np.ndarray, np.ndarray, float]
+
+# Fewest measurements a training series needs (the first one only anchors the curve)
+MIN_TRAINING_POINTS = 2
+
+
+@dataclass
+class HorizonError:
+    """Forecast error of the held-out points within one horizon bin."""
+    horizon_days: float
+    n_points: int
+    mae: float
+    rmse: float
+
+
+@dataclass
+class HoldoutResult:
+    """Fit on the data up to ``cutoff_days`` and its forecast error on the later data."""
+    cutoff_days: float
+    params: ModelParams
+    n_train: int
+    n_test: int
+    horizons: List[HorizonError]
+    lconv_change: float
+
+
+@dataclass
+class TemperatureFoldResult:
+    """Fit without the series at ``temperature`` and its error on them."""
+    temperature: float
+    params: ModelParams
+    n_train: int
+    n_test: int
+    mae: float
+    rmse: float
+
+
+def predict_series(params: ModelParams, elapsed_sec: np.ndarray, thermal_conductivity: np.ndarray,
+                   temperature: float) -> np.ndarray:
+    """Model prediction at the measurement times of a series, anchored at its first measurement."""
+    return estimate_thermal_conductivity(
+        e_dash=params.e_dash,
+        experiment_temperature=temperature,
+        measurement_time_sec=elapsed_sec,
+        lamda_gas=params.lamda_gas,
+        initial_thermal_conductivity=thermal_conductivity[0],
+        k_0=params.k_0,
+    )
+
+
+def _check_training(train: Sequence[Series], fold: str):
+    short = [f"{temperature:g} °C ({len(elapsed_sec)} points)"
+             for elapsed_sec, _, temperature in train if len(elapsed_sec) < MIN_TRAINING_POINTS]
+    if short:
+        raise ValueError(f"{fold}: every training series needs at least {MIN_TRAINING_POINTS} measurements, "
+                         f"got {', '.join(short)}")
+
+
+def _fit_jobs(jobs: List[List[Series]], solver_config: SolverConfig, max_workers: Optional[int]) -> List[ModelParams]:
+    results = fit_series_jobs(jobs, solver_config, max_workers=max_workers)
+    return [ModelParams.from_solver(solver_params, solver_config.digit_conf) for solver_params, _ in results]
+
+
+def _errors(residuals: np.ndarray) -> Tuple[float, float]:
+    if len(residuals) == 0:
+        return float('nan'), float('nan')
+    return float(np.mean(np.abs(residuals))), float(np.sqrt(np.mean(residuals ** 2)))
+
+
+def time_holdout(series: Sequence[Series], cutoffs_days: Sequence[float], solver_config: SolverConfig,
+                 horizons_days: Sequence[float] = DEFAULT_HORIZONS_DAYS,
+                 max_workers: Optional[int] = None) -> List[HoldoutResult]:
+    """
+    Time-based holdout: fit on the early data, score the forecast of the late data.
+
+    For every cutoff, all series are truncated to the points measured up to the cutoff (boolean masks
+    of the float64 arrays converted once up front; each fold holds its own copy) and fitted jointly. The forecast error of the later points is
+    reported per horizon bin: a point ``d`` days after the cutoff falls into the first horizon >= ``d``;
+    points beyond the last horizon are not scored.
+    The fits of all cutoffs, plus a reference fit on all data, run in parallel.
+
+    Args:
+        series: (elapsed_sec, thermal_conductivity, temperature) of every experiment.
+        cutoffs_days: Training cutoffs [days].
+        solver_config (SolverConfig): Solver settings of every fit.
+        horizons_days: Upper edges of the horizon bins [days].
+        max_workers (int, optional): Number of worker processes.
+
+    Returns:
+        List[HoldoutResult]: One result per cutoff. ``lconv_change`` is the change of the predicted
+        long-term value Lconv relative to the fit on all data.
+
+    Raises:
+        ValueError: If a series keeps fewer than MIN_TRAINING_POINTS measurements up to a cutoff.
+    """
+    series = [(np.asarray(e, dtype=np.float64), np.asarray(c, dtype=np.float64), t) for e, c, t in series]
+    horizons_sec = np.asarray(horizons_days, dtype=np.float64) * 86400
+
+    jobs = [list(series)]
+    for cutoff_days in cutoffs_days:
+        cutoff_sec = cutoff_days * 86400
+        jobs.append([(e[e <= cutoff_sec], c[e <= cutoff_sec], t) for e, c, t in series])
+        _check_training(jobs[-1], f"cutoff {cutoff_days:g} days")
+    reference, *fold_params = _fit_jobs(jobs, solver_config, max_workers)
+
+    results = []
+    for cutoff_days, params, train in zip(cutoffs_days, fold_params, jobs[1:]):
+        cutoff_sec = cutoff_days * 86400
+        lead_sec, residuals = [], []
+        for elapsed_sec, thermal_conductivity, temperature in series:
+            test = elapsed_sec > cutoff_sec
+            predicted = predict_series(params, elapsed_sec, thermal_conductivity, temperature)
+            lead_sec.append(elapsed_sec[test] - cutoff_sec)
+            residuals.append(predicted[test] - thermal_conductivity[test])
+        lead_sec = np.concatenate(lead_sec)
+        residuals = np.concatenate(residuals)
+
+        bins = np.searchsorted(horizons_sec, lead_sec, side='left')
+        horizons = []
+        for i, horizon_days in enumerate(horizons_days):
+            mae, rmse = _errors(residuals[bins == i])
+            horizons.append(HorizonError(horizon_days=horizon_days, n_points=int(np.sum(bins == i)),
+                                         mae=mae, rmse=rmse))
+
+        results.append(HoldoutResult(
+            cutoff_days=cutoff_days,
+            params=params,
+            n_train=sum(len(e) for e, _, _ in train),
+            n_test=int(np.sum(bins < len(horizons_days))),
+            horizons=horizons,
+            # Lconv = λ0 + λgas, so the change only depends on λgas
+            lconv_change=params.lamda_gas - reference.lamda_gas,
+        ))
+    return results
+
+
+def leave_one_temperature_out(series: Sequence[Series], solver_config: SolverConfig,
+                              max_workers: Optional[int] = None) -> List[TemperatureFoldResult]:
+    """
+    Leave-one-temperature-out validation: fit without all series of one temperature, score on them.
+
+    The held-out series are predicted from their own first measurement (λ0 is measured, not fitted).
+    The folds run in parallel.
+
+    Args:
+        series: (elapsed_sec, thermal_conductivity, temperature) of every experiment.
+        solver_config (SolverConfig): Solver settings of every fit.
+        max_workers (int, optional): Number of worker processes.
+
+    Returns:
+        List[TemperatureFoldResult]: One result per distinct temperature.
+
+    Raises:
+        ValueError: If fewer than two temperatures are given, or a training series has fewer than
+            MIN_TRAINING_POINTS measurements.
+    """
+    groups: Dict[float, List[Series]] = {}
+    for elapsed_sec, thermal_conductivity, temperature in series:
+        groups.setdefault(float(temperature), []).append(
+            (np.asarray(elapsed_sec, dtype=np.float64), np.asarray(thermal_conductivity, dtype=np.float64),
+             temperature))
+    if len(groups) < 2:
+        raise ValueError("leave-one-temperature-out needs at least two temperatures")
+
+    temperatures = sorted(groups)
+    jobs = [[s for other in temperatures if other != temperature for s in groups[other]]
+            for temperature in temperatures]
+    for temperature, train in zip(temperatures, jobs):
+        _check_training(train, f"without {temperature:g} °C")
+    fold_params = _fit_jobs(jobs, solver_config, max_workers)
+
+    results = []
+    for temperature, params, train in zip(temperatures, fold_params, jobs):
+        residuals = np.concatenate([
+            predict_series(params, elapsed_sec, thermal_conductivity, temperature) - thermal_conductivity
+            for elapsed_sec, thermal_conductivity, _ in groups[temperature]
+        ])
+        mae, rmse = _errors(residuals)
+        results.append(TemperatureFoldResult(
+            temperature=temperature,
+            params=params,
+            n_train=sum(len(e) for e, _, _ in train),
+            n_test=len(residuals),
+            mae=mae,
+            rmse=rmse,
+        ))
+    return results
+
+
+def minimum_training_days(results: Sequence[HoldoutResult], max_rmse: float) -> Optional[float]:
+    """
+    Shortest training period whose forecast RMSE stays within ``max_rmse`` at every horizon.
+
+    Returns:
+        float: The cutoff [days], or None if no cutoff qualifies.
+    """
+    for result in sorted(results, key=lambda r: r.cutoff_days):
+        rmses = [h.rmse for h in result.horizons if h.n_points]
+        if rmses and max(rmses) <= max_rmse:
+            return result.cutoff_days
+    return None
@@ -6,6 +6,81 @@ from typing import List
 from internal.interface import Experiment, MeasurementData
 
 
+def experiment_from_dict(json_data) -> Experiment:
+    """
+    Create an Experiment dataclass object from its JSON dictionary (the write_interface format).
+
+    Args:
+        json_data (dict): The parsed JSON object.
+
+    Returns:
+        Experiment: The experiment data.
+    """
+    # Create Experiment object
+    experiment = Experiment(
+        id=json_data.get('id', ''),
+        sample_name=json_data.get('sample_name', ''),
+        thickness_mm=json_data.get('thickness_mm', 0.0),
+        initial_density=json_data.get('initial_density', 0.0),
+        temperature=json_data.get('temperature', 0.0),
+        humidity_memo=json_data.get('humidity_memo', '')
+    )
+
+    # Add measurements
+    for m_data in json_data.get('measurements', []):
+        # Parse measurement date
+        measurement_date = datetime.fromisoformat(m_data.get('measurement_date', datetime.now().isoformat()))
+
+        measurement = MeasurementData(
+            id=m_data.get('id', 0),
+            measurement_date=measurement_date,
+            elapsed_days=m_data.get('elapsed_days', 0),
+            thermal_conductivity=m_data.get('thermal_conductivity', 0.0),
+            thermal_conductivity_increase=m_data.get('thermal_conductivity_increase', 0.0),
+            elapsed_seconds=m_data.get('elapsed_seconds')
+        )
+        experiment.measurements.append(measurement)
+
+    return experiment
+
+
+def experiment_to_dict(experiment: Experiment) -> dict:
+    """
+    Convert an Experiment dataclass object to its JSON dictionary (the write_interface format).
+
+    Args:
+        experiment (Experiment): The experiment data.
+
+    Returns:
+        dict: JSON-serializable dictionary.
+    """
+    # Convert experiment to dictionary
+    experiment_dict = {
+        'id': experiment.id,
+        'sample_name': experiment.sample_name,
+        'thickness_mm': experiment.thickness_mm,
+        'initial_density': experiment.initial_density,
+        'temperature': experiment.temperature,
+        'humidity_memo': experiment.humidity_memo,
+        'measurements': []
+    }
+
+    # Add measurements
+    for measurement in experiment.measurements:
+        measurement_dict = {
+            'id': measurement.id,
+            'measurement_date': measurement.measurement_date.isoformat(),
+            'elapsed_days': measurement.elapsed_days,
+            'thermal_conductivity': measurement.thermal_conductivity,
+            'thermal_conductivity_increase': measurement.thermal_conductivity_increase
+        }
+        if measurement.elapsed_seconds is not None:
+            measurement_dict['elapsed_seconds'] = measurement.elapsed_seconds
+        experiment_dict['measurements'].append(measurement_dict)
+
+    return experiment_dict
+
+
 def read_interface(file_path):
     """
     Read and parse a JSON file into an Experiment dataclass object.
@@ -30,29 +105,7 @@ def read_interface(file_path):
         with open(file_path, 'r') as f:
             json_data = json.load(f)
 
-        # Create Experiment object
-        experiment = Experiment(
-            id=json_data.get('id', ''),
-            sample_name=json_data.get('sample_name', ''),
-            thickness_mm=json_data.get('thickness_mm', 0.0),
-            initial_density=json_data.get('initial_density', 0.0),
-            temperature=json_data.get('temperature', 0.0),
-            humidity_memo=json_data.get('humidity_memo', '')
-        )
-
-        # Add measurements
-        for m_data in json_data.get('measurements', []):
-            # Parse measurement date
-            measurement_date = datetime.fromisoformat(m_data.get('measurement_date', datetime.now().isoformat()))
-
-            measurement = MeasurementData(
-                id=m_data.get('id', 0),
-                measurement_date=measurement_date,
-                elapsed_days=m_data.get('elapsed_days', 0),
-                thermal_conductivity=m_data.get('thermal_conductivity', 0.0),
-                thermal_conductivity_increase=m_data.get('thermal_conductivity_increase', 0.0)
-            )
-            experiment.measurements.append(measurement)
+        experiment = experiment_from_dict(json_data)
 
         return experiment
 
@@ -81,27 +134,7 @@ def write_interface(experiment, file_path):
         if not isinstance(experiment, Experiment):
             raise TypeError("experiment must be an Experiment dataclass object")
 
-        # Convert experiment to dictionary
-        experiment_dict = {
-            'id': experiment.id,
-            'sample_name': experiment.sample_name,
-            'thickness_mm': experiment.thickness_mm,
-            'initial_density': experiment.initial_density,
-            'temperature': experiment.temperature,
-            'humidity_memo': experiment.humidity_memo,
-            'measurements': []
-        }
-
-        # Add measurements
-        for measurement in experiment.measurements:
-            measurement_dict = {
-                'id': measurement.id,
-                'measurement_date': measurement.measurement_date.isoformat(),
-                'elapsed_days': measurement.elapsed_days,
-                'thermal_conductivity': measurement.thermal_conductivity,
-                'thermal_conductivity_increase': measurement.thermal_conductivity_increase
-            }
-            experiment_dict['measurements'].append(measurement_dict)
+        experiment_dict = experiment_to_dict(experiment)
 
         # Write JSON to file
         with open(file_path, 'w') as f:
@@ -183,9 +216,12 @@ def add_measurement(experiment, measurements: List[MeasurementData]):
 
         if i > 0:
             # Calculate elapsed days from the first measurement
-            days_diff = (measurement.measurement_date - first_measurement.measurement_date).total_seconds() / 86400
-            measurement.elapsed_days = int(days_diff)
+            seconds_diff = (measurement.measurement_date - first_measurement.measurement_date).total_seconds()
+            measurement.elapsed_seconds = seconds_diff
+            measurement.elapsed_days = int(seconds_diff / 86400)
             measurement.thermal_conductivity_increase = measurement.thermal_conductivity - first_measurement.thermal_conductivity
+        else:
+            measurement.elapsed_seconds = 0.0
 
         experiment.measurements.append(measurement)
 
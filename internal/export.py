@@ -0,0 +1,190 @@
+import io
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from internal.calculator import CalculateTable, ModelParams, estimate_thermal_conductivity
+from internal.converter import experiment_converter
+from internal.interface import Experiment
+from internal.manifest import FitManifest
+
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+# Column names of the plot data (as in the CSV download of the app and the report archive)
+ELAPSED_DAYS = 'Elapsed Days'
+ACTUAL_CONDUCTIVITY = 'Actual Conductivity (W/(m･K))'
+ESTIMATED_CONDUCTIVITY = 'Estimated Conductivity (W/(m･K))'
+# Extra columns of the combined multi-sample file
+SAMPLE = 'Sample'
+TEMPERATURE = 'Temperature (°C)'
+
+# Key of the metadata in the Parquet/Arrow schema (CSV files are plain tables without metadata)
+METADATA_KEY = b"exposure"
+
+
+@dataclass
+class ReportSample:
+    """One fitted experiment of an export or report."""
+    experiment: Experiment
+    calculate_table: CalculateTable
+    params: ModelParams
+
+    @classmethod
+    def from_fit(cls, experiment: Experiment, params: ModelParams) -> 'ReportSample':
+        """Rebuild the calculation table of a stored fit from the experiment and its parameters."""
+        calculate_table = experiment_converter(experiment)
+        calculate_table.estimate_thermal_conductivity(params, experiment.temperature)
+        calculate_table.update_all_metrix()
+        return cls(experiment=experiment, calculate_table=calculate_table, params=params)
+
+
+def sample_columns(sample: ReportSample) -> Dict[str, np.ndarray]:
+    """Plot data of a sample as float64 columns, estimated from the fitted parameters in one vectorized pass."""
+    elapsed_sec, thermal_conductivity = sample.calculate_table.as_arrays()
+    if len(elapsed_sec):
+        estimated = estimate_thermal_conductivity(
+            e_dash=sample.params.e_dash,
+            experiment_temperature=sample.experiment.temperature,
+            measurement_time_sec=elapsed_sec,
+            lamda_gas=sample.params.lamda_gas,
+            initial_thermal_conductivity=thermal_conductivity[0],
+            k_0=sample.params.k_0,
+        )
+    else:
+        estimated = np.empty(0, dtype=np.float64)
+    return {
+        ELAPSED_DAYS: elapsed_sec / 86400,
+        ACTUAL_CONDUCTIVITY: thermal_conductivity,
+        ESTIMATED_CONDUCTIVITY: np.asarray(estimated, dtype=np.float64),
+    }
+
+
+def export_metadata(samples: Sequence[ReportSample], manifest: Optional[FitManifest] = None) -> dict:
+    """Sample names, temperatures and fitted parameters of the exported samples, plus the fit's score and input hash."""
+    metadata = {
+        'exported_at': date.today().isoformat(),
+        'samples': [{
+            'sample_name': sample.experiment.sample_name,
+            'temperature': sample.experiment.temperature,
+            'lamda_gas': sample.params.lamda_gas,
+            'e_dash': sample.params.e_dash,
+            'k_0': sample.params.k_0,
+        } for sample in samples],
+    }
+    if manifest is not None:
+        metadata['fit'] = {'score': manifest.score, 'input_hash': manifest.input_hash,
+                           'backend': manifest.solver_config.get('backend')}
+    return metadata
+
+
+def _combined_columns(samples: Sequence[ReportSample]) -> Dict[str, np.ndarray]:
+    columns = [sample_columns(sample) for sample in samples]
+    lengths = [len(column[ELAPSED_DAYS]) for column in columns]
+    return {
+        SAMPLE: np.repeat(np.array([sample.experiment.sample_name for sample in samples], dtype=object), lengths),
+        TEMPERATURE: np.repeat([sample.experiment.temperature for sample in samples], lengths).astype(np.float64),
+        **{name: np.concatenate([column[name] for column in columns]) for name in columns[0]},
+    }
+
+
+def _write_csv(columns: Dict[str, np.ndarray], buffer: io.BytesIO):
+    frame = pd.DataFrame(columns, copy=False)
+    text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    frame.to_csv(text, index=False)
+    text.detach()  # keep the buffer open
+
+
+def _arrow_table(columns: Dict[str, np.ndarray], metadata: dict):
+    import pyarrow as pa
+
+    arrays = {name: pa.array(values) for name, values in columns.items()}  # float64 columns are not copied
+    if SAMPLE in arrays:
+        arrays[SAMPLE] = arrays[SAMPLE].dictionary_encode()
+    table = pa.table(arrays)
+    return table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata, ensure_ascii=False).encode("utf-8")})
+
+
+def _write(columns: Dict[str, np.ndarray], metadata: dict, fmt: str) -> io.BytesIO:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (choose from {', '.join(EXPORT_FORMATS)})")
+    buffer = io.BytesIO()
+    if fmt == "csv":
+        _write_csv(columns, buffer)
+    else:
+        # pyarrow is only needed for the binary formats
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = _arrow_table(columns, metadata)
+        sink = pa.PythonFile(buffer, mode="w")
+        if fmt == "parquet":
+            pq.write_table(table, sink)
+        else:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    buffer.seek(0)
+    return buffer
+
+
+def export_sample(sample: ReportSample, fmt: str = "csv", manifest: Optional[FitManifest] = None) -> io.BytesIO:
+    """
+    Plot data of one sample as CSV, Parquet or Arrow (IPC file).
+
+    CSV files are plain tables with the columns of the app's CSV download; Parquet and Arrow files
+    embed the metadata (export_metadata) in their schema.
+
+    The file is written straight from the measurement arrays into the returned buffer, which can be
+    passed to ``st.download_button`` as is.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    return _write(sample_columns(sample), export_metadata([sample], manifest), fmt)
+
+
+def export_samples(samples: Sequence[ReportSample], fmt: str = "csv",
+                   manifest: Optional[FitManifest] = None) -> io.BytesIO:
+    """
+    Plot data of several samples in one file, with ``Sample`` and ``Temperature (°C)`` columns
+    (dictionary-encoded sample names in Parquet/Arrow). Parquet and Arrow files embed the metadata
+    of all samples.
+
+    Raises:
+        ValueError: If the format is unknown or there are no samples.
+    """
+    if not samples:
+        raise ValueError("No samples to export")
+    return _write(_combined_columns(samples), export_metadata(samples, manifest), fmt)
+
+
+def read_export_metadata(buffer, fmt: str) -> dict:
+    """
+    Metadata embedded by export_sample/export_samples in a Parquet or Arrow file or buffer.
+
+    Raises:
+        ValueError: If the format carries no metadata (CSV) or is unknown.
+    """
+    if fmt not in ("parquet", "arrow"):
+        raise ValueError(f"{fmt} exports carry no metadata")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(buffer) if fmt == "parquet" else pa.ipc.open_file(buffer).schema
+    return json.loads((schema.metadata or {}).get(METADATA_KEY, b"{}"))
+
+
+def export_file_name(fmt: str, sample: Optional[ReportSample] = None, index: int = 0) -> str:
+    """Download name: one sample as in the CSV download of the app, all samples as ``plot_data_<date>``."""
+    if sample is None:
+        return f"plot_data_{date.today()}.{fmt}"
+    return f"plot_data_sample{index + 1:02d}_{date.today()}_{sample.experiment.sample_name}.{fmt}"
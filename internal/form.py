@@ -1,33 +1,57 @@
+from typing import Sequence
+
 import pandas as pd
 import streamlit as st
 
-from internal.calculator import minimize_solver
+from internal.calculator import SolverConfig, minimize_solver
+from internal.cleaning import clean_measurements, measurement_frame
 from internal.converter import experiment_converter
-from internal.interface import create_experiment_with_measurement
+from internal.interface import Experiment, create_experiment_with_measurement
+from internal.profiling import PipelineProfiler
+from internal.robust import robust_minimize_solver
+from internal.scheduler import FitBudgetExceededError, FitCancelledError, FitScheduler, schedule_table_fit
 
 
-def create_experiment_form():
+def create_experiment_form(solver_config: SolverConfig = None, reject_outliers: bool = False,
+                           scheduler: FitScheduler = None, session_id: str = None, checkpoint_dir: str = None,
+                           profiler: PipelineProfiler = None, example_experiments: Sequence[Experiment] = None):
     """
     Create and display the experiment submission form with two sample tabs.
-    
+
+    Args:
+        solver_config (SolverConfig, optional): Solver settings used when the form is submitted.
+        reject_outliers (bool): Reject measurements with large residuals and refit (robust_minimize_solver).
+        scheduler (FitScheduler, optional): Run the fit through this shared scheduler instead of in the
+            script thread. A resubmission of the same session cancels its previous fit.
+        session_id (str, optional): Session the fit is scheduled for.
+        checkpoint_dir (str, optional): Checkpoint scheduled fits there, so a fit interrupted by a
+            rerun resumes when the same data is submitted again.
+        profiler (PipelineProfiler, optional): Profile the stages of the calculation. A scheduled fit
+            is profiled in its worker process.
+        example_experiments (sequence of Experiment, optional): Two experiments pre-filled into the
+            tabs (sample name, temperature and measurements), e.g. synthetic data.
+
     Returns:
         tuple: A tuple containing (submitted, experiment_1, calculate_table_1, calculate_table_2, optimized_params)
                where submitted is a boolean indicating if the form was submitted,
                and the other values are the created objects (None if not submitted).
     """
     st.header("Create New Experimental Data")
+    example_1, example_2 = example_experiments if example_experiments is not None else (None, None)
     tab1, tab2 = st.tabs(["sample1", "sample2"])
 
     with st.form("experiment_form"):
         with tab1:
-            sample_name_1 = st.text_input("Sample Name", value="condition 01", help="Required field", key="sample_name_1")
+            sample_name_1 = st.text_input("Sample Name", value=example_1.sample_name if example_1 else "condition 01",
+                                          help="Required field", key="sample_name_1")
             thickness_mm_1 = st.number_input("Thickness (mm) ", help="Optional field",value=None, min_value=0.0, step=0.1, key="thickness_mm_1")
             initial_density_1 = st.number_input("Initial Density (kg/m³) ", help="Optional field",value=None, min_value=0.0, step=0.1,
                                                  key="initial_density_1")
-            temperature_1 = st.number_input("Temperature (°C)",  help="Required field", value=None, step=0.1, key="temperature_1")
+            temperature_1 = st.number_input("Temperature (°C)",  help="Required field",
+                                            value=example_1.temperature if example_1 else None, step=0.1, key="temperature_1")
             humidity_memo_1 = st.text_input("Humidity Notes", help="Optional field", key="humidity_memo_1")
 
-            df = pd.DataFrame({
+            df = measurement_frame(example_1) if example_1 else pd.DataFrame({
                 "測定日": pd.to_datetime(['','','','','']),
                 "熱伝導率": [None,None,None,None,None],
             })
@@ -50,14 +74,16 @@ def create_experiment_form():
             )
 
         with tab2:
-            sample_name_2 = st.text_input("Sample Name", value="condition 02", help="Required field", key="sample_name_2")
+            sample_name_2 = st.text_input("Sample Name", value=example_2.sample_name if example_2 else "condition 02",
+                                          help="Required field", key="sample_name_2")
             thickness_mm_2 = st.number_input("Thickness (mm) ", help="Optional field", value=None, min_value=0.0, step=0.1, key="thickness_mm_2")
             initial_density_2 = st.number_input("Initial Density (kg/m³) ",help="Optional field",value=None, min_value=0.0, step=0.1,
                                                 key="initial_density_2")
-            temperature_2 = st.number_input("Temperature (°C)", help="Required field",value=None, step=0.1, key="temperature_2")
+            temperature_2 = st.number_input("Temperature (°C)", help="Required field",
+                                            value=example_2.temperature if example_2 else None, step=0.1, key="temperature_2")
             humidity_memo_2 = st.text_input("Humidity Notes", help="Optional field", key="humidity_memo_2")
 
-            df_2 = pd.DataFrame({
+            df_2 = measurement_frame(example_2) if example_2 else pd.DataFrame({
                 "測定日": pd.to_datetime(['','','','','']),
                 "熱伝導率": [None,None,None,None,None],
             })
@@ -82,30 +108,82 @@ def create_experiment_form():
         submitted = st.form_submit_button("Calculate")
 
         if submitted:
-            # Create experiment 1
-            experiment_1 = create_experiment_with_measurement(
-                sample_name=sample_name_1,
-                thickness_mm=thickness_mm_1,
-                initial_density=initial_density_1,
-                temperature=temperature_1,
-                humidity_memo=humidity_memo_1,
-                measurements=edited_df_1
-            )
-            calculate_table_1 = experiment_converter(experiment_1)
-
-            # Create experiment 2
-            experiment_2 = create_experiment_with_measurement(
-                sample_name=sample_name_2,
-                thickness_mm=thickness_mm_2,
-                initial_density=initial_density_2,
-                temperature=temperature_2,
-                humidity_memo=humidity_memo_2,
-                measurements=edited_df_2
-            )
-            calculate_table_2 = experiment_converter(experiment_2)
+            # 入力データの検証とクリーニング（ソルバーを回す前に不正な入力を弾く）
+            measurements_1, report_1 = clean_measurements(edited_df_1)
+            measurements_2, report_2 = clean_measurements(edited_df_2)
+            errors = [f"{label}: {issue.message}"
+                      for label, report in (("sample1", report_1), ("sample2", report_2))
+                      for issue in report.errors]
+            errors += [f"{label}: temperature is required"
+                       for label, temperature in (("sample1", temperature_1), ("sample2", temperature_2))
+                       if temperature is None]
+            for label, report in (("sample1", report_1), ("sample2", report_2)):
+                for issue in report.warnings:
+                    st.warning(f"{label}: {issue.message}")
+            if errors:
+                for error in errors:
+                    st.error(error)
+                return False, None, None, None, None, None
+
+            if profiler is None:
+                profiler = PipelineProfiler()
+
+            with profiler.stage("create_experiment_with_measurement"):
+                # Create experiment 1
+                experiment_1 = create_experiment_with_measurement(
+                    sample_name=sample_name_1,
+                    thickness_mm=thickness_mm_1,
+                    initial_density=initial_density_1,
+                    temperature=temperature_1,
+                    humidity_memo=humidity_memo_1,
+                    measurements=measurements_1
+                )
+
+                # Create experiment 2
+                experiment_2 = create_experiment_with_measurement(
+                    sample_name=sample_name_2,
+                    thickness_mm=thickness_mm_2,
+                    initial_density=initial_density_2,
+                    temperature=temperature_2,
+                    humidity_memo=humidity_memo_2,
+                    measurements=measurements_2
+                )
+
+            with profiler.stage("experiment_converter"):
+                calculate_table_1 = experiment_converter(experiment_1)
+                calculate_table_2 = experiment_converter(experiment_2)
 
-            # Optimize parameters
-            optimized_params = minimize_solver(calculate_table_1, calculate_table_2, temperature_1, temperature_2)
+            # Optimize parameters (a scheduled fit is profiled in its worker process)
+            if scheduler is not None:
+                try:
+                    optimized_params, keep_masks = schedule_table_fit(
+                        scheduler, session_id, (calculate_table_1, calculate_table_2),
+                        (temperature_1, temperature_2), solver_config=solver_config,
+                        reject_outliers=reject_outliers, checkpoint_dir=checkpoint_dir, profiler=profiler)
+                except FitCancelledError:
+                    st.error("The calculation was cancelled by a newer submission. "
+                             "Its progress is kept and resumes when the same data is calculated again.")
+                    return False, None, None, None, None, None
+                except FitBudgetExceededError as e:
+                    st.error(f"The calculation was stopped: {e}. Try a faster solver preset.")
+                    return False, None, None, None, None, None
+            else:
+                with profiler.stage("minimize_solver"):
+                    if reject_outliers:
+                        robust_fit = robust_minimize_solver(calculate_table_1, calculate_table_2,
+                                                            temperature_1, temperature_2, solver_config=solver_config)
+                        optimized_params, keep_masks = robust_fit.optimized_params, robust_fit.keep
+                    else:
+                        optimized_params = minimize_solver(calculate_table_1, calculate_table_2,
+                                                           temperature_1, temperature_2, solver_config=solver_config)
+                        keep_masks = None
+            if keep_masks is not None:
+                for label, experiment, keep in (("sample1", experiment_1, keep_masks[0]),
+                                                ("sample2", experiment_2, keep_masks[1])):
+                    rejected = [experiment.measurements[i].measurement_date.strftime("%Y-%m-%d")
+                                for i in (~keep).nonzero()[0]]
+                    if rejected:
+                        st.info(f"{label}: excluded from the fit as outliers: {', '.join(rejected)}")
 
             # Show success message
             st.success(f"Experiment created successfully!")
@@ -12,10 +12,13 @@ class MeasurementData:
     elapsed_days: int = 0  # output only
     thermal_conductivity: float = 0.0
     thermal_conductivity_increase: float = 0.0  # output only
+    elapsed_seconds: Optional[float] = None  # output only, exact (sub-day) elapsed time
 
     # For compatibility with converter.py
     @property
-    def elapsed_sec(self) -> int:
+    def elapsed_sec(self) -> float:
+        if self.elapsed_seconds is not None:
+            return self.elapsed_seconds
         return self.elapsed_days * 86400
 
 
@@ -39,7 +42,12 @@ def create_experiment_with_measurement(
         humidity_memo: str,
         measurements: pd.DataFrame
 ) -> Experiment:
-    """Create an Experiment with measurements from a pandas DataFrame."""
+    """
+    Create an Experiment with measurements from a pandas DataFrame.
+
+    The frame is expected to be cleaned already (see internal.cleaning.clean_measurements):
+    sorted by date, without blank or duplicate rows.
+    """
     experiment = Experiment(
         sample_name=sample_name,
         thickness_mm=thickness_mm,
@@ -65,8 +73,11 @@ def create_experiment_with_measurement(
         for i, measurement in enumerate(measurement_data):
             if i > 0:
                 # Calculate elapsed days from the first measurement
-                days_diff = (measurement.measurement_date - first_measurement.measurement_date).total_seconds() / 86400
-                measurement.elapsed_days = int(days_diff)
+                seconds_diff = (measurement.measurement_date - first_measurement.measurement_date).total_seconds()
+                measurement.elapsed_seconds = seconds_diff
+                measurement.elapsed_days = int(seconds_diff / 86400)
                 measurement.thermal_conductivity_increase = measurement.thermal_conductivity - first_measurement.thermal_conductivity
+            else:
+                measurement.elapsed_seconds = 0.0
 
     return experiment
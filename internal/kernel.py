@@ -0,0 +1,210 @@
+import math
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from internal.const import R_gas_constant, kelvin_constant
+
+# numba is optional: when it is installed the fused kernels are JIT-compiled,
+# otherwise the pure NumPy implementations below are used.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+
+@dataclass(frozen=True)
+class PackedSeries:
+    """
+    Measurement series of several experiments packed into flat float64 arrays.
+
+    Series ``i`` occupies ``elapsed_sec[offsets[i]:offsets[i + 1]]`` (and the same
+    slice of ``thermal_conductivity``) and was measured at ``temperatures[i]``.
+    """
+    elapsed_sec: np.ndarray
+    thermal_conductivity: np.ndarray
+    offsets: np.ndarray
+    temperatures: np.ndarray
+
+    @property
+    def n_series(self) -> int:
+        return len(self.temperatures)
+
+    def series_index(self) -> np.ndarray:
+        """Index of the series each packed measurement belongs to."""
+        return np.repeat(np.arange(self.n_series), np.diff(self.offsets))
+
+    def subset(self, start: int, stop: int) -> 'PackedSeries':
+        """
+        Return series ``start`` to ``stop - 1`` as a new PackedSeries.
+
+        The measurement arrays of the result are views into this one (no copy).
+        """
+        first, last = self.offsets[start], self.offsets[stop]
+        return PackedSeries(
+            elapsed_sec=self.elapsed_sec[first:last],
+            thermal_conductivity=self.thermal_conductivity[first:last],
+            offsets=self.offsets[start:stop + 1] - first,
+            temperatures=self.temperatures[start:stop],
+        )
+
+    def select(self, keep: np.ndarray) -> 'PackedSeries':
+        """
+        Return the measurements where ``keep`` is True as a new PackedSeries.
+
+        ``keep`` is a boolean mask over the packed measurements; the series layout is preserved.
+        """
+        keep = np.asarray(keep, dtype=bool)
+        offsets = np.zeros_like(self.offsets)
+        offsets[1:] = np.cumsum(np.bincount(self.series_index()[keep], minlength=self.n_series))
+        return PackedSeries(
+            elapsed_sec=self.elapsed_sec[keep],
+            thermal_conductivity=self.thermal_conductivity[keep],
+            offsets=offsets,
+            temperatures=self.temperatures,
+        )
+
+
+def pack_series(series: Sequence[Tuple[np.ndarray, np.ndarray, float]]) -> PackedSeries:
+    """
+    Pack ``(elapsed_sec, thermal_conductivity, temperature)`` triples into a PackedSeries.
+
+    Args:
+        series: One triple per experiment.
+
+    Returns:
+        PackedSeries: The contiguous representation used by the kernels.
+    """
+    lengths = [len(elapsed_sec) for elapsed_sec, _, _ in series]
+    offsets = np.zeros(len(series) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(lengths)
+    elapsed_sec = np.ascontiguousarray(
+        np.concatenate([np.asarray(e, dtype=np.float64) for e, _, _ in series]) if series else np.empty(0))
+    thermal_conductivity = np.ascontiguousarray(
+        np.concatenate([np.asarray(c, dtype=np.float64) for _, c, _ in series]) if series else np.empty(0))
+    temperatures = np.array([t for _, _, t in series], dtype=np.float64)
+    return PackedSeries(
+        elapsed_sec=elapsed_sec,
+        thermal_conductivity=thermal_conductivity,
+        offsets=offsets,
+        temperatures=temperatures,
+    )
+
+
+def _series_area_numpy(lamda_gas, e_dash, k_0, temperature, elapsed_sec, thermal_conductivity):
+    if len(elapsed_sec) < 2:
+        return 0.0
+    initial_thermal_conductivity = thermal_conductivity[0]
+    abs_temperature = temperature + kelvin_constant
+    inner_exponent = -e_dash / (R_gas_constant * abs_temperature)
+    middle_term = k_0 * elapsed_sec * np.exp(inner_exponent)
+    estimated = -lamda_gas * (np.exp(-middle_term) - 1) + initial_thermal_conductivity
+    diff = np.abs(thermal_conductivity - estimated)
+    return float(np.sum((diff[1:] + diff[:-1]) / 2 * np.diff(elapsed_sec)))
+
+
+def _total_area_numpy(params, packed: PackedSeries):
+    lamda_gas, e_dash, k_0 = params
+    total = 0.0
+    for i in range(packed.n_series):
+        start, stop = packed.offsets[i], packed.offsets[i + 1]
+        total += _series_area_numpy(
+            lamda_gas, e_dash, k_0, packed.temperatures[i],
+            packed.elapsed_sec[start:stop], packed.thermal_conductivity[start:stop],
+        )
+    return total
+
+
+def _population_area_numpy(population, packed: PackedSeries):
+    # population: (S, 3) actual parameter values, evaluated by broadcasting over (S, n)
+    lamda_gas = population[:, 0:1]
+    e_dash = population[:, 1:2]
+    k_0 = population[:, 2:3]
+    total = np.zeros(population.shape[0])
+    for i in range(packed.n_series):
+        start, stop = packed.offsets[i], packed.offsets[i + 1]
+        if stop - start < 2:
+            continue
+        elapsed_sec = packed.elapsed_sec[start:stop]
+        thermal_conductivity = packed.thermal_conductivity[start:stop]
+        abs_temperature = packed.temperatures[i] + kelvin_constant
+        inner_exponent = -e_dash / (R_gas_constant * abs_temperature)
+        middle_term = k_0 * elapsed_sec * np.exp(inner_exponent)
+        estimated = -lamda_gas * (np.exp(-middle_term) - 1) + thermal_conductivity[0]
+        diff = np.abs(thermal_conductivity - estimated)
+        total += np.sum((diff[:, 1:] + diff[:, :-1]) / 2 * np.diff(elapsed_sec), axis=1)
+    return total
+
+
+if HAS_NUMBA:
+    @numba.njit(cache=True)
+    def _total_area_jit(lamda_gas, e_dash, k_0, elapsed_sec, thermal_conductivity, offsets, temperatures):
+        total = 0.0
+        for i in range(temperatures.shape[0]):
+            start = offsets[i]
+            stop = offsets[i + 1]
+            if stop - start < 2:
+                continue
+            initial_thermal_conductivity = thermal_conductivity[start]
+            abs_temperature = temperatures[i] + kelvin_constant
+            rate = math.exp(-e_dash / (R_gas_constant * abs_temperature))
+            prev_diff = 0.0
+            for j in range(start, stop):
+                middle_term = k_0 * elapsed_sec[j] * rate
+                estimated = -lamda_gas * (math.exp(-middle_term) - 1) + initial_thermal_conductivity
+                diff = abs(thermal_conductivity[j] - estimated)
+                if j > start:
+                    total += (prev_diff + diff) / 2 * (elapsed_sec[j] - elapsed_sec[j - 1])
+                prev_diff = diff
+        return total
+
+    @numba.njit(cache=True, parallel=True)
+    def _population_area_jit(population, elapsed_sec, thermal_conductivity, offsets, temperatures):
+        result = np.empty(population.shape[0])
+        for s in numba.prange(population.shape[0]):
+            result[s] = _total_area_jit(
+                population[s, 0], population[s, 1], population[s, 2],
+                elapsed_sec, thermal_conductivity, offsets, temperatures,
+            )
+        return result
+
+
+def total_area(params, packed: PackedSeries, use_jit: bool = True) -> float:
+    """
+    Sum of the trapezoid areas between measured and estimated conductivity over all series.
+
+    Args:
+        params: Actual (scaled) values of (lamda_gas, e_dash, k_0).
+        packed (PackedSeries): The measurement series.
+        use_jit (bool): Use the numba kernel when numba is installed.
+
+    Returns:
+        float: The total difference area.
+    """
+    lamda_gas, e_dash, k_0 = (float(p) for p in params)
+    if use_jit and HAS_NUMBA:
+        return _total_area_jit(lamda_gas, e_dash, k_0, packed.elapsed_sec, packed.thermal_conductivity,
+                               packed.offsets, packed.temperatures)
+    return _total_area_numpy((lamda_gas, e_dash, k_0), packed)
+
+
+def population_area(population: np.ndarray, packed: PackedSeries, use_jit: bool = True) -> np.ndarray:
+    """
+    Vectorized total_area for a whole population of candidates.
+
+    Args:
+        population (np.ndarray): Array of shape (S, 3) with actual (lamda_gas, e_dash, k_0) values.
+        packed (PackedSeries): The measurement series.
+        use_jit (bool): Use the parallel numba kernel when numba is installed.
+
+    Returns:
+        np.ndarray: Total difference area per candidate, shape (S,).
+    """
+    population = np.ascontiguousarray(population, dtype=np.float64)
+    if use_jit and HAS_NUMBA:
+        return _population_area_jit(population, packed.elapsed_sec, packed.thermal_conductivity,
+                                    packed.offsets, packed.temperatures)
+    return _population_area_numpy(population, packed)
@@ -0,0 +1,228 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from internal.calculator import ModelParams, estimate_thermal_conductivity, rate_constant, time_to_fraction_sec
+from internal.store import ExperimentStore
+
+# Default grids: -20 to 80 °C in 1 °C steps, 0.1 day to 100 years (log-spaced), 1-99.9 % of the increase
+DEFAULT_TEMPERATURES = np.arange(-20.0, 80.0 + 0.5, 1.0)
+DEFAULT_TIMES_DAYS = np.geomspace(0.1, 100 * 365.0, 256)
+DEFAULT_FRACTIONS = np.concatenate([np.arange(0.01, 0.99, 0.01), [0.99, 0.995, 0.999]])
+
+
+def _fraction_axis(fraction):
+    return np.log(-np.log1p(-np.asarray(fraction, dtype=np.float64)))
+
+
+def _interpolate(grid_x: np.ndarray, grid_y: np.ndarray, values: np.ndarray, x, y,
+                 extrapolate_y: bool = False) -> np.ndarray:
+    # Vectorized bilinear interpolation on a regular (not necessarily uniform) grid; NaN outside the grid
+    # (with extrapolate_y=True extrapolated linearly along y from the edge cells instead)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x, y = np.broadcast_arrays(x, y)
+    outside = ~((x >= grid_x[0]) & (x <= grid_x[-1]))
+    if not extrapolate_y:
+        outside |= ~((y >= grid_y[0]) & (y <= grid_y[-1]))
+    i = np.clip(np.searchsorted(grid_x, x, side='right') - 1, 0, len(grid_x) - 2)
+    j = np.clip(np.searchsorted(grid_y, y, side='right') - 1, 0, len(grid_y) - 2)
+    wx = (x - grid_x[i]) / (grid_x[i + 1] - grid_x[i])
+    wy = (y - grid_y[j]) / (grid_y[j + 1] - grid_y[j])
+    values = values.astype(np.float64, copy=False)
+    result = ((1 - wx) * (1 - wy) * values[i, j] + wx * (1 - wy) * values[i + 1, j]
+              + (1 - wx) * wy * values[i, j + 1] + wx * wy * values[i + 1, j + 1])
+    return np.where(outside, np.nan, result)
+
+
+@dataclass
+class LookupTable:
+    """
+    Precomputed model values of one material.
+
+    ``conductivity[i, j]`` is λ at ``temperatures[i]`` after ``times_days[j]``;
+    ``log_time_to_fraction[i, j]`` is ln(time [days]) after which the increase reaches
+    ``fractions[j]`` of λgas at ``temperatures[i]``. The tables are float32. Queries are bilinear
+    interpolations on axes where the model is nearly linear (ln time, ln(−ln(1 − fraction))). Queries
+    outside the tabulated temperatures and times give NaN; along the fraction axis, where ln(time) is
+    exactly linear, they are extrapolated.
+    """
+    material: str
+    params: ModelParams
+    initial_thermal_conductivity: float
+    temperatures: np.ndarray
+    times_days: np.ndarray
+    fractions: np.ndarray
+    conductivity: np.ndarray
+    log_time_to_fraction: np.ndarray
+
+    @property
+    def lconv(self) -> float:
+        """Long-term converged value Lconv = λ0 + λgas [W/(m･K)]."""
+        return self.initial_thermal_conductivity + self.params.lamda_gas
+
+    def conductivity_at(self, temperature, time_days) -> np.ndarray:
+        """
+        λ [W/(m･K)] at ``temperature`` [°C] after ``time_days``; broadcasts over arrays.
+
+        A time of 0 gives λ0; temperatures and other times outside the tabulated grid give NaN.
+        """
+        time_days = np.asarray(time_days, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_time = np.log(time_days)
+        conductivity = _interpolate(self.temperatures, np.log(self.times_days), self.conductivity,
+                                    temperature, log_time)
+        temperature = np.asarray(temperature, dtype=np.float64)
+        tabulated = (temperature >= self.temperatures[0]) & (temperature <= self.temperatures[-1])
+        initial = np.where(tabulated, self.initial_thermal_conductivity, np.nan)
+        return np.where(time_days == 0, initial, conductivity)
+
+    def time_to_fraction_days(self, temperature, fraction) -> np.ndarray:
+        """
+        Days until λ − λ0 reaches ``fraction`` of λgas at ``temperature`` [°C]; broadcasts over arrays.
+
+        As in the analytic model, a fraction of 0 gives 0 and fractions >= 1 give inf (never reached);
+        negative or NaN fractions and temperatures outside the tabulated grid give NaN.
+        """
+        fraction = np.asarray(fraction, dtype=np.float64)
+        inside = (fraction > 0) & (fraction < 1)
+        # On the axis ln(−ln(1 − fraction)) ln(time) is exactly linear in the fraction, so fractions
+        # outside the tabulated range are extrapolated rather than clamped
+        days = np.exp(_interpolate(self.temperatures, _fraction_axis(self.fractions), self.log_time_to_fraction,
+                                   temperature, _fraction_axis(np.where(inside, fraction, 0.5)), extrapolate_y=True))
+        # days is NaN exactly where the temperature is outside the grid
+        days_or_edge = np.where(inside, days, np.where(fraction == 0, 0.0, np.where(fraction >= 1, np.inf, np.nan)))
+        return np.where(np.isnan(days), np.nan, days_or_edge)
+
+    def time_to_lconv_fraction_days(self, temperature, fraction_of_lconv) -> np.ndarray:
+        """
+        Days until λ reaches ``fraction_of_lconv`` of Lconv (e.g. 0.95 for 95 % of Lconv).
+
+        Fractions in (0, λ0 / Lconv] give 0 (already reached), fractions >= 1 give inf (Lconv is only
+        approached) and fractions <= 0 or NaN give NaN.
+        """
+        fraction_of_lconv = np.asarray(fraction_of_lconv, dtype=np.float64)
+        increase = (fraction_of_lconv * self.lconv - self.initial_thermal_conductivity) / self.params.lamda_gas
+        days = self.time_to_fraction_days(temperature, np.maximum(increase, 0.0))
+        return np.where(fraction_of_lconv > 0, days, np.nan)
+
+    def to_arrays(self, prefix: str = "") -> Dict[str, np.ndarray]:
+        return {
+            f"{prefix}material": np.array(self.material),
+            f"{prefix}params": np.array(self.params, dtype=np.float64),
+            f"{prefix}initial_thermal_conductivity": np.array(self.initial_thermal_conductivity),
+            f"{prefix}temperatures": self.temperatures,
+            f"{prefix}times_days": self.times_days,
+            f"{prefix}fractions": self.fractions,
+            f"{prefix}conductivity": self.conductivity,
+            f"{prefix}log_time_to_fraction": self.log_time_to_fraction,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str = "") -> 'LookupTable':
+        return cls(
+            material=str(arrays[f"{prefix}material"]),
+            params=ModelParams(*(float(value) for value in arrays[f"{prefix}params"])),
+            initial_thermal_conductivity=float(arrays[f"{prefix}initial_thermal_conductivity"]),
+            temperatures=arrays[f"{prefix}temperatures"].astype(np.float64),
+            times_days=arrays[f"{prefix}times_days"].astype(np.float64),
+            fractions=arrays[f"{prefix}fractions"].astype(np.float64),
+            conductivity=arrays[f"{prefix}conductivity"],
+            log_time_to_fraction=arrays[f"{prefix}log_time_to_fraction"],
+        )
+
+
+def build_lookup_table(material: str, params: ModelParams, initial_thermal_conductivity: float,
+                       temperatures: Sequence[float] = DEFAULT_TEMPERATURES,
+                       times_days: Sequence[float] = DEFAULT_TIMES_DAYS,
+                       fractions: Sequence[float] = DEFAULT_FRACTIONS) -> LookupTable:
+    """
+    Evaluate the model of one material on the temperature × time and temperature × fraction grids.
+
+    Args:
+        material (str): Material (sample) name.
+        params (ModelParams): Fitted parameters.
+        initial_thermal_conductivity (float): λ0 [W/(m･K)].
+        temperatures: Ascending temperature grid [°C].
+        times_days: Ascending, positive time grid [days].
+        fractions: Ascending fractions of λgas in (0, 1).
+
+    Returns:
+        LookupTable: The tables of the material.
+    """
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    times_days = np.asarray(times_days, dtype=np.float64)
+    fractions = np.asarray(fractions, dtype=np.float64)
+    conductivity = estimate_thermal_conductivity(
+        e_dash=params.e_dash,
+        experiment_temperature=temperatures[:, None],
+        measurement_time_sec=times_days[None, :] * 86400,
+        lamda_gas=params.lamda_gas,
+        initial_thermal_conductivity=initial_thermal_conductivity,
+        k_0=params.k_0,
+    )
+    log_time = np.log(time_to_fraction_sec(params, temperatures[:, None], fractions[None, :]) / 86400)
+    return LookupTable(
+        material=material,
+        params=params,
+        initial_thermal_conductivity=float(initial_thermal_conductivity),
+        temperatures=temperatures,
+        times_days=times_days,
+        fractions=fractions,
+        conductivity=conductivity.astype(np.float32),
+        log_time_to_fraction=log_time.astype(np.float32),
+    )
+
+
+def build_lookup_tables_from_store(store: ExperimentStore, materials: Sequence[str], limit: int = 1000,
+                                   max_score: Optional[float] = None, **grids) -> Dict[str, LookupTable]:
+    """
+    Build one lookup table per material from the latest fit of that material in the fit history.
+
+    A fit belongs to a material if the sample name of every fitted experiment is the material name.
+    λ0 of the table is the mean first measurement of the fitted experiments: each series is fitted
+    relative to its own first measurement, and the experiments of one material differ only in
+    temperature, so their mean is the table's single estimate of the unaged conductivity.
+
+    Args:
+        store (ExperimentStore): The experiment store.
+        materials (Sequence[str]): Material (sample) names to build tables for.
+        limit (int): Number of latest fits of each material considered.
+        max_score (float, optional): Skip fits with a worse score.
+        **grids: temperatures, times_days and fractions passed to build_lookup_table.
+
+    Returns:
+        Dict[str, LookupTable]: Tables keyed by material.
+
+    Raises:
+        ValueError: If a material has no matching fit.
+    """
+    tables = {}
+    for material in materials:
+        for record in store.query_fits(sample_name=material, limit=limit, max_score=max_score):
+            experiments = [store.get_experiment(experiment_id) for experiment_id in record.experiment_ids]
+            if all(experiment.sample_name == material and experiment.measurements for experiment in experiments):
+                break
+        else:
+            raise ValueError(f"no fit of material {material!r} in the store")
+        initial_thermal_conductivity = float(np.mean(
+            [experiment.measurements[0].thermal_conductivity for experiment in experiments]))
+        params = ModelParams(record.lamda_gas, record.e_dash, record.k_0)
+        tables[material] = build_lookup_table(material, params, initial_thermal_conductivity, **grids)
+    return tables
+
+
+def save_lookup_tables(tables: Dict[str, LookupTable], file_path):
+    """Write the tables of all materials to one compressed .npz file."""
+    arrays = {}
+    for index, table in enumerate(tables.values()):
+        arrays.update(table.to_arrays(prefix=f"{index}/"))
+    np.savez_compressed(file_path, n_tables=np.array(len(tables)), **arrays)
+
+
+def load_lookup_tables(file_path) -> Dict[str, LookupTable]:
+    """Read the tables written by save_lookup_tables, keyed by material."""
+    with np.load(file_path) as arrays:
+        tables = [LookupTable.from_arrays(arrays, prefix=f"{index}/") for index in range(int(arrays["n_tables"]))]
+    return {table.material: table for table in tables}
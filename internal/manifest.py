@@ -0,0 +1,109 @@
+import hashlib
+import json
+import platform
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import scipy
+
+from internal.kernel import HAS_NUMBA, PackedSeries
+
+
+@dataclass
+class FitManifest:
+    """Record of a single fit: what went in, how it was solved and what came out."""
+    input_hash: str
+    solver_config: Dict
+    library_versions: Dict[str, str]
+    n_evaluations: int
+    wall_time_sec: float
+    solver_params: List[float]
+    score: float
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    rejected_points: Optional[List[int]] = None  # packed indices excluded by a robust fit
+    alternatives: Optional[List[Dict]] = None  # distinct minima of the hybrid backend: solver_params, score
+
+
+def hash_inputs(packed: PackedSeries) -> str:
+    """
+    Compute a content hash of the measurement series fed to the solver.
+
+    Args:
+        packed (PackedSeries): The packed measurement series.
+
+    Returns:
+        str: Hex SHA-256 digest over the series arrays and temperatures.
+    """
+    digest = hashlib.sha256()
+    for array in (packed.offsets, packed.temperatures, packed.elapsed_sec, packed.thermal_conductivity):
+        array = np.ascontiguousarray(array)
+        digest.update(str(array.dtype).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def library_versions() -> Dict[str, str]:
+    """Versions of the libraries that determine the numerical result of a fit."""
+    versions = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+    }
+    if HAS_NUMBA:
+        import numba
+        versions['numba'] = numba.__version__
+    return versions
+
+
+def write_manifest(manifest: FitManifest, file_path):
+    """
+    Write a FitManifest to a JSON file.
+
+    Args:
+        manifest (FitManifest): The manifest to write.
+        file_path (str): Path where the JSON file should be written.
+    """
+    with open(file_path, 'w') as f:
+        json.dump(asdict(manifest), f, indent=2)
+
+
+def read_manifest(file_path) -> FitManifest:
+    """
+    Read a FitManifest from a JSON file.
+
+    Args:
+        file_path (str): Path to the JSON file.
+
+    Returns:
+        FitManifest: The parsed manifest.
+    """
+    with open(file_path, 'r') as f:
+        return FitManifest(**json.load(f))
+
+
+def verify_manifest(manifest: FitManifest, packed: PackedSeries, solver_config: Dict) -> List[str]:
+    """
+    Check whether a cached fit result is valid for the given inputs and solver configuration.
+
+    A rerun reproduces the manifest bit for bit only if the inputs, the solver configuration
+    (including the seed) and the library versions are all identical.
+
+    Args:
+        manifest (FitManifest): The manifest of the cached fit.
+        packed (PackedSeries): The measurement series of the new request.
+        solver_config (dict): The solver configuration of the new request.
+
+    Returns:
+        List[str]: Human-readable mismatches; an empty list means the cached result can be reused.
+    """
+    mismatches = []
+    if manifest.input_hash != hash_inputs(packed):
+        mismatches.append("input data differs")
+    if manifest.solver_config != solver_config:
+        mismatches.append("solver configuration differs")
+    current_versions = library_versions()
+    if manifest.library_versions != current_versions:
+        mismatches.append(f"library versions differ: {manifest.library_versions} != {current_versions}")
+    return mismatches
@@ -0,0 +1,61 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from internal.calculator import SolverConfig, resolve_seed, solve_packed
+from internal.kernel import pack_series
+from internal.manifest import FitManifest
+from internal.shared import SharedSeries, SharedSeriesHandle, attach_series, detach_series
+
+# One fit job: the (elapsed_sec, thermal_conductivity, temperature) series fitted together
+SeriesJob = Sequence[Tuple[np.ndarray, np.ndarray, float]]
+
+
+def _solve_job(handle: SharedSeriesHandle, start: int, stop: int, normalizer_sec: float,
+               solver_config: SolverConfig) -> Tuple[np.ndarray, FitManifest]:
+    # Runs in a worker process: only the handle, indices and scalars were pickled
+    try:
+        return solve_packed(attach_series(handle).subset(start, stop), normalizer_sec, solver_config)
+    finally:
+        detach_series(handle)
+
+
+def fit_series_jobs(jobs: Sequence[SeriesJob], solver_config: SolverConfig,
+                    max_workers: Optional[int] = None) -> List[Tuple[np.ndarray, FitManifest]]:
+    """
+    Fit many independent jobs in parallel processes.
+
+    The series of all jobs are copied once into a single shared memory block. Workers attach to it
+    zero-copy and return only the solver parameters and the manifest of each fit. Each job is
+    normalized by the last elapsed time of its first series, as in minimize_solver.
+
+    Args:
+        jobs: One sequence of (elapsed_sec, thermal_conductivity, temperature) series per fit.
+        solver_config (SolverConfig): Solver settings for every job. ``workers`` is forced to 1
+            because the jobs themselves are already spread over processes.
+        max_workers (int, optional): Number of worker processes.
+
+    Returns:
+        List[tuple]: (solver parameters, FitManifest) per job, in input order.
+    """
+    solver_config = replace(resolve_seed(solver_config), workers=1)
+    packed = pack_series([series for job in jobs for series in job])
+
+    slices = []
+    start = 0
+    for job in jobs:
+        stop = start + len(job)
+        first_elapsed_sec = job[0][0] if len(job) else ()
+        normalizer_sec = float(first_elapsed_sec[-1]) if len(first_elapsed_sec) else 0.0
+        slices.append((start, stop, normalizer_sec))
+        start = stop
+
+    with SharedSeries(packed) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_solve_job, shared.handle, start, stop, normalizer_sec, solver_config)
+                for start, stop, normalizer_sec in slices
+            ]
+            return [future.result() for future in futures]
@@ -0,0 +1,165 @@
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# EXPOSURE_PROFILE=1 profiles every calculation; the files go to EXPOSURE_PROFILE_DIR
+PROFILE_ENV = "EXPOSURE_PROFILE"
+DEFAULT_PROFILE_DIR = os.environ.get("EXPOSURE_PROFILE_DIR", "profiles")
+
+# Functions whose cumulative time is reported separately: label -> (file name suffix, function name)
+HOTSPOTS = {
+    'objective': ("calculator.py", "__call__"),
+    'local_search': ("_minimize.py", "minimize"),  # polish of differential evolution, Nelder-Mead refits
+}
+
+# Number of functions listed per stage, by cumulative time
+TOP_FUNCTIONS = 10
+
+
+def profiling_enabled(requested: Optional[bool] = None) -> bool:
+    """Profile when requested explicitly, otherwise when the EXPOSURE_PROFILE environment variable is set."""
+    if requested is not None:
+        return requested
+    return os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+
+
+@dataclass
+class StageProfile:
+    """Timing and memory of one pipeline stage; ``stats_file`` holds its cProfile stats (pstats format)."""
+    name: str
+    wall_time_sec: float
+    cpu_time_sec: float
+    peak_memory_bytes: int
+    hotspots_sec: Dict[str, float] = field(default_factory=dict)
+    top_functions: List[dict] = field(default_factory=list)
+    stats_file: Optional[str] = None
+
+
+@dataclass
+class StageCapture:
+    """Raw measurements of one stage; picklable, so a stage can be profiled in a worker process."""
+    name: str
+    wall_time_sec: float
+    cpu_time_sec: float
+    peak_memory_bytes: int
+    stats: dict  # pstats.Stats.stats
+
+
+def _function_label(func) -> str:
+    file_name, line, function_name = func
+    return f"{os.path.basename(file_name)}:{line}({function_name})"
+
+
+@contextmanager
+def capture_stage(name: str, captures: List[StageCapture]):
+    """Profile the block with cProfile and tracemalloc and append its StageCapture to ``captures``."""
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profile = cProfile.Profile()
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        wall_time_sec, cpu_time_sec = time.perf_counter() - start_wall, time.process_time() - start_cpu
+        _, peak_memory_bytes = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        captures.append(StageCapture(name=name, wall_time_sec=wall_time_sec, cpu_time_sec=cpu_time_sec,
+                                     peak_memory_bytes=int(peak_memory_bytes), stats=pstats.Stats(profile).stats))
+
+
+class PipelineProfiler:
+    """
+    Per-stage cProfile and tracemalloc capture of a calculation.
+
+    Wrap each stage in ``with profiler.stage(name):``. Disabled profilers do nothing, so the stages
+    can stay in the code. Stages profiled elsewhere (e.g. a fit in a scheduler worker, see
+    capture_stage) are added with ``add_stage``. ``write()`` dumps one ``NN_<stage>.prof`` file per
+    stage (open with ``python -m pstats`` or snakeviz) and a ``summary.json`` into a new directory
+    under ``output_dir``. tracemalloc slows allocation-heavy stages down, so the times are for
+    comparing stages, not absolute.
+    """
+
+    def __init__(self, enabled: bool = False, output_dir: str = DEFAULT_PROFILE_DIR):
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.stages: List[StageProfile] = []
+        self._stats: List[pstats.Stats] = []
+        self.run_dir: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        captures = []
+        try:
+            with capture_stage(name, captures):
+                yield
+        finally:
+            self.add_stage(captures[0])
+
+    def add_stage(self, capture: StageCapture):
+        stats = pstats.Stats()
+        stats.stats = capture.stats
+        stats.get_top_level_stats()
+        # stats.stats: func -> (primitive calls, calls, total time, cumulative time, callers)
+        entries = stats.stats
+        hotspots_sec = {}
+        for label, (file_suffix, function_name) in HOTSPOTS.items():
+            # only the outermost calls count, so recursion and nesting are not counted twice
+            hotspots_sec[label] = sum(
+                cumulative for (file_name, _, func_name), (_, _, _, cumulative, callers) in entries.items()
+                if file_name.endswith(file_suffix) and func_name == function_name
+                and not any(caller[0].endswith(file_suffix) and caller[2] == function_name for caller in callers)
+            )
+        top = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+        self._stats.append(stats)
+        self.stages.append(StageProfile(
+            name=capture.name,
+            wall_time_sec=capture.wall_time_sec,
+            cpu_time_sec=capture.cpu_time_sec,
+            peak_memory_bytes=capture.peak_memory_bytes,
+            hotspots_sec={label: seconds for label, seconds in hotspots_sec.items() if seconds > 0},
+            top_functions=[{'function': _function_label(func), 'calls': calls, 'cumulative_sec': cumulative}
+                           for func, (_, calls, _, cumulative, _) in top],
+        ))
+
+    def summary(self) -> List[dict]:
+        """One row per stage: name, wall and CPU time [s], peak traced memory [MiB] and hotspot times [s]."""
+        return [{
+            'stage': stage.name,
+            'wall_sec': round(stage.wall_time_sec, 4),
+            'cpu_sec': round(stage.cpu_time_sec, 4),
+            'peak_MiB': round(stage.peak_memory_bytes / 2 ** 20, 2),
+            **{f"{label}_sec": round(seconds, 4) for label, seconds in stage.hotspots_sec.items()},
+        } for stage in self.stages]
+
+    def write(self) -> Optional[str]:
+        """
+        Write the stats files and summary.json of all stages.
+
+        Returns:
+            str: The directory written to, or None if nothing was profiled.
+        """
+        if not self.stages:
+            return None
+        self.run_dir = os.path.join(self.output_dir, datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+        os.makedirs(self.run_dir, exist_ok=True)
+        for index, (stage, stats) in enumerate(zip(self.stages, self._stats)):
+            stage.stats_file = os.path.join(self.run_dir, f"{index:02d}_{stage.name}.prof")
+            stats.dump_stats(stage.stats_file)
+        with open(os.path.join(self.run_dir, "summary.json"), 'w') as f:
+            json.dump([asdict(stage) for stage in self.stages], f, indent=2)
+        return self.run_dir
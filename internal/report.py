@@ -0,0 +1,198 @@
+import html
+import io
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import plotly.io as pio
+
+from internal.calculator import FitResults, ModelParams, table_fit_results
+from internal.export import ReportSample, export_file_name, export_sample
+from internal.manifest import FitManifest
+from internal.store import ExperimentStore
+from internal.visualization import create_thermal_conductivity_plot
+
+REPORT_FORMATS = ("pdf", "html", "zip")
+
+# Reports are built off the UI thread (_executor). Their parts are built concurrently
+# (_parts_executor). Figures go through plotly's kaleido scope, which keeps one kaleido
+# subprocess alive and reuses it for every image; one render thread feeds it (_render_executor).
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="report")
+_parts_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="report-part")
+_render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-render")
+
+
+def samples_from_store(store: ExperimentStore, limit: int = 10, **filters) -> List[ReportSample]:
+    """
+    Report samples of the latest fits in the store, one per fitted experiment.
+
+    Args:
+        store (ExperimentStore): The experiment store.
+        limit (int): Number of fits.
+        **filters: Passed to ExperimentStore.query_fits (e.g. sample_name, temperature).
+
+    Returns:
+        List[ReportSample]: The samples, newest fit first.
+    """
+    samples = []
+    for record in store.query_fits(limit=limit, **filters):
+        params = ModelParams(record.lamda_gas, record.e_dash, record.k_0)
+        for experiment_id in record.experiment_ids:
+            samples.append(ReportSample.from_fit(store.get_experiment(experiment_id), params))
+    return samples
+
+
+def result_rows(results: FitResults, index: int) -> Dict[str, str]:
+    """The result table of sample ``index`` of a fit, as label -> formatted value (app and reports)."""
+    metrics = {name: value if value is not None else float('nan') for name, value in results.sample(index).items()}
+    return {
+        f"{metrics['temperature']}(°C)暴露：長期経過後の収束値 Lconv[W/(m･K)]": f"{metrics['lconv']:.4f} W/(m･K)",
+        "λgas[W/(m･K)]": f"{results.params.lamda_gas:.4f} W/(m･K)",
+        "E[J/mol]": f"{results.params.e_dash:.1f} J/mol",
+        "k₀[-]": f"{results.params.k_0:.6f} -",
+        "k[1/s]": f"{metrics['rate_constant']:.3e} 1/s",
+        "t50[day]": f"{metrics['t50_days']:.1f} day",
+        "t90[day]": f"{metrics['t90_days']:.1f} day",
+        "RMSE[W/(m･K)]": f"{metrics['rmse']:.2e} W/(m･K)",
+        "R²[-]": f"{metrics['r2']:.4f} -",
+        "area score[-]": f"{results.score:.3e} -",
+    }
+
+
+def alternative_rows(manifest: FitManifest) -> List[Dict[str, str]]:
+    """The distinct minima found by the hybrid backend, best first, formatted like result_rows (empty otherwise)."""
+    alternatives = manifest.alternatives or []
+    digit_conf = manifest.solver_config['digit_conf']
+    rows = []
+    for rank, alternative in enumerate(alternatives, start=1):
+        params = ModelParams.from_solver(alternative['solver_params'], digit_conf)
+        rows.append({
+            "rank": str(rank),
+            "λgas[W/(m･K)]": f"{params.lamda_gas:.4f}",
+            "E[J/mol]": f"{params.e_dash:.1f}",
+            "k₀[-]": f"{params.k_0:.6f}",
+            "area score[-]": f"{alternative['score']:.3e}",
+            "vs. best[%]": f"{100 * (alternative['score'] / alternatives[0]['score'] - 1):+.1f}",
+        })
+    return rows
+
+
+def sample_results(sample: ReportSample) -> Dict[str, str]:
+    """The result table shown for a sample, as label -> formatted value."""
+    results = table_fit_results([sample.calculate_table], [sample.experiment.temperature], sample.params)
+    return result_rows(results, 0)
+
+
+def build_csv_zip(samples: Sequence[ReportSample]) -> bytes:
+    """Zip archive with one plot-data CSV per sample, the same files as the app's CSV download."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for index, sample in enumerate(samples):
+            archive.writestr(export_file_name("csv", sample, index), export_sample(sample, "csv").getvalue())
+    return buffer.getvalue()
+
+
+def build_html_report(samples: Sequence[ReportSample]) -> str:
+    """Single self-contained HTML page with the plot and result table of every sample."""
+    sections = []
+    for index, sample in enumerate(samples):
+        figure = create_thermal_conductivity_plot(calculate_table=sample.calculate_table)
+        # plotly.js is embedded once, in the first figure
+        figure_html = pio.to_html(figure, full_html=False, include_plotlyjs=(index == 0))
+        table_rows = "".join(
+            f"<tr><th>{html.escape(label)}</th><td>{html.escape(value)}</td></tr>"
+            for label, value in sample_results(sample).items()
+        )
+        sections.append(
+            f"<section><h2>{index + 1:02d}: {html.escape(sample.experiment.sample_name)}</h2>"
+            f"{figure_html}<table>{table_rows}</table></section>"
+        )
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Thermal Conductivity Report</title>"
+        "<style>body{font-family:sans-serif} table{border-collapse:collapse} "
+        "th,td{border-bottom:1px solid #ccc;padding:4px 12px;text-align:left}</style></head>"
+        f"<body><h1>Thermal Conductivity Report ({date.today()})</h1>{''.join(sections)}</body></html>"
+    )
+
+
+def render_figure_image(sample: ReportSample, fmt: str = "png", scale: float = 1.0) -> bytes:
+    """Render the plot of a sample with kaleido."""
+    return pio.to_image(create_thermal_conductivity_plot(calculate_table=sample.calculate_table),
+                        format=fmt, scale=scale)
+
+
+def render_figure_images(samples: Sequence[ReportSample]) -> Iterator[bytes]:
+    """
+    Render the plots of all samples in the background render thread.
+
+    Images are yielded in order as soon as they are ready, so the caller can assemble pages
+    while the remaining figures are still being rendered.
+    """
+    return _render_executor.map(render_figure_image, samples)
+
+
+def build_pdf_report(samples: Sequence[ReportSample], images: Iterable[bytes]) -> bytes:
+    """Multi-page PDF with one page per sample: the rendered plot followed by its result table."""
+    # matplotlib is only needed here; japanize_matplotlib makes the Japanese labels render.
+    # Figures are created without pyplot, which is not thread-safe.
+    import japanize_matplotlib  # noqa: F401
+    import matplotlib.image as mpimg
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    buffer = io.BytesIO()
+    with PdfPages(buffer) as pdf:
+        for index, (sample, image) in enumerate(zip(samples, images)):
+            figure = Figure(figsize=(8.27, 11.69))  # A4 portrait
+            figure.suptitle(f"{index + 1:02d}: {sample.experiment.sample_name}")
+            image_axes = figure.add_axes((0.05, 0.35, 0.9, 0.58))
+            # interpolation="none" embeds the raster as-is instead of resampling it
+            image_axes.imshow(mpimg.imread(io.BytesIO(image), format="png"), interpolation="none")
+            image_axes.axis("off")
+            table_axes = figure.add_axes((0.05, 0.05, 0.9, 0.25))
+            table_axes.axis("off")
+            # The embedded font has no subscript digits: write k₀ as mathtext
+            cell_text = [[label.replace("₀", "$_0$"), value] for label, value in sample_results(sample).items()]
+            table = table_axes.table(cellText=cell_text,
+                                     colWidths=[0.7, 0.3], loc="upper center", cellLoc="left")
+            table.auto_set_font_size(False)
+            table.set_fontsize(9)
+            pdf.savefig(figure)
+    return buffer.getvalue()
+
+
+def export_report(samples: Sequence[ReportSample], formats: Sequence[str] = REPORT_FORMATS) -> Dict[str, bytes]:
+    """
+    Build the report of N fitted samples.
+
+    Args:
+        samples: The fitted samples.
+        formats: Any of "pdf", "html" and "zip" (CSV archive).
+
+    Returns:
+        Dict[str, bytes]: File contents keyed by format.
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    unknown = set(formats) - set(REPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown report formats: {', '.join(sorted(unknown))}")
+
+    futures = {}
+    if "html" in formats:
+        futures["html"] = _parts_executor.submit(lambda: build_html_report(samples).encode("utf-8"))
+    if "zip" in formats:
+        futures["zip"] = _parts_executor.submit(build_csv_zip, samples)
+    outputs = {}
+    if "pdf" in formats:
+        outputs["pdf"] = build_pdf_report(samples, render_figure_images(samples))
+    for fmt, future in futures.items():
+        outputs[fmt] = future.result()
+    return {fmt: outputs[fmt] for fmt in REPORT_FORMATS if fmt in outputs}
+
+
+def submit_report(samples: Sequence[ReportSample], formats: Sequence[str] = REPORT_FORMATS) -> Future:
+    """Build the report in the background; the returned Future resolves to export_report's result."""
+    return _executor.submit(export_report, list(samples), tuple(formats))
@@ -0,0 +1,164 @@
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from scipy import optimize
+
+from internal.calculator import (AreaObjective, CalculateTable, CheckedObjective, ModelParams, OptimizeParam,
+                                 SolverConfig, estimate_thermal_conductivity, fill_tables, pack_tables, resolve_seed,
+                                 solve_packed)
+from internal.kernel import PackedSeries
+from internal.manifest import FitManifest
+
+# Modified z-score of the residual above which a measurement is rejected
+REJECTION_THRESHOLD = 3.5
+
+# Upper limit of the fraction of measurements that may be rejected
+MAX_REJECTED_FRACTION = 0.2
+
+
+@dataclass
+class RobustFit:
+    """Result of robust_minimize_solver."""
+    optimized_params: OptimizeParam
+    keep: List[np.ndarray]  # per series: False for the rejected measurements
+    n_iterations: int
+
+    @property
+    def n_rejected(self) -> int:
+        return int(sum(np.sum(~keep) for keep in self.keep))
+
+
+def packed_residuals(params: ModelParams, packed: PackedSeries) -> np.ndarray:
+    """Measured minus predicted conductivity of every packed measurement (each series anchored at its first point)."""
+    series_index = packed.series_index()
+    first = packed.offsets[:-1][series_index]
+    predicted = estimate_thermal_conductivity(
+        e_dash=params.e_dash,
+        experiment_temperature=packed.temperatures[series_index],
+        measurement_time_sec=packed.elapsed_sec,
+        lamda_gas=params.lamda_gas,
+        initial_thermal_conductivity=packed.thermal_conductivity[first],
+        k_0=params.k_0,
+    )
+    return packed.thermal_conductivity - predicted
+
+
+def reject_outliers(residuals: np.ndarray, anchors: np.ndarray, threshold: float = REJECTION_THRESHOLD,
+                    max_rejected_fraction: float = MAX_REJECTED_FRACTION) -> np.ndarray:
+    """
+    Mask of the measurements to keep, rejecting large residuals.
+
+    Residuals are scored with the modified z-score (median absolute deviation) over all measurements
+    except the anchors (the first point of each series, which the model passes through and which is
+    never rejected). At most ``max_rejected_fraction`` of the measurements, the worst first, are rejected.
+    """
+    keep = np.ones(len(residuals), dtype=bool)
+    scored = ~anchors
+    if np.sum(scored) < 3:
+        return keep
+    deviation = np.abs(residuals - np.median(residuals[scored]))
+    mad = np.median(deviation[scored])
+    if mad == 0:
+        return keep
+    score = np.where(scored, 0.6745 * deviation / mad, 0.0)
+    candidates = np.flatnonzero(score > threshold)
+    max_rejected = int(max_rejected_fraction * len(residuals))
+    if len(candidates) > max_rejected:
+        candidates = candidates[np.argsort(score[candidates])[::-1][:max_rejected]]
+    keep[candidates] = False
+    return keep
+
+
+def robust_solve_packed(packed: PackedSeries, normalizer_sec: float, solver_config: SolverConfig,
+                        threshold: float = REJECTION_THRESHOLD, max_iterations: int = 5,
+                        max_rejected_fraction: float = MAX_REJECTED_FRACTION,
+                        stop_check: Optional[Callable[[], None]] = None
+                        ) -> Tuple[np.ndarray, FitManifest, np.ndarray, int]:
+    """
+    Fit, reject measurements with large residuals and refit until the rejected set no longer changes.
+
+    Only the first fit is a global differential evolution run. Each refit masks the packed arrays
+    (PackedSeries.select) and starts a bounded Nelder-Mead search from the previous solution, so the
+    whole loop costs little more than a single fit. Residuals are always computed for all measurements,
+    so a measurement rejected early can come back once the fit has moved.
+
+    Args:
+        packed (PackedSeries): The measurement series of all experiments fitted together.
+        normalizer_sec (float): Elapsed time the total area is divided by (kept for every refit).
+        solver_config (SolverConfig): Solver settings of the first fit; ``seed`` must be set.
+        threshold (float): Modified z-score above which a measurement is rejected.
+        max_iterations (int): Maximum number of refits.
+        max_rejected_fraction (float): Upper limit of the fraction of rejected measurements.
+        stop_check (callable, optional): Abort hook of the first fit and the refits (see solve_packed).
+
+    Returns:
+        tuple: (solver parameters, FitManifest, keep mask over the packed measurements, number of refits)
+    """
+    start_time = time.perf_counter()
+    solver_params, manifest = solve_packed(packed, normalizer_sec, solver_config, stop_check=stop_check)
+    digit_conf = np.array(solver_config.digit_conf, dtype=np.float64)
+    bounds = [tuple(bound) for bound in solver_config.bounds]
+    anchors = np.zeros(len(packed.elapsed_sec), dtype=bool)
+    anchors[packed.offsets[:-1][np.diff(packed.offsets) > 0]] = True
+
+    keep = np.ones(len(packed.elapsed_sec), dtype=bool)
+    score = manifest.score
+    n_evaluations = manifest.n_evaluations
+    n_iterations = 0
+    for n_iterations in range(1, max_iterations + 1):
+        params = ModelParams.from_solver(solver_params, solver_config.digit_conf)
+        new_keep = reject_outliers(packed_residuals(params, packed), anchors, threshold, max_rejected_fraction)
+        if np.array_equal(new_keep, keep):
+            n_iterations -= 1
+            break
+        keep = new_keep
+        # 外れ値を除いた配列で、前回の解から局所探索で再フィットする
+        objective_function = AreaObjective(packed.select(keep), digit_conf, normalizer_sec)
+        objective = objective_function if stop_check is None else CheckedObjective(objective_function, stop_check)
+        result = optimize.minimize(objective, x0=solver_params, bounds=bounds, method='Nelder-Mead')
+        solver_params, score = result.x, float(result.fun)
+        n_evaluations += objective_function.n_evaluations
+
+    manifest = replace(
+        manifest,
+        n_evaluations=n_evaluations,
+        wall_time_sec=time.perf_counter() - start_time,
+        solver_params=[float(x) for x in solver_params],
+        score=score,
+        rejected_points=[int(i) for i in np.flatnonzero(~keep)],
+    )
+    return solver_params, manifest, keep, n_iterations
+
+
+def robust_minimize_solver(calculate_table_1: CalculateTable, calculate_table_2: CalculateTable,
+                           experiment_temperature_1: float, experiment_temperature_2: float,
+                           solver_config: Optional[SolverConfig] = None,
+                           threshold: float = REJECTION_THRESHOLD, max_iterations: int = 5) -> RobustFit:
+    """
+    minimize_solver with automatic rejection of outlying measurements (see robust_solve_packed).
+
+    The tables keep all rows; their estimates are filled from the final parameters.
+
+    Returns:
+        RobustFit: The optimized parameters and the per-table masks of the kept measurements.
+    """
+    if solver_config is None:
+        solver_config = SolverConfig()
+    solver_config = resolve_seed(solver_config)
+
+    calculate_tables = (calculate_table_1, calculate_table_2)
+    experiment_temperatures = (experiment_temperature_1, experiment_temperature_2)
+    packed, normalizer_sec = pack_tables(calculate_tables, experiment_temperatures)
+    solver_params, manifest, keep, n_iterations = robust_solve_packed(
+        packed, normalizer_sec, solver_config, threshold=threshold, max_iterations=max_iterations)
+
+    fill_tables(calculate_tables, experiment_temperatures,
+                ModelParams.from_solver(solver_params, solver_config.digit_conf))
+
+    return RobustFit(
+        optimized_params=OptimizeParam.from_solver(solver_params, solver_config.digit_conf, manifest=manifest),
+        keep=[keep[packed.offsets[i]:packed.offsets[i + 1]] for i in range(packed.n_series)],
+        n_iterations=n_iterations,
+    )
@@ -0,0 +1,345 @@
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from internal.backends import DEFAULT_SOLVER_BACKEND
+from internal.calculator import (CalculateTable, FitCancelledError, ModelParams, OptimizeParam, SolverConfig,
+                                 fill_tables, pack_tables, resolve_seed, solve_packed)
+from internal.checkpoint import DEFAULT_CHECKPOINT_EVERY, checkpoint_path, checkpointed_solve_packed
+from internal.kernel import PackedSeries
+from internal.profiling import PipelineProfiler, StageCapture, capture_stage
+from internal.robust import robust_solve_packed
+from internal.shared import detach_all
+
+# Priorities: lower runs first
+INTERACTIVE = 0
+BATCH = 1
+
+# Server-wide defaults, overridable by environment variables
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_PER_SESSION_LIMIT = 1
+DEFAULT_CPU_BUDGET_SEC = 120.0
+
+# Number of recent jobs the latency metrics are computed over
+LATENCY_WINDOW = 1000
+
+
+class FitBudgetExceededError(Exception):
+    """Raised by a job that used more CPU time than its budget."""
+
+
+def scheduler_settings() -> dict:
+    """
+    FitScheduler arguments from the environment.
+
+    EXPOSURE_FIT_WORKERS, EXPOSURE_FIT_PER_SESSION and EXPOSURE_FIT_CPU_BUDGET_SEC (0 disables the budget)
+    override the defaults.
+    """
+    cpu_budget_sec = float(os.environ.get("EXPOSURE_FIT_CPU_BUDGET_SEC", DEFAULT_CPU_BUDGET_SEC))
+    return {
+        'max_workers': int(os.environ.get("EXPOSURE_FIT_WORKERS", DEFAULT_MAX_WORKERS)),
+        'per_session_limit': int(os.environ.get("EXPOSURE_FIT_PER_SESSION", DEFAULT_PER_SESSION_LIMIT)),
+        'cpu_budget_sec': cpu_budget_sec if cpu_budget_sec > 0 else None,
+    }
+
+
+# --- worker side -----------------------------------------------------------------------------
+
+_cancel_flags = None
+
+
+def _init_worker(cancel_flags):
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+
+
+def _run_job(slot: int, cpu_budget_sec: Optional[float], fn: Callable, args: tuple):
+    # Runs in a worker process. The job polls its cancel flag and its CPU time before every
+    # objective evaluation (stop_check) and aborts by raising.
+    start_cpu = time.process_time()
+
+    def stop_check():
+        if _cancel_flags[slot]:
+            raise FitCancelledError("cancelled")
+        if cpu_budget_sec is not None and time.process_time() - start_cpu > cpu_budget_sec:
+            raise FitBudgetExceededError(f"CPU budget of {cpu_budget_sec:g} s exceeded")
+
+    try:
+        return fn(*args, stop_check=stop_check), time.process_time() - start_cpu
+    except (FitCancelledError, FitBudgetExceededError) as e:
+        e.cpu_sec = time.process_time() - start_cpu
+        raise
+    finally:
+        # the worker outlives the job: drop any shared blocks the job attached
+        detach_all()
+
+
+def fit_packed_job(packed: PackedSeries, normalizer_sec: float, solver_config: SolverConfig,
+                   stop_check: Callable[[], None]) -> Tuple[np.ndarray, object, Optional[np.ndarray]]:
+    """Scheduler job: solve_packed. Returns (solver parameters, FitManifest, None)."""
+    solver_params, manifest = solve_packed(packed, normalizer_sec, solver_config, stop_check=stop_check)
+    return solver_params, manifest, None
+
+
+def checkpointed_fit_packed_job(packed: PackedSeries, normalizer_sec: float, solver_config: SolverConfig,
+                                checkpoint_file: str, checkpoint_every: int,
+                                stop_check: Callable[[], None]) -> Tuple[np.ndarray, object, Optional[np.ndarray]]:
+    """Scheduler job: checkpointed_solve_packed. Returns (solver parameters, FitManifest, None)."""
+    solver_params, manifest = checkpointed_solve_packed(packed, normalizer_sec, solver_config, checkpoint_file,
+                                                        checkpoint_every=checkpoint_every, stop_check=stop_check)
+    return solver_params, manifest, None
+
+
+def robust_fit_packed_job(packed: PackedSeries, normalizer_sec: float, solver_config: SolverConfig,
+                          stop_check: Callable[[], None]) -> Tuple[np.ndarray, object, Optional[np.ndarray]]:
+    """Scheduler job: robust_solve_packed. Returns (solver parameters, FitManifest, keep mask)."""
+    solver_params, manifest, keep, _ = robust_solve_packed(packed, normalizer_sec, solver_config,
+                                                           stop_check=stop_check)
+    return solver_params, manifest, keep
+
+
+def profiled_job(name: str, fn: Callable, *args, stop_check: Callable[[], None]) -> Tuple[object, StageCapture]:
+    """Scheduler job: ``fn`` profiled in the worker process as stage ``name``. Returns (result of fn, StageCapture)."""
+    captures = []
+    with capture_stage(name, captures):
+        result = fn(*args, stop_check=stop_check)
+    return result, captures[0]
+
+
+# --- scheduler side --------------------------------------------------------------------------
+
+@dataclass
+class ScheduledJob:
+    """A job of the scheduler: queued -> running -> done | failed | cancelled."""
+    id: int
+    session_id: str
+    priority: int
+    fn: Callable
+    args: tuple
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    slot: Optional[int] = None
+    future: Future = field(default_factory=Future)
+
+    def result(self, timeout: Optional[float] = None):
+        """
+        Wait for the job and return the result of its function.
+
+        Raises:
+            FitCancelledError: If the job was cancelled.
+            FitBudgetExceededError: If the job exceeded its CPU budget.
+        """
+        return self.future.result(timeout)
+
+
+class FitScheduler:
+    """
+    Fair scheduler of fit jobs for a server shared by several users (sessions).
+
+    - At most ``max_workers`` fits run at a time, each in its own worker process with workers=1.
+    - A session runs at most ``per_session_limit`` fits at a time; further jobs wait.
+    - A new submission of a session cancels its queued and running jobs (``supersede``); running
+      fits stop at their next objective evaluation.
+    - Every job is aborted once it used ``cpu_budget_sec`` of CPU time.
+    - Queued jobs are started by priority (INTERACTIVE before BATCH), then in submission order.
+
+    ``metrics()`` reports queue depth, running jobs, outcome counts, wait/run latencies and CPU time
+    per session.
+    """
+
+    def __init__(self, max_workers: int = 2, per_session_limit: int = 1, cpu_budget_sec: Optional[float] = None):
+        self.max_workers = max_workers
+        self.per_session_limit = per_session_limit
+        self.cpu_budget_sec = cpu_budget_sec
+        self._cancel_flags = multiprocessing.Array('b', max_workers, lock=False)
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                             initargs=(self._cancel_flags,))
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._queue: List[ScheduledJob] = []
+        self._running: Dict[int, ScheduledJob] = {}
+        self._free_slots = list(range(max_workers))
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._wait_sec: deque = deque(maxlen=LATENCY_WINDOW)
+        self._run_sec: deque = deque(maxlen=LATENCY_WINDOW)
+        self._cpu_sec: Dict[str, float] = defaultdict(float)
+
+    def submit(self, session_id: str, fn: Callable, *args, priority: int = INTERACTIVE,
+               supersede: bool = True) -> ScheduledJob:
+        """
+        Queue ``fn(*args, stop_check=...)`` for a worker process.
+
+        ``fn`` must be a picklable top-level function taking a ``stop_check`` keyword argument
+        (see fit_packed_job).
+
+        Args:
+            session_id (str): The submitting session (user).
+            fn (callable): The job function.
+            *args: Its arguments.
+            priority (int): INTERACTIVE or BATCH.
+            supersede (bool): Cancel the queued and running jobs of the session first.
+
+        Returns:
+            ScheduledJob: The job; ``job.result()`` waits for it.
+        """
+        with self._lock:
+            if supersede:
+                self.cancel_session(session_id)
+            job = ScheduledJob(id=next(self._ids), session_id=session_id, priority=priority, fn=fn, args=args)
+            self._queue.append(job)
+            self._counts['submitted'] += 1
+            self._dispatch()
+            return job
+
+    def cancel(self, job: ScheduledJob):
+        """Cancel a job: a queued job is dropped, a running one stops at its next evaluation."""
+        with self._lock:
+            if job.status == "queued":
+                self._queue.remove(job)
+                self._finish(job, "cancelled", error=FitCancelledError("cancelled before it started"))
+            elif job.status == "running":
+                self._cancel_flags[job.slot] = 1
+
+    def cancel_session(self, session_id: str):
+        """Cancel all queued and running jobs of a session."""
+        with self._lock:
+            for job in [job for job in self._queue if job.session_id == session_id]:
+                self.cancel(job)
+            for job in [job for job in self._running.values() if job.session_id == session_id]:
+                self.cancel(job)
+
+    def _dispatch(self):
+        # Start queued jobs while workers are free, by priority then age, skipping sessions at their limit
+        running_per_session = defaultdict(int)
+        for job in self._running.values():
+            running_per_session[job.session_id] += 1
+        for job in sorted(self._queue, key=lambda job: (job.priority, job.id)):
+            if not self._free_slots:
+                break
+            if running_per_session[job.session_id] >= self.per_session_limit:
+                continue
+            self._queue.remove(job)
+            job.slot = self._free_slots.pop()
+            self._cancel_flags[job.slot] = 0
+            job.status = "running"
+            job.started_at = time.monotonic()
+            self._wait_sec.append(job.started_at - job.submitted_at)
+            self._running[job.id] = job
+            running_per_session[job.session_id] += 1
+            executor_future = self._executor.submit(_run_job, job.slot, self.cpu_budget_sec, job.fn, job.args)
+            executor_future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+
+    def _on_done(self, job: ScheduledJob, executor_future: Future):
+        with self._lock:
+            del self._running[job.id]
+            self._free_slots.append(job.slot)
+            self._run_sec.append(time.monotonic() - job.started_at)
+            error = executor_future.exception()
+            if error is None:
+                result, cpu_sec = executor_future.result()
+                self._cpu_sec[job.session_id] += cpu_sec
+                self._finish(job, "done", result=result)
+            else:
+                self._cpu_sec[job.session_id] += getattr(error, 'cpu_sec', 0.0)
+                status = "cancelled" if isinstance(error, FitCancelledError) else "failed"
+                self._finish(job, status, error=error)
+            self._dispatch()
+
+    def _finish(self, job: ScheduledJob, status: str, result=None, error: Optional[BaseException] = None):
+        job.status = status
+        job.finished_at = time.monotonic()
+        self._counts[status] += 1
+        if error is None:
+            job.future.set_result(result)
+        else:
+            job.future.set_exception(error)
+
+    def metrics(self) -> dict:
+        """Queue depth, running jobs, outcome counts, latency percentiles [s] and CPU time per session [s]."""
+        with self._lock:
+            def percentiles(values):
+                if not values:
+                    return {'p50': None, 'p95': None}
+                p50, p95 = np.percentile(np.asarray(values), [50, 95])
+                return {'p50': float(p50), 'p95': float(p95)}
+
+            queued_by_priority = defaultdict(int)
+            for job in self._queue:
+                queued_by_priority['interactive' if job.priority == INTERACTIVE else 'batch'] += 1
+            return {
+                'queued': len(self._queue),
+                'queued_by_priority': dict(queued_by_priority),
+                'running': len(self._running),
+                'max_workers': self.max_workers,
+                'counts': dict(self._counts),
+                'wait_sec': percentiles(self._wait_sec),
+                'run_sec': percentiles(self._run_sec),
+                'cpu_sec_by_session': dict(self._cpu_sec),
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Cancel everything and stop the worker processes."""
+        with self._lock:
+            for job in list(self._queue):
+                self.cancel(job)
+            for job in list(self._running.values()):
+                self.cancel(job)
+        self._executor.shutdown(wait=wait)
+
+
+def schedule_table_fit(scheduler: FitScheduler, session_id: str, calculate_tables: Sequence[CalculateTable],
+                       experiment_temperatures: Sequence[float], solver_config: SolverConfig,
+                       reject_outliers: bool = False, priority: int = INTERACTIVE,
+                       checkpoint_dir: Optional[str] = None, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+                       profiler: Optional[PipelineProfiler] = None
+                       ) -> Tuple[OptimizeParam, Optional[List[np.ndarray]]]:
+    """
+    minimize_solver (or robust_minimize_solver) through the scheduler: blocks until the fit is done.
+
+    With ``checkpoint_dir`` a differential evolution fit (without outlier rejection) checkpoints its
+    generations there; a cancelled fit resumes when the same data is submitted again. An enabled
+    ``profiler`` gets a "minimize_solver" stage profiled in the worker process (the time in the
+    queue is not included).
+
+    Returns:
+        tuple: (OptimizeParam, per-table keep masks of the robust fit or None)
+
+    Raises:
+        FitCancelledError: If the fit was superseded or cancelled.
+        FitBudgetExceededError: If the fit exceeded the CPU budget.
+    """
+    solver_config = resolve_seed(replace(solver_config, workers=1))
+    packed, normalizer_sec = pack_tables(calculate_tables, experiment_temperatures)
+    if reject_outliers:
+        args = (robust_fit_packed_job, packed, normalizer_sec, solver_config)
+    elif checkpoint_dir is not None and solver_config.backend == DEFAULT_SOLVER_BACKEND:
+        args = (checkpointed_fit_packed_job, packed, normalizer_sec, solver_config,
+                checkpoint_path(checkpoint_dir, packed, solver_config), checkpoint_every)
+    else:
+        args = (fit_packed_job, packed, normalizer_sec, solver_config)
+    profiled = profiler is not None and profiler.enabled
+    if profiled:
+        args = (profiled_job, "minimize_solver", *args)
+    job = scheduler.submit(session_id, *args, priority=priority)
+    result = job.result()
+    if profiled:
+        result, capture = result
+        profiler.add_stage(capture)
+    solver_params, manifest, keep = result
+
+    fill_tables(calculate_tables, experiment_temperatures,
+                ModelParams.from_solver(solver_params, solver_config.digit_conf))
+    keep_masks = None
+    if keep is not None:
+        keep_masks = [keep[packed.offsets[i]:packed.offsets[i + 1]] for i in range(packed.n_series)]
+    return OptimizeParam.from_solver(solver_params, solver_config.digit_conf, manifest=manifest), keep_masks
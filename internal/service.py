@@ -0,0 +1,286 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+
+from internal.calculator import (DEFAULT_SOLVER_PRESET, SolverConfig, get_solver_config, minimize_solver,
+                                 table_fit_results)
+from internal.cleaning import clean_experiment
+from internal.converter import experiment_converter
+from internal.experiment import experiment_from_dict, experiment_to_dict
+
+# Request bodies larger than this are rejected with 413
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class QueueFullError(Exception):
+    """Raised when the service already holds its maximum number of unfinished jobs."""
+
+
+class PayloadError(ValueError):
+    """Raised for a request payload that cannot be fitted."""
+
+
+@dataclass
+class FitJob:
+    """A fit request and its state: queued -> running -> done | failed."""
+    id: str
+    status: str = "queued"
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    n_requests: int = 1
+
+    def to_dict(self) -> dict:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'finished_at': self.finished_at,
+            'n_requests': self.n_requests,
+        }
+
+
+def _run_fit(experiment_dicts: List[dict], solver_config: SolverConfig) -> dict:
+    # Runs in a worker process: converter pipeline and solver for one request (cleaned by parse_payload)
+    experiment_1, experiment_2 = (experiment_from_dict(data) for data in experiment_dicts)
+    calculate_table_1 = experiment_converter(experiment_1)
+    calculate_table_2 = experiment_converter(experiment_2)
+    optimized_params = minimize_solver(calculate_table_1, calculate_table_2,
+                                       experiment_1.temperature, experiment_2.temperature,
+                                       solver_config=solver_config)
+    results = table_fit_results((calculate_table_1, calculate_table_2),
+                                (experiment_1.temperature, experiment_2.temperature), optimized_params.model_params)
+    return {
+        'lamda_gas': optimized_params.lamda_gas.actual_value,
+        'e_dash': optimized_params.e_dash.actual_value,
+        'k_0': optimized_params.k_0.actual_value,
+        'estimated_conductivity': [
+            [row.estimated_conductivity for row in calculate_table.rows]
+            for calculate_table in (calculate_table_1, calculate_table_2)
+        ],
+        'samples': results.to_dicts(),
+        'manifest': vars(optimized_params.manifest),
+    }
+
+
+def parse_payload(payload: dict) -> Tuple[List[dict], SolverConfig]:
+    """
+    Validate a fit request.
+
+    The payload is ``{"experiments": [<experiment 1>, <experiment 2>], "preset": "fast", "seed": 0}``
+    where each experiment uses the write_interface JSON shape; ``preset`` and ``seed`` are optional.
+    The measurements are cleaned as in the form (internal/cleaning.py), so requests that differ only
+    in what the cleaning removes share one job.
+
+    Returns:
+        tuple: (the cleaned experiments as write_interface dictionaries, SolverConfig)
+
+    Raises:
+        PayloadError: If the payload is malformed or its measurements cannot be fitted.
+    """
+    if not isinstance(payload, dict):
+        raise PayloadError("payload must be a JSON object")
+    experiments = payload.get('experiments')
+    if not isinstance(experiments, list) or len(experiments) != 2:
+        raise PayloadError("'experiments' must be a list of two experiments")
+    overrides = {'disp': False, 'workers': 1}
+    try:
+        if payload.get('seed') is not None:
+            overrides['seed'] = int(payload['seed'])
+        solver_config = get_solver_config(payload.get('preset', DEFAULT_SOLVER_PRESET), **overrides)
+        cleaned = [experiment_to_dict(clean_experiment(experiment_from_dict(data), label=f"experiment {index + 1}")[0])
+                   for index, data in enumerate(experiments)]
+    except (ValueError, TypeError, AttributeError) as e:
+        raise PayloadError(str(e))
+    return cleaned, solver_config
+
+
+def request_key(experiments: List[dict], solver_config: SolverConfig) -> str:
+    """Content hash identifying identical fit requests."""
+    canonical = json.dumps({'experiments': experiments, 'solver_config': solver_config.to_dict()},
+                           sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class FitService:
+    """
+    Asynchronous fitting service.
+
+    Fits run on a bounded process pool. Identical concurrent requests (same content hash) are
+    coalesced onto one job, and finished jobs are kept so repeated requests return immediately.
+    At most ``max_queue`` unfinished jobs are accepted; further requests get QueueFullError (HTTP 429).
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 16, max_finished: int = 1000,
+                 executor: Optional[Executor] = None):
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self._executor = executor or ProcessPoolExecutor(max_workers=max_workers)
+        self._slots = asyncio.Semaphore(max_workers)
+        self._jobs: Dict[str, FitJob] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def n_unfinished(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, payload: dict) -> FitJob:
+        """
+        Accept a fit request, or join the identical request already queued, running or done.
+
+        Raises:
+            PayloadError: If the payload is malformed.
+            QueueFullError: If ``max_queue`` jobs are already unfinished.
+        """
+        experiments, solver_config = parse_payload(payload)
+        job_id = request_key(experiments, solver_config)
+        job = self._jobs.get(job_id)
+        if job is not None and job.status != "failed":
+            job.n_requests += 1
+            return job
+        if self.n_unfinished >= self.max_queue:
+            raise QueueFullError(f"{self.n_unfinished} jobs are unfinished")
+
+        job = FitJob(id=job_id)
+        self._jobs[job_id] = job
+        self._finished.pop(job_id, None)
+        self._tasks[job_id] = asyncio.get_running_loop().create_task(self._run(job, experiments, solver_config))
+        return job
+
+    async def _run(self, job: FitJob, experiments: List[dict], solver_config: SolverConfig):
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._slots:
+                job.status = "running"
+                job.result = await loop.run_in_executor(self._executor, _run_fit, experiments, solver_config)
+            job.status = "done"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            del self._tasks[job.id]
+            self._finished[job.id] = None
+            while len(self._finished) > self.max_finished:
+                expired, _ = self._finished.popitem(last=False)
+                self._jobs.pop(expired, None)
+
+    def get(self, job_id: str) -> Optional[FitJob]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> FitJob:
+        """Wait until the job has finished and return it."""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        """Stop the process pool; queued fits are cancelled."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def handle(self, method: str, path: str, body: bytes = b"") -> Tuple[int, dict]:
+        """
+        Route an HTTP request. Transport-independent so it can be driven without sockets.
+
+        Routes:
+            POST /fits          submit a fit; 202 (queued/running), 200 (already done), 429 (queue full)
+            GET  /fits/<job_id> job status and result
+            GET  /health        number of unfinished jobs and queue limit
+
+        Returns:
+            tuple: (HTTP status code, JSON response body)
+        """
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if method == "GET" and parts == ["health"]:
+            return HTTPStatus.OK, {'unfinished': self.n_unfinished, 'max_queue': self.max_queue}
+        if method == "POST" and parts == ["fits"]:
+            try:
+                payload = json.loads(body or b"null")
+                job = self.submit(payload)
+            except (json.JSONDecodeError, PayloadError) as e:
+                return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+            except QueueFullError as e:
+                return HTTPStatus.TOO_MANY_REQUESTS, {'error': str(e)}
+            status = HTTPStatus.OK if job.status == "done" else HTTPStatus.ACCEPTED
+            return status, job.to_dict()
+        if method == "GET" and len(parts) == 2 and parts[0] == "fits":
+            job = self.get(parts[1])
+            if job is None:
+                return HTTPStatus.NOT_FOUND, {'error': f"unknown job: {parts[1]}"}
+            return HTTPStatus.OK, job.to_dict()
+        return HTTPStatus.NOT_FOUND, {'error': f"no route for {method} {path}"}
+
+    # --- HTTP transport ----------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                status, response = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "request body too large"}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, response = await self.handle(method, path, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, response = HTTPStatus.BAD_REQUEST, {'error': "malformed request"}
+
+        data = json.dumps(response).encode()
+        status = HTTPStatus(status)
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(data)}",
+            "Connection: close",
+        ]
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        """Start listening for HTTP requests and return the asyncio server."""
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+
+class LocalClient:
+    """
+    In-process client for FitService, for tests and offline use: no sockets involved.
+
+    Example::
+
+        service = FitService()
+        client = LocalClient(service)
+        status, job = await client.post("/fits", payload)
+        status, job = await client.get(f"/fits/{job['job_id']}")
+    """
+
+    def __init__(self, service: FitService):
+        self.service = service
+
+    async def get(self, path: str) -> Tuple[int, dict]:
+        return await self.service.handle("GET", path)
+
+    async def post(self, path: str, payload) -> Tuple[int, dict]:
+        return await self.service.handle("POST", path, json.dumps(payload).encode())
@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+
+import numpy as np
+
+from internal.kernel import PackedSeries
+
+# Blocks attached by this process, keyed by block name. Worker processes attach once per job,
+# so repeated calls within a job are zero-copy and allocation-free, and detach when the job ends
+# (detach_series / detach_all) so long-lived workers do not keep blocks the owner has unlinked.
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, PackedSeries]] = {}
+
+
+@dataclass(frozen=True)
+class SharedSeriesHandle:
+    """
+    Picklable reference to a PackedSeries stored in shared memory.
+
+    Only the block name and the array sizes are pickled; workers map the block with attach_series.
+    Block layout: elapsed_sec (n float64), thermal_conductivity (n float64),
+    temperatures (m float64), offsets (m + 1 int64).
+    """
+    name: str
+    n_values: int
+    n_series: int
+
+
+def _views(buffer, n_values: int, n_series: int) -> PackedSeries:
+    position = 0
+
+    def take(count, dtype):
+        nonlocal position
+        array = np.ndarray((count,), dtype=dtype, buffer=buffer, offset=position)
+        position += count * np.dtype(dtype).itemsize
+        return array
+
+    elapsed_sec = take(n_values, np.float64)
+    thermal_conductivity = take(n_values, np.float64)
+    temperatures = take(n_series, np.float64)
+    offsets = take(n_series + 1, np.int64)
+    return PackedSeries(
+        elapsed_sec=elapsed_sec,
+        thermal_conductivity=thermal_conductivity,
+        offsets=offsets,
+        temperatures=temperatures,
+    )
+
+
+def _block_size(n_values: int, n_series: int) -> int:
+    return 8 * (2 * n_values + 2 * n_series + 1)
+
+
+class SharedSeries:
+    """
+    Owner of a shared memory block holding a PackedSeries.
+
+    Use as a context manager; the block is released on exit::
+
+        with SharedSeries(packed) as shared:
+            pool.map(work, [shared.handle] * n)
+    """
+
+    def __init__(self, packed: PackedSeries):
+        n_values = len(packed.elapsed_sec)
+        n_series = packed.n_series
+        self._shm = shared_memory.SharedMemory(create=True, size=max(_block_size(n_values, n_series), 1))
+        self.handle = SharedSeriesHandle(name=self._shm.name, n_values=n_values, n_series=n_series)
+        self.packed = _views(self._shm.buf, n_values, n_series)
+        self.packed.elapsed_sec[:] = packed.elapsed_sec
+        self.packed.thermal_conductivity[:] = packed.thermal_conductivity
+        self.packed.temperatures[:] = packed.temperatures
+        self.packed.offsets[:] = packed.offsets
+
+    def close(self):
+        if self._shm is None:
+            return
+        # Drop the array views before closing, otherwise the buffer is still exported
+        self.packed = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> 'SharedSeries':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach_series(handle: SharedSeriesHandle) -> PackedSeries:
+    """
+    Map the PackedSeries of a SharedSeriesHandle into this process without copying.
+
+    Args:
+        handle (SharedSeriesHandle): The handle received from the owning process.
+
+    Returns:
+        PackedSeries: Read-only views into the shared block.
+    """
+    if handle.name not in _attached:
+        try:
+            # track=False: the owner unlinks the block, workers must not
+            shm = shared_memory.SharedMemory(name=handle.name, track=False)
+        except TypeError:  # Python < 3.13
+            shm = shared_memory.SharedMemory(name=handle.name)
+        packed = _views(shm.buf, handle.n_values, handle.n_series)
+        for array in (packed.elapsed_sec, packed.thermal_conductivity, packed.temperatures, packed.offsets):
+            array.flags.writeable = False
+        _attached[handle.name] = (shm, packed)
+    return _attached[handle.name][1]
+
+
+def _close(name: str):
+    entry = _attached.pop(name, None)
+    if entry is None:
+        return
+    shm = entry[0]
+    # The array views must be released before the mapping can be closed
+    del entry
+    try:
+        shm.close()
+    except BufferError:
+        pass  # a caller still holds views: the mapping is released with the last of them
+
+
+def detach_series(handle: SharedSeriesHandle):
+    """Release the mapping created by attach_series in this process, if any."""
+    _close(handle.name)
+
+
+def detach_all():
+    """Release every mapping created by attach_series in this process (end of a worker job)."""
+    for name in list(_attached):
+        _close(name)
@@ -0,0 +1,396 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence
+
+from internal.calculator import OptimizeParam
+from internal.experiment import read_interface
+from internal.interface import Experiment, MeasurementData
+
+DEFAULT_STORE_PATH = os.environ.get("EXPOSURE_STORE_PATH", "experiments.db")
+
+# Temperatures are stored as REAL; queries match within this tolerance [°C]
+TEMPERATURE_TOLERANCE = 0.05
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    id TEXT PRIMARY KEY,
+    sample_name TEXT NOT NULL,
+    thickness_mm REAL,
+    initial_density REAL,
+    temperature REAL,
+    humidity_memo TEXT,
+    start_date TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_experiments_sample_name ON experiments (sample_name);
+CREATE INDEX IF NOT EXISTS idx_experiments_temperature ON experiments (temperature);
+CREATE INDEX IF NOT EXISTS idx_experiments_start_date ON experiments (start_date);
+
+CREATE TABLE IF NOT EXISTS measurements (
+    experiment_id TEXT NOT NULL REFERENCES experiments (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id INTEGER,
+    measurement_date TEXT NOT NULL,
+    elapsed_days INTEGER,
+    elapsed_seconds REAL,
+    thermal_conductivity REAL NOT NULL,
+    thermal_conductivity_increase REAL,
+    PRIMARY KEY (experiment_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS fits (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lamda_gas REAL NOT NULL,
+    e_dash REAL NOT NULL,
+    k_0 REAL NOT NULL,
+    score REAL,
+    input_hash TEXT,
+    preset TEXT,
+    manifest TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fits_score ON fits (score);
+CREATE INDEX IF NOT EXISTS idx_fits_created_at ON fits (created_at);
+CREATE INDEX IF NOT EXISTS idx_fits_input_hash ON fits (input_hash);
+
+CREATE TABLE IF NOT EXISTS fit_experiments (
+    fit_id INTEGER NOT NULL REFERENCES fits (id) ON DELETE CASCADE,
+    experiment_id TEXT NOT NULL REFERENCES experiments (id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (fit_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_fit_experiments_experiment_id ON fit_experiments (experiment_id);
+"""
+
+
+@dataclass
+class FitRecord:
+    """A stored fit and the experiments it was fitted to."""
+    id: int
+    lamda_gas: float
+    e_dash: float
+    k_0: float
+    score: Optional[float]
+    input_hash: Optional[str]
+    preset: Optional[str]
+    created_at: str
+    experiment_ids: List[str]
+    manifest: Optional[dict] = None
+
+
+class ExperimentStore:
+    """
+    Embedded SQLite store for experiments, their measurements and fit results.
+
+    Experiments are indexed by sample name, temperature and start date; fits by score, creation
+    time and input hash. Queries are paged with ``limit``/``offset``. A single connection is shared
+    between threads (Streamlit reruns scripts in different threads) and guarded by a lock.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA foreign_keys = ON")
+            self._connection.executescript(_SCHEMA)
+            self._migrate()
+
+    def _migrate(self):
+        # Stores created before exact elapsed times were recorded lack measurements.elapsed_seconds
+        columns = {row['name'] for row in self._connection.execute("PRAGMA table_info(measurements)")}
+        if 'elapsed_seconds' not in columns:
+            self._connection.execute("ALTER TABLE measurements ADD COLUMN elapsed_seconds REAL")
+
+    def close(self):
+        self._connection.close()
+
+    # --- experiments -------------------------------------------------------------------------
+
+    @staticmethod
+    def _experiment_values(experiment: Experiment) -> tuple:
+        start_date = experiment.measurements[0].measurement_date.isoformat() if experiment.measurements else None
+        return (experiment.sample_name, experiment.thickness_mm, experiment.initial_density,
+                experiment.temperature, experiment.humidity_memo, start_date)
+
+    @staticmethod
+    def _measurement_values(experiment: Experiment) -> List[tuple]:
+        return [
+            (position, measurement.id, measurement.measurement_date.isoformat(), measurement.elapsed_days,
+             measurement.elapsed_seconds, measurement.thermal_conductivity, measurement.thermal_conductivity_increase)
+            for position, measurement in enumerate(experiment.measurements)
+        ]
+
+    def _insert_experiment(self, experiment: Experiment) -> str:
+        if not experiment.id:
+            experiment.id = uuid.uuid4().hex
+        self._connection.execute(
+            "INSERT INTO experiments "
+            "(id, sample_name, thickness_mm, initial_density, temperature, humidity_memo, start_date, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET sample_name = excluded.sample_name, "
+            "thickness_mm = excluded.thickness_mm, initial_density = excluded.initial_density, "
+            "temperature = excluded.temperature, humidity_memo = excluded.humidity_memo, "
+            "start_date = excluded.start_date",
+            (experiment.id, *self._experiment_values(experiment), datetime.now().isoformat()),
+        )
+        self._connection.execute("DELETE FROM measurements WHERE experiment_id = ?", (experiment.id,))
+        self._connection.executemany(
+            "INSERT INTO measurements (experiment_id, position, id, measurement_date, elapsed_days, "
+            "elapsed_seconds, thermal_conductivity, thermal_conductivity_increase) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(experiment.id, *values) for values in self._measurement_values(experiment)],
+        )
+        return experiment.id
+
+    def _is_stored(self, experiment: Experiment) -> bool:
+        # True if the store holds this experiment with exactly these sample data and measurements
+        if not experiment.id:
+            return False
+        row = self._connection.execute(
+            "SELECT sample_name, thickness_mm, initial_density, temperature, humidity_memo, start_date "
+            "FROM experiments WHERE id = ?", (experiment.id,)).fetchone()
+        if row is None or tuple(row) != self._experiment_values(experiment):
+            return False
+        rows = self._connection.execute(
+            "SELECT position, id, measurement_date, elapsed_days, elapsed_seconds, thermal_conductivity, "
+            "thermal_conductivity_increase FROM measurements WHERE experiment_id = ? ORDER BY position",
+            (experiment.id,)).fetchall()
+        return [tuple(row) for row in rows] == self._measurement_values(experiment)
+
+    def _has_experiment(self, experiment_id: Optional[str]) -> bool:
+        return bool(experiment_id) and self._connection.execute(
+            "SELECT 1 FROM experiments WHERE id = ?", (experiment_id,)).fetchone() is not None
+
+    def save_experiment(self, experiment: Experiment) -> str:
+        """
+        Insert or replace an experiment with its measurements.
+
+        Args:
+            experiment (Experiment): The experiment. An id is assigned if it has none.
+
+        Returns:
+            str: The experiment id.
+        """
+        with self._lock, self._connection:
+            return self._insert_experiment(experiment)
+
+    def import_json_files(self, file_paths: Iterable[str]) -> List[str]:
+        """
+        Bulk import experiment JSON files (write_interface format) in a single transaction.
+
+        Args:
+            file_paths: Paths of the JSON files.
+
+        Returns:
+            List[str]: The ids of the imported experiments.
+        """
+        experiments = [read_interface(file_path) for file_path in file_paths]
+        with self._lock, self._connection:
+            return [self._insert_experiment(experiment) for experiment in experiments]
+
+    def _load_experiments(self, rows: Sequence[sqlite3.Row]) -> List[Experiment]:
+        experiments = {
+            row['id']: Experiment(
+                id=row['id'],
+                sample_name=row['sample_name'],
+                thickness_mm=row['thickness_mm'],
+                initial_density=row['initial_density'],
+                temperature=row['temperature'],
+                humidity_memo=row['humidity_memo'],
+            )
+            for row in rows
+        }
+        if experiments:
+            placeholders = ", ".join("?" * len(experiments))
+            measurement_rows = self._connection.execute(
+                f"SELECT * FROM measurements WHERE experiment_id IN ({placeholders}) "
+                "ORDER BY experiment_id, position",
+                list(experiments),
+            ).fetchall()
+            for row in measurement_rows:
+                experiments[row['experiment_id']].measurements.append(MeasurementData(
+                    id=row['id'],
+                    measurement_date=datetime.fromisoformat(row['measurement_date']),
+                    elapsed_days=row['elapsed_days'],
+                    elapsed_seconds=row['elapsed_seconds'],
+                    thermal_conductivity=row['thermal_conductivity'],
+                    thermal_conductivity_increase=row['thermal_conductivity_increase'],
+                ))
+        return list(experiments.values())
+
+    def get_experiment(self, experiment_id: str) -> Experiment:
+        """
+        Load an experiment with its measurements.
+
+        Raises:
+            KeyError: If no experiment has this id.
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT * FROM experiments WHERE id = ?", (experiment_id,)).fetchall()
+            if not rows:
+                raise KeyError(f"Experiment not found: {experiment_id}")
+            return self._load_experiments(rows)[0]
+
+    def query_experiments(self, sample_name: Optional[str] = None, temperature: Optional[float] = None,
+                          date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                          limit: int = 50, offset: int = 0) -> List[Experiment]:
+        """
+        Page through experiments, newest start date first.
+
+        Args:
+            sample_name (str, optional): Exact sample name.
+            temperature (float, optional): Exposure temperature [°C].
+            date_from (datetime, optional): Earliest start date (inclusive).
+            date_to (datetime, optional): Latest start date (inclusive).
+            limit (int): Page size.
+            offset (int): Number of experiments to skip.
+
+        Returns:
+            List[Experiment]: The experiments of the page, with their measurements.
+        """
+        where, params = self._experiment_filters(sample_name, temperature, date_from, date_to, prefix="")
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT * FROM experiments {where} ORDER BY start_date DESC, id LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+            return self._load_experiments(rows)
+
+    @staticmethod
+    def _experiment_filters(sample_name, temperature, date_from, date_to, prefix: str):
+        clauses, params = [], []
+        if sample_name is not None:
+            clauses.append(f"{prefix}sample_name = ?")
+            params.append(sample_name)
+        if temperature is not None:
+            clauses.append(f"{prefix}temperature BETWEEN ? AND ?")
+            params.extend([temperature - TEMPERATURE_TOLERANCE, temperature + TEMPERATURE_TOLERANCE])
+        if date_from is not None:
+            clauses.append(f"{prefix}start_date >= ?")
+            params.append(date_from.isoformat())
+        if date_to is not None:
+            clauses.append(f"{prefix}start_date <= ?")
+            params.append(date_to.isoformat())
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    # --- fits --------------------------------------------------------------------------------
+
+    def save_fit(self, experiments: Sequence[Experiment], optimized_params: OptimizeParam,
+                 preset: Optional[str] = None) -> int:
+        """
+        Store a fit result together with the experiments it was fitted to.
+
+        Experiments without an id, or whose id is not in the store (e.g. read from a JSON file), are saved first.
+        An experiment whose sample data or measurements differ from the stored ones (e.g. edited after
+        it was loaded) is saved as a new experiment and gets a new id, so the fits of the stored version
+        keep pointing to the data they were fitted to.
+
+        Args:
+            experiments: The fitted experiments, in solver order.
+            optimized_params (OptimizeParam): The fit result.
+            preset (str, optional): Name of the solver preset used.
+
+        Returns:
+            int: The fit id.
+        """
+        manifest = optimized_params.manifest
+        with self._lock, self._connection:
+            experiment_ids = []
+            for experiment in experiments:
+                if not self._is_stored(experiment):
+                    if self._has_experiment(experiment.id):
+                        experiment.id = ""  # edited: keep the stored version for its fits
+                    self._insert_experiment(experiment)
+                experiment_ids.append(experiment.id)
+            cursor = self._connection.execute(
+                "INSERT INTO fits (lamda_gas, e_dash, k_0, score, input_hash, preset, manifest, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (optimized_params.lamda_gas.actual_value, optimized_params.e_dash.actual_value,
+                 optimized_params.k_0.actual_value,
+                 manifest.score if manifest else None,
+                 manifest.input_hash if manifest else None,
+                 preset,
+                 json.dumps(asdict(manifest)) if manifest else None,
+                 datetime.now().isoformat()),
+            )
+            fit_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO fit_experiments (fit_id, experiment_id, position) VALUES (?, ?, ?)",
+                [(fit_id, experiment_id, position) for position, experiment_id in enumerate(experiment_ids)],
+            )
+            return fit_id
+
+    def query_fits(self, sample_name: Optional[str] = None, temperature: Optional[float] = None,
+                   date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                   max_score: Optional[float] = None, input_hash: Optional[str] = None,
+                   order_by: str = "created_at", limit: int = 50, offset: int = 0) -> List[FitRecord]:
+        """
+        Page through fits, e.g. all fits of sample X at 70 °C ordered by score.
+
+        A fit matches the experiment filters if any of its experiments matches them.
+
+        Args:
+            sample_name (str, optional): Exact sample name of a fitted experiment.
+            temperature (float, optional): Temperature of a fitted experiment [°C].
+            date_from (datetime, optional): Earliest experiment start date (inclusive).
+            date_to (datetime, optional): Latest experiment start date (inclusive).
+            max_score (float, optional): Only fits with a score at most this value.
+            input_hash (str, optional): Only fits of exactly these inputs (see FitManifest).
+            order_by (str): "created_at" (newest first) or "score" (best first).
+            limit (int): Page size.
+            offset (int): Number of fits to skip.
+
+        Returns:
+            List[FitRecord]: The fits of the page.
+        """
+        if order_by not in ("created_at", "score"):
+            raise ValueError(f"order_by must be 'created_at' or 'score', not {order_by}")
+        where, params = self._experiment_filters(sample_name, temperature, date_from, date_to, prefix="e.")
+        clauses = [where[len("WHERE "):]] if where else []
+        if max_score is not None:
+            clauses.append("f.score <= ?")
+            params.append(max_score)
+        if input_hash is not None:
+            clauses.append("f.input_hash = ?")
+            params.append(input_hash)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        order = "f.created_at DESC" if order_by == "created_at" else "f.score ASC"
+
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT f.* FROM fits f "
+                "JOIN fit_experiments fe ON fe.fit_id = f.id "
+                "JOIN experiments e ON e.id = fe.experiment_id "
+                f"{where} ORDER BY {order}, f.id LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+            experiment_ids = {row['id']: [] for row in rows}
+            if experiment_ids:
+                placeholders = ", ".join("?" * len(experiment_ids))
+                for link in self._connection.execute(
+                        f"SELECT fit_id, experiment_id FROM fit_experiments WHERE fit_id IN ({placeholders}) "
+                        "ORDER BY fit_id, position", list(experiment_ids)):
+                    experiment_ids[link['fit_id']].append(link['experiment_id'])
+
+            records = []
+            for row in rows:
+                records.append(FitRecord(
+                    id=row['id'],
+                    lamda_gas=row['lamda_gas'],
+                    e_dash=row['e_dash'],
+                    k_0=row['k_0'],
+                    score=row['score'],
+                    input_hash=row['input_hash'],
+                    preset=row['preset'],
+                    created_at=row['created_at'],
+                    experiment_ids=experiment_ids[row['id']],
+                    manifest=json.loads(row['manifest']) if row['manifest'] else None,
+                ))
+            return records
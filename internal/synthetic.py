@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from internal.calculator import ModelParams, estimate_thermal_conductivity
+from internal.interface import Experiment, MeasurementData
+
+# Parameters of a typical foam board: λgas=0.004 W/(m･K), E=33 kJ/mol, k₀=0.1
+DEFAULT_TRUE_PARAMS = (0.004, 33000.0, 0.1)
+
+
+def true_params(lamda_gas: float = DEFAULT_TRUE_PARAMS[0], e_dash: float = DEFAULT_TRUE_PARAMS[1],
+                k_0: float = DEFAULT_TRUE_PARAMS[2]) -> ModelParams:
+    """
+    Create the ground-truth parameters.
+
+    Args:
+        lamda_gas (float): λgas [W/(m･K)].
+        e_dash (float): E [J/mol].
+        k_0 (float): k₀ [-].
+
+    Returns:
+        ModelParams: The parameters.
+    """
+    return ModelParams(lamda_gas=lamda_gas, e_dash=e_dash, k_0=k_0)
+
+
+def generate_experiment(
+        params: ModelParams,
+        temperature: float,
+        n_points: int = 20,
+        duration_days: int = 365,
+        initial_thermal_conductivity: float = 0.022,
+        noise_std: float = 0.0,
+        sample_name: str = "synthetic",
+        start_date: datetime = datetime(2024, 1, 1),
+        rng: Optional[np.random.Generator] = None,
+        jitter_days: float = 0.0,
+        outlier_fraction: float = 0.0,
+        outlier_std: float = 5e-4,
+) -> Experiment:
+    """
+    Generate an Experiment whose measurements follow the model, optionally with Gaussian noise.
+
+    Measurements are spaced evenly over ``duration_days`` (rounded to whole days); ``jitter_days``
+    shifts each later measurement by up to that many days, as with irregular measurement dates.
+    The first measurement is exact (it is λ0); the others get noise and, with ``outlier_fraction``,
+    a random share of them an additional large error (``outlier_std``).
+
+    Args:
+        params (ModelParams): The true model parameters.
+        temperature (float): Exposure temperature [°C].
+        n_points (int): Number of measurements.
+        duration_days (int): Time of the last measurement [days].
+        initial_thermal_conductivity (float): Conductivity at day 0 [W/(m･K)].
+        noise_std (float): Standard deviation of the measurement noise [W/(m･K)].
+        sample_name (str): Name of the sample.
+        start_date (datetime): Date of the first measurement.
+        rng (np.random.Generator, optional): Random generator for the noise.
+        jitter_days (float): Maximum shift of the measurement dates [days].
+        outlier_fraction (float): Share of the measurements with an outlying error.
+        outlier_std (float): Standard deviation of the outlying errors [W/(m･K)].
+
+    Returns:
+        Experiment: The synthetic experiment.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    elapsed_days = np.linspace(0, duration_days, n_points)
+    if jitter_days > 0 and n_points > 1:
+        elapsed_days[1:] += rng.uniform(-jitter_days, jitter_days, n_points - 1)
+    elapsed_days = np.unique(np.clip(np.round(elapsed_days), 0, None).astype(int))
+    thermal_conductivity = estimate_thermal_conductivity(
+        e_dash=params.e_dash,
+        experiment_temperature=temperature,
+        measurement_time_sec=elapsed_days.astype(np.float64) * 86400,
+        lamda_gas=params.lamda_gas,
+        initial_thermal_conductivity=initial_thermal_conductivity,
+        k_0=params.k_0,
+    )
+    n_noisy = len(elapsed_days) - 1
+    if noise_std > 0 and n_noisy > 0:
+        thermal_conductivity[1:] += rng.normal(0.0, noise_std, n_noisy)
+    if outlier_fraction > 0 and n_noisy > 0:
+        outliers = 1 + rng.choice(n_noisy, size=int(round(outlier_fraction * n_noisy)), replace=False)
+        thermal_conductivity[outliers] += rng.normal(0.0, outlier_std, len(outliers))
+
+    experiment = Experiment(sample_name=sample_name, temperature=temperature)
+    for i, (days, value) in enumerate(zip(elapsed_days.tolist(), thermal_conductivity.tolist())):
+        experiment.measurements.append(MeasurementData(
+            id=i,
+            measurement_date=start_date + timedelta(days=days),
+            elapsed_days=days,
+            thermal_conductivity=value,
+            thermal_conductivity_increase=value - initial_thermal_conductivity,
+        ))
+    return experiment
+
+
+def generate_experiments(params: ModelParams, temperatures: Sequence[float] = (23.0, 70.0),
+                         seed: Optional[int] = None, sample_name: str = "synthetic", **options) -> List[Experiment]:
+    """
+    Generate one experiment per temperature with the same true parameters.
+
+    Args:
+        params (ModelParams): The true model parameters.
+        temperatures: Exposure temperatures [°C].
+        seed (int, optional): Seed of the noise, for reproducible data.
+        sample_name (str): Prefix of the sample names (``"<sample_name> <temperature>°C"``).
+        **options: Passed to generate_experiment (n_points, duration_days, noise_std, jitter_days, ...).
+
+    Returns:
+        List[Experiment]: The experiments, in the order of ``temperatures``.
+    """
+    rng = np.random.default_rng(seed)
+    return [generate_experiment(params, temperature, sample_name=f"{sample_name} {temperature:g}°C", rng=rng,
+                                **options)
+            for temperature in temperatures]
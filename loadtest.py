@@ -0,0 +1,262 @@
+"""
+Synthetic data and headless load tests of the fitting app.
+
+Usage:
+    python loadtest.py generate --temperatures 23 50 70 --points 100 --noise 5e-5 --output-dir data
+    python loadtest.py pipeline --sessions 8 --fits 4 --preset fast
+    python loadtest.py app --sessions 4 --fits 2 --preset fast
+
+``generate`` writes synthetic experiments (internal/synthetic.py) as JSON files. ``pipeline`` runs
+N concurrent sessions that each submit fits through the same path as the form (converter and the
+shared FitScheduler). ``app`` runs main.py in N concurrent Streamlit AppTest sessions that fill the
+form with the sidebar's synthetic example data and press "Calculate". Both report throughput,
+latency percentiles and the resident memory (driver and worker processes) before, at the peak of
+and after the run.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from internal.calculator import DEFAULT_SOLVER_PRESET, SOLVER_PRESETS, get_solver_config
+from internal.cli import print_table
+from internal.converter import experiment_converter
+from internal.experiment import write_interface
+from internal.synthetic import generate_experiments, true_params
+
+# Seconds between two memory samples during a run
+MEMORY_SAMPLE_SEC = 0.2
+
+
+def _process_rss_kib(pid) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _child_pids(pid) -> List[int]:
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children += [int(child) for child in f.read().split()]
+        except OSError:
+            continue
+    return children
+
+
+def rss_mib() -> float:
+    """
+    Resident memory [MiB] of this process and its child processes (scheduler workers).
+
+    Falls back to the peak RSS of this process where /proc is not available.
+    """
+    try:
+        pids, total_kib = [os.getpid()], 0
+        while pids:
+            pid = pids.pop()
+            try:
+                total_kib += _process_rss_kib(pid)
+                pids += _child_pids(pid)
+            except OSError:
+                continue  # the process exited meanwhile
+        return total_kib / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_sessions(submit: Callable[[int, int], None], n_sessions: int, n_fits: int) -> dict:
+    """
+    Run ``n_sessions`` concurrent sessions, each calling ``submit(session, fit)`` ``n_fits`` times in a row.
+
+    Returns:
+        dict: Throughput, latency percentiles [s], errors and memory [MiB] of the run.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    memory = [rss_mib()]
+    done = threading.Event()
+
+    def sample_memory():
+        while not done.wait(MEMORY_SAMPLE_SEC):
+            memory.append(rss_mib())
+
+    def session(index: int):
+        for fit in range(n_fits):
+            start = time.perf_counter()
+            try:
+                submit(index, fit)
+            except Exception as e:
+                with lock:
+                    errors.append(f"session {index} fit {fit}: {type(e).__name__}: {e}")
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    threads = [threading.Thread(target=session, args=(index,)) for index in range(n_sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time_sec = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    memory.append(rss_mib())
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (np.nan,) * 3
+    for error in errors[:10]:
+        print(error, file=sys.stderr)
+    return {
+        'sessions': n_sessions,
+        'fits': len(latencies),
+        'errors': len(errors),
+        'wall_sec': wall_time_sec,
+        'fits_per_sec': len(latencies) / wall_time_sec,
+        'p50_sec': float(p50),
+        'p95_sec': float(p95),
+        'p99_sec': float(p99),
+        'max_sec': float(max(latencies, default=np.nan)),
+        'rss_start_MiB': memory[0],
+        'rss_peak_MiB': max(memory),
+        'rss_end_MiB': memory[-1],
+    }
+
+
+def pipeline_load_test(n_sessions: int, n_fits: int, preset: str = DEFAULT_SOLVER_PRESET,
+                       n_points: int = 20, max_workers: Optional[int] = None,
+                       cpu_budget_sec: Optional[float] = None) -> dict:
+    """Load test of the form's fit path: synthetic data, converter and the shared FitScheduler."""
+    from internal.checkpoint import DEFAULT_CHECKPOINT_DIR
+    from internal.scheduler import FitScheduler, scheduler_settings, schedule_table_fit
+
+    settings = scheduler_settings()
+    if max_workers is not None:
+        settings['max_workers'] = max_workers
+    if cpu_budget_sec is not None:
+        settings['cpu_budget_sec'] = cpu_budget_sec or None
+    scheduler = FitScheduler(**settings)
+    solver_config = get_solver_config(preset, disp=False)
+
+    def submit(session: int, fit: int):
+        experiments = generate_experiments(true_params(), (23.0, 70.0), seed=session * 100003 + fit,
+                                           n_points=n_points, noise_std=5e-5)
+        tables = [experiment_converter(experiment) for experiment in experiments]
+        schedule_table_fit(scheduler, f"session-{session}", tables,
+                           [experiment.temperature for experiment in experiments], solver_config,
+                           checkpoint_dir=DEFAULT_CHECKPOINT_DIR)
+
+    try:
+        result = run_sessions(submit, n_sessions, n_fits)
+    finally:
+        scheduler.shutdown()
+    return {**result, 'workers': settings['max_workers']}
+
+
+def app_load_test(n_sessions: int, n_fits: int, preset: str = DEFAULT_SOLVER_PRESET, n_points: int = 20,
+                  app_path: str = "main.py", timeout_sec: float = 600) -> dict:
+    """
+    Load test of the Streamlit app: every session is an AppTest of ``app_path`` that fills the form
+    with synthetic data (a different seed per fit) and presses "Calculate".
+
+    Each AppTest gets its own ``session_id`` in its session state (see main.current_session_id), so
+    the per-session limit and supersede rules of the scheduler apply to each session separately.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    def submit(session: int, fit: int):
+        app = sessions[session]
+        app.checkbox(key="synthetic_example").check()
+        app.number_input(key="synthetic_seed").set_value(session * 100003 + fit)
+        app.number_input(key="synthetic_points").set_value(n_points)
+        next(widget for widget in app.selectbox if widget.label == "Solver preset").select(preset)
+        app.run()  # re-render the form with the example data
+        next(button for button in app.button if button.label == "Calculate").click()
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+        if app.error:
+            raise RuntimeError(app.error[0].value)
+
+    sessions = [AppTest.from_file(app_path, default_timeout=timeout_sec) for _ in range(n_sessions)]
+    for index, app in enumerate(sessions):
+        # AppTests share one Streamlit session id: give each its own, so the scheduler sees N sessions
+        app.session_state['session_id'] = f"apptest-{index}"
+        app.run()
+    return run_sessions(submit, n_sessions, n_fits)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate", help="write synthetic experiments as JSON files")
+    generate_parser.add_argument("--temperatures", type=float, nargs="+", default=[23.0, 70.0])
+    generate_parser.add_argument("--points", type=int, default=20, help="measurements per experiment")
+    generate_parser.add_argument("--days", type=int, default=365, help="duration of each experiment")
+    generate_parser.add_argument("--noise", type=float, default=5e-5, help="noise standard deviation [W/(m･K)]")
+    generate_parser.add_argument("--jitter-days", type=float, default=0.0, help="irregularity of the dates")
+    generate_parser.add_argument("--outliers", type=float, default=0.0, help="share of outlying measurements")
+    generate_parser.add_argument("--params", type=float, nargs=3, metavar=("LAMDA_GAS", "E", "K_0"),
+                                 help="true parameters (default: internal.synthetic.DEFAULT_TRUE_PARAMS)")
+    generate_parser.add_argument("--seed", type=int, default=None)
+    generate_parser.add_argument("--output-dir", default=".")
+
+    for name, help_text in (("pipeline", "concurrent sessions fitting through the shared scheduler"),
+                            ("app", "concurrent Streamlit AppTest sessions of main.py")):
+        load_parser = subparsers.add_parser(name, help=help_text)
+        load_parser.add_argument("--sessions", type=int, nargs="+", default=[4],
+                                 help="concurrent sessions (several values: one run each)")
+        load_parser.add_argument("--fits", type=int, default=2, help="fits per session")
+        load_parser.add_argument("--preset", choices=list(SOLVER_PRESETS), default="fast")
+        load_parser.add_argument("--points", type=int, default=20, help="measurements per experiment")
+        load_parser.add_argument("--output", help="also write the results to this JSON file")
+    subparsers.choices["pipeline"].add_argument("--workers", type=int, default=None,
+                                                help="scheduler workers (default: EXPOSURE_FIT_WORKERS)")
+    subparsers.choices["pipeline"].add_argument("--cpu-budget", type=float, default=None,
+                                                help="CPU budget per fit [s], 0 for none")
+    subparsers.choices["app"].add_argument("--store", default=None,
+                                           help="experiment store of the app (default: a temporary file)")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        params = true_params(*args.params) if args.params else true_params()
+        os.makedirs(args.output_dir, exist_ok=True)
+        experiments = generate_experiments(params, args.temperatures, seed=args.seed, n_points=args.points,
+                                           duration_days=args.days, noise_std=args.noise,
+                                           jitter_days=args.jitter_days, outlier_fraction=args.outliers)
+        for experiment in experiments:
+            file_path = os.path.join(args.output_dir, f"synthetic_{experiment.temperature:g}C.json")
+            write_interface(experiment, file_path)
+            print(file_path)
+        return 0
+
+    if args.command == "app":
+        # The app saves every fit: keep the load test out of the real store
+        os.environ["EXPOSURE_STORE_PATH"] = args.store or os.path.join(tempfile.mkdtemp(), "loadtest.db")
+        results = [app_load_test(n_sessions, args.fits, preset=args.preset, n_points=args.points)
+                   for n_sessions in args.sessions]
+    else:
+        results = [pipeline_load_test(n_sessions, args.fits, preset=args.preset, n_points=args.points,
+                                      max_workers=args.workers, cpu_budget_sec=args.cpu_budget)
+                   for n_sessions in args.sessions]
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
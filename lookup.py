@@ -0,0 +1,76 @@
+"""
+Lookup tables of λ(temperature, time) and time-to-fraction(temperature, fraction) per material.
+
+Usage:
+    python lookup.py build --store experiments.db --material "condition 01" "condition 02" --output tables.npz
+    python lookup.py query tables.npz --material "condition 01" --temperature 23 --lconv-fraction 0.95
+    python lookup.py query tables.npz --material "condition 01" --temperature 23 40 --days 3650
+
+``build`` evaluates the model of the latest fit of each given material (sample name) in the experiment
+store on the default grids; ``query`` interpolates the stored tables (NaN outside the grids).
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from internal.cli import print_table
+from internal.lookup import build_lookup_tables_from_store, load_lookup_tables, save_lookup_tables
+from internal.store import DEFAULT_STORE_PATH, ExperimentStore
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="build the tables from the fit history")
+    build_parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="experiment store (SQLite file)")
+    build_parser.add_argument("--material", nargs="+", required=True,
+                              help="materials (sample names of the fitted experiments)")
+    build_parser.add_argument("--output", required=True, help="output .npz file")
+    build_parser.add_argument("--max-score", type=float, default=None, help="skip fits with a worse score")
+
+    query_parser = subparsers.add_parser("query", help="query stored tables")
+    query_parser.add_argument("tables", help=".npz file written by build")
+    query_parser.add_argument("--material", required=True)
+    query_parser.add_argument("--temperature", type=float, nargs="+", required=True, help="[°C]")
+    query = query_parser.add_mutually_exclusive_group(required=True)
+    query.add_argument("--days", type=float, nargs="+", help="λ after these exposure times")
+    query.add_argument("--fraction", type=float, nargs="+", help="days until the increase reaches λgas × fraction")
+    query.add_argument("--lconv-fraction", type=float, nargs="+", help="days until λ reaches Lconv × fraction")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        try:
+            tables = build_lookup_tables_from_store(ExperimentStore(args.store), args.material,
+                                                    max_score=args.max_score)
+        except ValueError as error:
+            parser.error(str(error))
+        save_lookup_tables(tables, args.output)
+        print(f"{len(tables)} materials: {', '.join(tables)}")
+        return 0
+
+    tables = load_lookup_tables(args.tables)
+    if args.material not in tables:
+        parser.error(f"unknown material: {args.material} (available: {', '.join(tables)})")
+    table = tables[args.material]
+    temperature = np.asarray(args.temperature)[:, None]
+    if args.days:
+        column, values = "days", args.days
+        results = table.conductivity_at(temperature, np.asarray(values)[None, :])
+    elif args.fraction:
+        column, values = "fraction", args.fraction
+        results = table.time_to_fraction_days(temperature, np.asarray(values)[None, :])
+    else:
+        column, values = "lconv_fraction", args.lconv_fraction
+        results = table.time_to_lconv_fraction_days(temperature, np.asarray(values)[None, :])
+    result_column = "conductivity" if args.days else "result_days"
+    print_table([
+        {'temperature': float(t), column: float(value), result_column: float(results[i, j])}
+        for i, t in enumerate(args.temperature) for j, value in enumerate(values)
+    ])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,16 @@ import io
 import pandas as pd
 import plotly.io as pio
 
+from internal.backends import DEFAULT_SOLVER_BACKEND, SOLVER_BACKENDS
+from internal.calculator import DEFAULT_SOLVER_PRESET, SOLVER_PRESETS, get_solver_config, table_fit_results
+from internal.checkpoint import DEFAULT_CHECKPOINT_DIR
+from internal.export import EXPORT_FORMATS, EXPORT_MIME_TYPES, export_file_name, export_sample, export_samples
 from internal.form import create_experiment_form
+from internal.profiling import PipelineProfiler, profiling_enabled
+from internal.report import ReportSample, alternative_rows, result_rows, samples_from_store, submit_report
+from internal.scheduler import FitScheduler, scheduler_settings
+from internal.store import ExperimentStore
+from internal.synthetic import generate_experiments, true_params
 from internal.visualization import create_thermal_conductivity_plot
 
 # Set page configuration
@@ -22,6 +31,29 @@ st.markdown("""
 This tool helps analyze thermal conductivity measurements and optimize parameters for thermal conductivity estimation.
 """)
 
+
+@st.cache_resource
+def get_store() -> ExperimentStore:
+    return ExperimentStore()
+
+
+@st.cache_resource
+def get_scheduler() -> FitScheduler:
+    # One scheduler for all sessions of the server
+    return FitScheduler(**scheduler_settings())
+
+
+def current_session_id() -> str:
+    # An id in the session state comes first: loadtest.py gives each AppTest its own, since they
+    # all run under the same Streamlit session id
+    if 'session_id' in st.session_state:
+        return st.session_state.session_id
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+
 # Initialize session state for storing experiment data
 if 'experiment' not in st.session_state:
     st.session_state.experiment = None
@@ -31,9 +63,58 @@ if 'calculate_table_2' not in st.session_state:
     st.session_state.calculate_table_2 = None
 if 'optimized_params' not in st.session_state:
     st.session_state.optimized_params = None
+if 'fit_results' not in st.session_state:
+    st.session_state.fit_results = None
+if 'exports' not in st.session_state:
+    st.session_state.exports = {}
+
+# Solver settings
+solver_preset = st.sidebar.selectbox(
+    "Solver preset",
+    options=list(SOLVER_PRESETS),
+    index=list(SOLVER_PRESETS).index(DEFAULT_SOLVER_PRESET),
+    help="fast: interactive use / balanced: default / exhaustive: final reports",
+)
+solver_backend = st.sidebar.selectbox(
+    "Solver backend",
+    options=list(SOLVER_BACKENDS),
+    index=list(SOLVER_BACKENDS).index(DEFAULT_SOLVER_BACKEND),
+    help="hybrid: short global search, then parallel local searches of the distinct minima (lists alternatives)",
+)
+reject_outliers = st.sidebar.checkbox(
+    "Reject outliers",
+    value=False,
+    help="Exclude measurements with large residuals from the fit and refit",
+)
+
+profile_calculation = st.sidebar.checkbox(
+    "Profile calculation",
+    value=profiling_enabled(),
+    help="Record cProfile stats and peak memory of each stage of the next calculation",
+)
+profiler = PipelineProfiler(enabled=profile_calculation)
+
+# Synthetic example data (demo and headless load tests, see loadtest.py)
+with st.sidebar.expander("Example data"):
+    use_example = st.checkbox("Fill the form with synthetic data", value=False, key="synthetic_example")
+    example_seed = st.number_input("Seed", min_value=0, value=0, step=1, key="synthetic_seed")
+    example_points = st.number_input("Measurements", min_value=2, value=20, step=1, key="synthetic_points")
+example_experiments = generate_experiments(
+    true_params(), (23.0, 70.0), seed=int(example_seed), n_points=int(example_points), noise_std=5e-5,
+) if use_example else None
 
 # Create Experiment Page
-submitted, experiment_1, experiment_2, calculate_table_1, calculate_table_2, optimized_params = create_experiment_form()
+submitted, experiment_1, experiment_2, calculate_table_1, calculate_table_2, optimized_params = create_experiment_form(
+    solver_config=get_solver_config(solver_preset, backend=solver_backend),
+    reject_outliers=reject_outliers,
+    scheduler=get_scheduler(),
+    session_id=current_session_id(),
+    checkpoint_dir=DEFAULT_CHECKPOINT_DIR,
+    profiler=profiler,
+    example_experiments=example_experiments,
+)
+# Only the run that submitted the form is profiled (plots included)
+profiler.enabled = profiler.enabled and submitted
 if submitted:
     # Update session state with form results
     st.session_state.experiment_1 = experiment_1
@@ -41,13 +122,86 @@ if submitted:
     st.session_state.calculate_table_1 = calculate_table_1
     st.session_state.calculate_table_2 = calculate_table_2
     st.session_state.optimized_params = optimized_params
+    st.session_state.fit_results = table_fit_results(
+        (calculate_table_1, calculate_table_2), (experiment_1.temperature, experiment_2.temperature),
+        optimized_params.model_params, rejected_points=optimized_params.manifest.rejected_points)
+    st.session_state.exports = {}
+
+    # Keep the experiments and the fit in the history store
+    get_store().save_fit([experiment_1, experiment_2], optimized_params, preset=solver_preset)
+
+# Scheduler metrics
+with st.sidebar.expander("Scheduler"):
+    scheduler_metrics = get_scheduler().metrics()
+    st.write(f"Running: {scheduler_metrics['running']} / {scheduler_metrics['max_workers']}, "
+             f"queued: {scheduler_metrics['queued']}")
+    st.json(scheduler_metrics, expanded=False)
+
+# Fit history
+with st.sidebar.expander("Fit history"):
+    history_page = st.number_input("Page", min_value=1, value=1, step=1, key="history_page")
+    history_page_size = 10
+    fit_records = get_store().query_fits(limit=history_page_size, offset=(history_page - 1) * history_page_size)
+    if fit_records:
+        st.dataframe(pd.DataFrame([{
+            "date": record.created_at[:16],
+            "preset": record.preset,
+            "λgas": record.lamda_gas,
+            "E": record.e_dash,
+            "k₀": record.k_0,
+            "score": record.score,
+        } for record in fit_records]), hide_index=True)
+    else:
+        st.caption("No fits stored yet.")
+
+# Report export (built in the background, the app stays responsive)
+with st.sidebar.expander("Report export"):
+    report_fits = st.number_input("Latest fits", min_value=1, value=10, step=1, key="report_fits")
+    if st.button("Build report (PDF / HTML / CSV zip)"):
+        st.session_state.report_future = submit_report(samples_from_store(get_store(), limit=report_fits))
+    report_future = st.session_state.get('report_future')
+    if report_future is not None:
+        if not report_future.done():
+            st.caption("Building report...")
+            st.button("Refresh", key="report_refresh")
+        elif report_future.exception() is not None:
+            st.error(f"Report failed: {report_future.exception()}")
+        else:
+            report_files = report_future.result()
+            report_mimes = {"pdf": "application/pdf", "html": "text/html", "zip": "application/zip"}
+            for report_format, report_data in report_files.items():
+                st.download_button(
+                    label=f"Download {report_format.upper()}",
+                    data=report_data,
+                    file_name=f"report_{date.today()}.{report_format}",
+                    mime=report_mimes[report_format],
+                    key=f"report_{report_format}",
+                )
 
 # Display optimization results if available
 if st.session_state.optimized_params is not None and st.session_state.calculate_table_1 is not None:
     st.header("Optimization Results")
 
-    # Extract parameters
-    optimized_params = st.session_state.optimized_params
+    # Derived metrics of the fit (Lconv, rate, t50/t90, fit quality), computed once by the calculator
+    fit_results = st.session_state.fit_results
+
+    # Plot data downloads: each file is built once per fit and format, then reused on every rerun
+    plot_samples = [
+        ReportSample(st.session_state.experiment_1, st.session_state.calculate_table_1,
+                     st.session_state.optimized_params.model_params),
+        ReportSample(st.session_state.experiment_2, st.session_state.calculate_table_2,
+                     st.session_state.optimized_params.model_params),
+    ]
+    export_format = st.radio("Download format", options=EXPORT_FORMATS, horizontal=True, key="export_format")
+
+    def cached_export(fmt: str, index=None):
+        key = (fmt, index)
+        if key not in st.session_state.exports:
+            manifest = st.session_state.optimized_params.manifest
+            st.session_state.exports[key] = (
+                export_samples(plot_samples, fmt, manifest) if index is None
+                else export_sample(plot_samples[index], fmt, manifest))
+        return st.session_state.exports[key]
 
     st.subheader("Thermal Conductivity: Actual vs. Estimated")
 
@@ -55,76 +209,62 @@ if st.session_state.optimized_params is not None and st.session_state.calculate_
     col1, col2 = st.columns(2)
     with col1:
         st.info(f"sample01 condition: {st.session_state.experiment_1.sample_name}")
-        result_thermal_conductivity = optimized_params.lamda_gas.actual_value + \
-                                      st.session_state.experiment_1.measurements[0].thermal_conductivity
-        fig = create_thermal_conductivity_plot(
-            calculate_table=st.session_state.calculate_table_1,
-        )
+        with profiler.stage("create_thermal_conductivity_plot"):
+            fig = create_thermal_conductivity_plot(
+                calculate_table=st.session_state.calculate_table_1,
+            )
         st.plotly_chart(fig)
-        results_1 = {
-            str(st.session_state.experiment_1.temperature) + "(°C)"+ "暴露:長期経過後の収束値 Lconv[W/(m･K)]": f"{result_thermal_conductivity:.4f} W/(m･K)",
-            "λgas[W/(m･K)]": f"{optimized_params.lamda_gas.actual_value:.4f} W/(m･K)",
-            "E[J/mol]": f"{optimized_params.e_dash.actual_value:.1f} J/mol",
-            "k₀[-]": f"{optimized_params.k_0.actual_value:.6f} -",
-        }
+        results_1 = result_rows(fit_results, 0)
         st.table(results_1, border="horizontal")
 
-        # Create CSV data for plot data
-        # Extract data for plotting
-        elapsed_days_1 = [row.elapsed_sec / 86400 for row in st.session_state.calculate_table_1.rows]
-        actual_conductivity_1 = [row.thermal_conductivity for row in st.session_state.calculate_table_1.rows]
-        estimated_conductivity_1 = [row.estimated_conductivity for row in st.session_state.calculate_table_1.rows]
-
-        # Create DataFrame and CSV
-        plot_data_1 = pd.DataFrame({
-            'Elapsed Days': elapsed_days_1,
-            'Actual Conductivity (W/(m･K))': actual_conductivity_1,
-            'Estimated Conductivity (W/(m･K))': estimated_conductivity_1
-        })
-        plot_csv_1 = plot_data_1.to_csv(index=False)
-        # Add CSV download button for plot data
+        # Plot data download, written from the table columns (see internal/export.py)
         st.download_button(
-            label="Download as CSV",
-            data=plot_csv_1,
-            file_name=f"plot_data_sample01_{date.today()}_{st.session_state.experiment_1.sample_name}.csv",
-            mime="text/csv",
+            label=f"Download as {export_format.upper()}",
+            data=cached_export(export_format, 0),
+            file_name=export_file_name(export_format, plot_samples[0], 0),
+            mime=EXPORT_MIME_TYPES[export_format],
             key="plot_data_1"
         )
     with col2:
         st.info(f"sample02 condition: {st.session_state.experiment_2.sample_name}")
-        result_thermal_conductivity = optimized_params.lamda_gas.actual_value + \
-                                      st.session_state.experiment_2.measurements[0].thermal_conductivity
-        fig = create_thermal_conductivity_plot(
-            calculate_table=st.session_state.calculate_table_2,
-        )
+        with profiler.stage("create_thermal_conductivity_plot"):
+            fig = create_thermal_conductivity_plot(
+                calculate_table=st.session_state.calculate_table_2,
+            )
         st.plotly_chart(fig)
 
-        results_2 = {
-            str(st.session_state.experiment_2.temperature) + "(°C)"+ "暴露：長期経過後の収束値 Lconv[W/(m･K)]": f"{result_thermal_conductivity:.4f} W/(m･K)",
-            "λgas[W/(m･K)]": f"{optimized_params.lamda_gas.actual_value:.4f} W/(m･K)",
-            "E[J/mol]": f"{optimized_params.e_dash.actual_value:.1f} J/mol",
-            "k₀[-]": f"{optimized_params.k_0.actual_value:.6f} -",
-        }
+        results_2 = result_rows(fit_results, 1)
         st.table(results_2, border="horizontal")
 
-        # Create CSV data for plot data
-        # Extract data for plotting
-        elapsed_days_2 = [row.elapsed_sec / 86400 for row in st.session_state.calculate_table_2.rows]
-        actual_conductivity_2 = [row.thermal_conductivity for row in st.session_state.calculate_table_2.rows]
-        estimated_conductivity_2 = [row.estimated_conductivity for row in st.session_state.calculate_table_2.rows]
-
-        # Create DataFrame and CSV
-        plot_data_2 = pd.DataFrame({
-            'Elapsed Days': elapsed_days_2,
-            'Actual Conductivity (W/(m･K))': actual_conductivity_2,
-            'Estimated Conductivity (W/(m･K))': estimated_conductivity_2
-        })
-        plot_csv_2 = plot_data_2.to_csv(index=False)
-        # Add CSV download button for plot data
+        # Plot data download, written from the table columns (see internal/export.py)
         st.download_button(
-            label="Download as CSV",
-            data=plot_csv_2,
-            file_name=f"plot_data_sample02_{date.today()}_{st.session_state.experiment_2.sample_name}.csv",
-            mime="text/csv",
+            label=f"Download as {export_format.upper()}",
+            data=cached_export(export_format, 1),
+            file_name=export_file_name(export_format, plot_samples[1], 1),
+            mime=EXPORT_MIME_TYPES[export_format],
             key="plot_data_2"
         )
+
+    # Both samples in one file, with Sample and Temperature columns
+    st.download_button(
+        label=f"Download all samples as {export_format.upper()}",
+        data=cached_export(export_format),
+        file_name=export_file_name(export_format),
+        mime=EXPORT_MIME_TYPES[export_format],
+        key="plot_data_all"
+    )
+
+    # Distinct minima of the hybrid backend (e.g. high E with high k₀ against low E with low k₀)
+    alternatives = alternative_rows(st.session_state.optimized_params.manifest)
+    if len(alternatives) > 1:
+        with st.expander("Alternative solutions"):
+            st.dataframe(pd.DataFrame(alternatives), hide_index=True)
+
+# Profile of the calculation
+if profiler.stages:
+    st.session_state.profile_dir = profiler.write()
+    st.session_state.profile_summary = profiler.summary()
+if st.session_state.get('profile_summary'):
+    with st.sidebar.expander("Profile", expanded=bool(profiler.stages)):
+        st.dataframe(pd.DataFrame(st.session_state.profile_summary), hide_index=True)
+        st.caption(f"cProfile stats: {st.session_state.profile_dir}")
@@ -0,0 +1,46 @@
+"""
+HTTP fitting service for other lab systems.
+
+Usage:
+    python serve.py --port 8000 --workers 2 --max-queue 16
+
+    POST /fits          {"experiments": [<experiment 1>, <experiment 2>], "preset": "fast"}
+    GET  /fits/<job_id>
+    GET  /health
+
+Experiments use the JSON format of internal/experiment.py (write_interface).
+"""
+import argparse
+import asyncio
+import sys
+
+from internal.service import FitService
+
+
+async def run(host: str, port: int, workers: int, max_queue: int):
+    service = FitService(max_workers=workers, max_queue=max_queue)
+    server = await service.serve(host, port)
+    print(f"Serving on http://{host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.shutdown()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2, help="fit processes")
+    parser.add_argument("--max-queue", type=int, default=16, help="unfinished jobs before answering 429")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run(args.host, args.port, args.workers, args.max_queue))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+# The modules are run from the repository root (no package installation)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from internal.const import R_gas_constant, kelvin_constant  # noqa: E402
+from internal.interface import Experiment, MeasurementData  # noqa: E402
+
+# Actual (lamda_gas, e_dash, k_0) of the test data
+TRUE_PARAMS = (0.004, 33000.0, 0.1)
+
+
+def model_experiment(temperature: float, n_points: int = 40, duration_days: int = 365, noise_std: float = 5e-5,
+                     seed: int = 0, initial_thermal_conductivity: float = 0.022,
+                     sample_name: str = "sample") -> Experiment:
+    """Experiment whose measurements follow the model with TRUE_PARAMS, plus Gaussian noise."""
+    lamda_gas, e_dash, k_0 = TRUE_PARAMS
+    elapsed_days = np.round(np.linspace(0, duration_days, n_points)).astype(int)
+    rate = k_0 * np.exp(-e_dash / (R_gas_constant * (temperature + kelvin_constant)))
+    values = initial_thermal_conductivity + lamda_gas * (1 - np.exp(-rate * elapsed_days * 86400.0))
+    values[1:] += np.random.default_rng(seed).normal(0.0, noise_std, n_points - 1)
+
+    experiment = Experiment(sample_name=f"{sample_name} {temperature:g}°C", temperature=temperature)
+    start_date = datetime(2024, 1, 1)
+    for i, (days, value) in enumerate(zip(elapsed_days.tolist(), values.tolist())):
+        experiment.measurements.append(MeasurementData(
+            id=i,
+            measurement_date=start_date + timedelta(days=days),
+            elapsed_days=days,
+            thermal_conductivity=value,
+            thermal_conductivity_increase=value - initial_thermal_conductivity,
+        ))
+    return experiment
+
+
+@pytest.fixture
+def experiments():
+    """Two experiments (23 °C and 70 °C) with measurement noise."""
+    return [model_experiment(23.0, seed=0), model_experiment(70.0, seed=1)]
+
+
+@pytest.fixture
+def packed(experiments):
+    """(packed series, normalizer) of the experiments, as fitted by minimize_solver."""
+    from internal.calculator import pack_tables
+    from internal.converter import experiment_converter
+
+    tables = [experiment_converter(experiment) for experiment in experiments]
+    return pack_tables(tables, [experiment.temperature for experiment in experiments])
+
+
+@pytest.fixture
+def make_experiment():
+    """Factory of model experiments (see model_experiment)."""
+    return model_experiment
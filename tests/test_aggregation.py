@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch
+from internal.aggregation import bin_series, fit_aggregated, reduce_series, series_from_frame, simplify_series
+from internal.calculator import get_solver_config
+from internal.cleaning import clean_measurements, measurement_frame, measurement_frame_from_dict
+from internal.experiment import experiment_to_dict, write_interface
+
+
+def test_simplify_series_keeps_every_point_within_tolerance():
+    rng = np.random.default_rng(0)
+    elapsed_sec = np.sort(rng.uniform(0, 1e7, 500))
+    values = 0.022 + 0.004 * (1 - np.exp(-elapsed_sec / 3e6)) + rng.normal(0, 1e-6, 500)
+    kept_elapsed, kept_values = simplify_series(elapsed_sec, values, tolerance=2e-5)
+    assert len(kept_elapsed) < 50
+    assert (kept_elapsed[0], kept_elapsed[-1]) == (elapsed_sec[0], elapsed_sec[-1])
+    assert np.all(np.abs(values - np.interp(elapsed_sec, kept_elapsed, kept_values)) <= 2e-5)
+
+
+def test_bin_series_keeps_the_first_measurement():
+    elapsed_sec = np.array([0.0, 10.0, 20.0, 100.0, 110.0])
+    values = np.array([1.0, 2.0, 4.0, 6.0, 8.0])
+    binned_elapsed, binned_values = bin_series(elapsed_sec, values, bin_sec=50.0)
+    np.testing.assert_array_equal(binned_elapsed, [0.0, 15.0, 105.0])
+    np.testing.assert_array_equal(binned_values, [1.0, 3.0, 7.0])
+
+
+def test_reduce_series_reports_the_measured_deviation():
+    elapsed_sec = np.arange(5, dtype=np.float64)
+    values = np.array([0.0, 1.0, 0.0, 1.0, 0.0])
+    _, _, report = reduce_series(elapsed_sec, values, tolerance=2.0)
+    assert (report.n_input, report.n_output) == (5, 2)
+    assert report.max_abs_deviation == 1.0
+    assert report.area_deviation == 2.0
+
+
+def test_series_from_frame_matches_experiment(experiments):
+    frame = measurement_frame_from_dict(experiment_to_dict(experiments[0]))
+    cleaned, report = clean_measurements(frame)
+    assert report.issues == []
+    pd.testing.assert_frame_equal(cleaned, measurement_frame(experiments[0]), check_dtype=False)
+    elapsed_sec, values = series_from_frame(cleaned)
+    np.testing.assert_array_equal(elapsed_sec, [m.elapsed_sec for m in experiments[0].measurements])
+    np.testing.assert_array_equal(values, [m.thermal_conductivity for m in experiments[0].measurements])
+
+
+def test_fit_aggregated_reports_full_score(make_experiment):
+    experiments = [make_experiment(23.0, n_points=300, seed=0), make_experiment(70.0, n_points=300, seed=1)]
+    series = [(*series_from_frame(measurement_frame(experiment)), experiment.temperature)
+              for experiment in experiments]
+    fit = fit_aggregated(series, get_solver_config("fast", seed=3, disp=False), tolerance=1e-4)
+    assert all(report.n_output < report.n_input for report in fit.reports)
+    assert all(report.max_abs_deviation <= 1e-4 for report in fit.reports)
+    assert np.isfinite(fit.full_score)
+    assert fit.optimized_params.lamda_gas.actual_value == pytest.approx(0.004, rel=0.05)
+
+
+def test_batch_aggregated_fit_from_files_and_store(tmp_path, experiments, capsys):
+    paths = [str(tmp_path / f"{index}.json") for index in range(2)]
+    for experiment, path in zip(experiments, paths):
+        write_interface(experiment, path)
+    store_path = str(tmp_path / "store.db")
+    options = ["--preset", "fast", "--seed", "1", "--tolerance", "5e-5"]
+
+    assert batch.main([*paths, *options, "--store", store_path, "--output", str(tmp_path / "files.json")]) == 0
+    from_files = json.loads((tmp_path / "files.json").read_text())
+    assert len(from_files['aggregation']) == 2
+    assert [sample['n_points'] for sample in from_files['samples']] == [40, 40]
+
+    assert batch.main([*paths, "--store", store_path, "--import-only"]) == 0
+    ids = capsys.readouterr().out.split()
+    assert batch.main(["--store", store_path, "--from-store", *ids, *options,
+                       "--output", str(tmp_path / "store.json")]) == 0
+    assert json.loads((tmp_path / "store.json").read_text()) == from_files
+
+
+@pytest.mark.parametrize("flags", [["--tolerance", "1e-4", "--reject-outliers"],
+                                   ["--bin-hours", "24", "--jobs", "2"],
+                                   ["--reject-outliers", "--checkpoint-dir", "checkpoints"]])
+def test_batch_rejects_combined_fit_modes(flags, capsys):
+    with pytest.raises(SystemExit):
+        batch.main(["a.json", "b.json", *flags])
+    assert "cannot be combined" in capsys.readouterr().err
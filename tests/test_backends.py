@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from internal.backends import (SOLVER_BACKENDS, BackendResult, distinct_basins, get_backend, hybrid_backend,
+                               register_backend)
+from internal.calculator import ModelParams, get_solver_config, solve_packed
+
+
+def test_get_backend():
+    assert get_backend('differential_evolution') is SOLVER_BACKENDS['differential_evolution']
+    with pytest.raises(ValueError, match="Unknown solver backend"):
+        get_backend('missing')
+
+
+@pytest.mark.parametrize("backend", ['differential_evolution', 'shgo', 'dual_annealing', 'grid_local'])
+def test_backends_fit_the_model(backend, packed):
+    packed_series, normalizer_sec = packed
+    results = []
+    for workers in (1, 2):
+        solver_config = get_solver_config("fast", seed=0, backend=backend, workers=workers, disp=False)
+        solver_params, manifest = solve_packed(packed_series, normalizer_sec, solver_config)
+        results.append((ModelParams.from_solver(solver_params, solver_config.digit_conf), manifest))
+    (params, manifest), (parallel_params, parallel_manifest) = results
+    assert params.lamda_gas == pytest.approx(0.004, rel=0.01)
+    assert manifest.solver_config['backend'] == backend and manifest.n_evaluations > 0
+    # the population-at-once and the process-parallel evaluation find the same solution
+    assert parallel_manifest.score == pytest.approx(manifest.score, rel=1e-9)
+    assert parallel_params.lamda_gas == pytest.approx(params.lamda_gas, rel=1e-6)
+
+
+def test_registered_backend_is_used(packed):
+    packed_series, normalizer_sec = packed
+
+    @register_backend('fixed')
+    def fixed_backend(objective, bounds, solver_config, parallel=False):
+        x = np.array([40.0, 330.0, 100.0])
+        return BackendResult(x=x, fun=float(objective(x)), nfev=1)
+
+    try:
+        solver_params, manifest = solve_packed(packed_series, normalizer_sec,
+                                               get_solver_config("fast", seed=0, backend='fixed'))
+    finally:
+        del SOLVER_BACKENDS['fixed']
+    np.testing.assert_array_equal(solver_params, [40.0, 330.0, 100.0])
+    assert manifest.n_evaluations == 1
+
+
+def test_distinct_basins():
+    bounds = [(0.0, 10.0), (0.0, 100.0)]
+    points = np.array([[1.0, 10.0], [1.1, 11.0], [5.0, 50.0], [9.0, 90.0], [5.2, 51.0]])
+    scores = np.array([2.0, 1.0, 3.0, np.inf, 2.5])
+    # [1.0, 10.0] and [5.0, 50.0] are within the radius of better points; inf scores are never taken
+    assert distinct_basins(points, scores, bounds, n_basins=10) == [1, 4]
+    assert distinct_basins(points, scores, bounds, n_basins=1) == [1]
+    assert distinct_basins(points, scores, bounds, n_basins=10, radius=0.01) == [1, 0, 4, 2]
+
+
+def test_hybrid_no_worse_than_differential_evolution(packed):
+    packed_series, normalizer_sec = packed
+    scores = {}
+    for backend in ('differential_evolution', 'hybrid'):
+        solver_config = get_solver_config("fast", seed=4, backend=backend, disp=False)
+        _, manifest = solve_packed(packed_series, normalizer_sec, solver_config)
+        scores[backend] = manifest.score
+    assert scores['hybrid'] <= scores['differential_evolution']
+    alternatives = manifest.alternatives
+    assert alternatives[0]['score'] == manifest.score
+    assert [alternative['score'] for alternative in alternatives] == sorted(
+        alternative['score'] for alternative in alternatives)
+
+
+def test_hybrid_without_finite_minimum_keeps_the_global_result():
+    def objective(x):
+        return np.full(x.shape[1], np.inf) if x.ndim == 2 else np.inf
+
+    bounds = [(0.0, 1.0), (0.0, 1.0)]
+    result = hybrid_backend(objective, bounds, get_solver_config("fast", seed=0, maxiter=4, disp=False))
+    assert result.fun == np.inf and result.alternatives == []
+    assert np.all((result.x >= 0.0) & (result.x <= 1.0))
@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+import batch
+from internal.experiment import write_interface
+
+
+@pytest.fixture
+def experiment_files(tmp_path, experiments):
+    paths = [str(tmp_path / f"{index}.json") for index in range(len(experiments))]
+    for experiment, path in zip(experiments, paths):
+        write_interface(experiment, path)
+    return paths
+
+
+def test_batch_fits_a_pair(tmp_path, experiment_files):
+    output = tmp_path / "result.json"
+    assert batch.main([*experiment_files, "--preset", "fast", "--seed", "3", "--output", str(output)]) == 0
+    result = json.loads(output.read_text())
+    assert result['preset'] == "fast"
+    assert result['lamda_gas'] == pytest.approx(0.004, rel=0.01)
+
+
+def test_batch_needs_pairs(experiment_files, capsys):
+    with pytest.raises(SystemExit):
+        batch.main(experiment_files[:1])
+    assert "pairs" in capsys.readouterr().err
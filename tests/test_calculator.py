@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from internal.calculator import (SOLVER_PRESETS, CalculateTable, ModelParams, OptimizeParam, SolverConfig,
+                                 estimate_thermal_conductivity, fit_results, get_solver_config, minimize_solver,
+                                 rate_constant, solve_packed, table_fit_results)
+from internal.converter import experiment_converter
+
+
+def test_presets():
+    assert set(SOLVER_PRESETS) == {'fast', 'balanced', 'exhaustive'}
+    assert SOLVER_PRESETS['balanced'] == SolverConfig()
+    fast, exhaustive = SOLVER_PRESETS['fast'], SOLVER_PRESETS['exhaustive']
+    assert fast.popsize * fast.maxiter < SolverConfig().popsize * SolverConfig().maxiter \
+        < exhaustive.popsize * exhaustive.maxiter
+
+
+def test_get_solver_config_overrides():
+    solver_config = get_solver_config('fast', seed=7, disp=False)
+    assert (solver_config.seed, solver_config.disp, solver_config.popsize) == (7, False, SOLVER_PRESETS['fast'].popsize)
+    assert SOLVER_PRESETS['fast'].seed == 0
+    with pytest.raises(ValueError, match="Unknown solver preset"):
+        get_solver_config('slow')
+
+
+def test_fit_is_reproducible_with_a_seed(experiments):
+    def fit(seed):
+        tables = [experiment_converter(experiment) for experiment in experiments]
+        return minimize_solver(*tables, *(experiment.temperature for experiment in experiments),
+                               solver_config=get_solver_config('fast', seed=seed, disp=False))
+
+    first, second, other = fit(1), fit(1), fit(2)
+    assert first.lamda_gas.solver_param == second.lamda_gas.solver_param
+    assert first.e_dash.solver_param == second.e_dash.solver_param
+    assert first.k_0.solver_param == second.k_0.solver_param
+    assert first.e_dash.solver_param != other.e_dash.solver_param
+    assert first.lamda_gas.actual_value == pytest.approx(0.004, rel=0.01)
+
+
+def test_model_params_from_solver():
+    params = ModelParams.from_solver([40.0, 330.0, 100.0], SolverConfig().digit_conf)
+    assert params == pytest.approx((0.004, 33000.0, 0.1))
+    assert OptimizeParam.from_solver([40.0, 330.0, 100.0], SolverConfig().digit_conf).model_params == params
+
+
+def test_calculate_table_estimates_match_the_model(experiments):
+    experiment = experiments[1]
+    params = ModelParams(0.004, 33000.0, 0.1)
+    table = experiment_converter(experiment)
+    table.estimate_thermal_conductivity(params, experiment.temperature)
+    table.update_all_metrix()
+    elapsed_sec, thermal_conductivity = table.as_arrays()
+    expected = estimate_thermal_conductivity(e_dash=params.e_dash, experiment_temperature=experiment.temperature,
+                                             measurement_time_sec=elapsed_sec, lamda_gas=params.lamda_gas,
+                                             initial_thermal_conductivity=thermal_conductivity[0], k_0=params.k_0)
+    np.testing.assert_array_equal([row.estimated_conductivity for row in table.rows], expected)
+    deviation = np.abs(thermal_conductivity - expected)
+    assert table.total_area() == pytest.approx(np.sum((deviation[1:] + deviation[:-1]) / 2 * np.diff(elapsed_sec)))
+
+
+def test_fit_results_metrics(make_experiment):
+    params = ModelParams(0.004, 33000.0, 0.1)
+    experiments = [make_experiment(23.0, noise_std=0.0), make_experiment(70.0, noise_std=0.0)]
+    tables = [experiment_converter(experiment) for experiment in experiments]
+    temperatures = [experiment.temperature for experiment in experiments]
+    results = table_fit_results(tables, temperatures, params)
+
+    k = rate_constant(params, np.array(temperatures))
+    np.testing.assert_allclose(results.rate_constant, k)
+    np.testing.assert_allclose(results.lconv, 0.022 + params.lamda_gas)
+    np.testing.assert_allclose(results.t50_days, np.log(2) / k / 86400)
+    np.testing.assert_allclose(results.t90_days, np.log(10) / k / 86400)
+    np.testing.assert_array_equal(results.n_points, [40, 40])
+    assert np.all(results.rmse < 1e-12) and np.all(results.r2 > 1 - 1e-12)
+    assert results.score == pytest.approx(np.sum(results.area) / tables[0].rows[-1].elapsed_sec)
+
+
+def test_fit_results_score_matches_the_solver(packed):
+    packed_series, normalizer_sec = packed
+    solver_config = get_solver_config('fast', seed=0, disp=False)
+    solver_params, manifest = solve_packed(packed_series, normalizer_sec, solver_config)
+    results = fit_results(ModelParams.from_solver(solver_params, solver_config.digit_conf), packed_series,
+                          normalizer_sec)
+    assert results.score == pytest.approx(manifest.score, rel=1e-9)
+
+
+def test_fit_results_of_an_empty_sample(experiments):
+    tables = [experiment_converter(experiments[0]), CalculateTable(rows=[])]
+    results = table_fit_results(tables, [23.0, 70.0], ModelParams(0.004, 33000.0, 0.1))
+    empty = results.sample(1)
+    assert empty['n_points'] == 0
+    assert empty['lconv'] is None and empty['rmse'] is None and empty['area'] is None
+    assert empty['t50_days'] is not None
+    assert np.isfinite(results.score)
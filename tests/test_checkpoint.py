@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from internal.calculator import FitCancelledError, get_solver_config, solve_packed
+from internal.checkpoint import (CancellationToken, checkpoint_path, checkpointed_solve_packed, load_checkpoint,
+                                 save_checkpoint)
+
+CHECKPOINT_EVERY = 5
+
+
+@pytest.fixture
+def solver_config():
+    # No early stop: every run goes through all generations
+    return get_solver_config('balanced', disp=False, maxiter=30, popsize=10, seed=3)
+
+
+class StopAfter:
+    """stop_check that cancels the fit at its ``n``-th call (before generation ``n``)."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls >= self.n:
+            raise FitCancelledError("stopped")
+
+
+def test_uninterrupted_run_matches_solve_packed(packed, solver_config, tmp_path):
+    packed_series, normalizer_sec = packed
+    expected, expected_manifest = solve_packed(packed_series, normalizer_sec, solver_config)
+    checkpoint_file = str(tmp_path / "fit.npz")
+    x, manifest = checkpointed_solve_packed(packed_series, normalizer_sec, solver_config, checkpoint_file,
+                                            checkpoint_every=CHECKPOINT_EVERY)
+    np.testing.assert_array_equal(x, expected)
+    assert manifest.score == expected_manifest.score
+    assert manifest.n_evaluations == expected_manifest.n_evaluations
+    assert not (tmp_path / "fit.npz").exists()
+
+
+@pytest.mark.parametrize("stop_at", [3, 13])
+def test_resumed_run_matches_uninterrupted_run(packed, solver_config, tmp_path, stop_at):
+    packed_series, normalizer_sec = packed
+    expected, expected_manifest = solve_packed(packed_series, normalizer_sec, solver_config)
+    checkpoint_file = str(tmp_path / "fit.npz")
+
+    with pytest.raises(FitCancelledError):
+        checkpointed_solve_packed(packed_series, normalizer_sec, solver_config, checkpoint_file,
+                                  checkpoint_every=CHECKPOINT_EVERY, stop_check=StopAfter(stop_at))
+    # Cancelling writes a checkpoint of the finished generations
+    assert load_checkpoint(checkpoint_file).generation == stop_at - 1
+
+    x, manifest = checkpointed_solve_packed(packed_series, normalizer_sec, solver_config, checkpoint_file,
+                                            checkpoint_every=CHECKPOINT_EVERY)
+    np.testing.assert_array_equal(x, expected)
+    assert manifest.score == expected_manifest.score
+    assert manifest.n_evaluations == expected_manifest.n_evaluations
+
+
+def test_killed_run_resumes_from_last_periodic_checkpoint(packed, solver_config, tmp_path):
+    packed_series, normalizer_sec = packed
+    expected, _ = solve_packed(packed_series, normalizer_sec, solver_config)
+    checkpoint_file = str(tmp_path / "fit.npz")
+    on_disk = []
+
+    def kill():
+        # Snapshot of the file when the process dies after generation 13 (without the save of a cancel)
+        if stop.calls == 13:
+            on_disk.append(load_checkpoint(checkpoint_file))
+        stop()
+
+    stop = StopAfter(14)
+    with pytest.raises(FitCancelledError):
+        checkpointed_solve_packed(packed_series, normalizer_sec, solver_config, checkpoint_file,
+                                  checkpoint_every=CHECKPOINT_EVERY, stop_check=kill)
+    assert on_disk[0].generation == 10
+    save_checkpoint(on_disk[0], checkpoint_file)
+
+    x, _ = checkpointed_solve_packed(packed_series, normalizer_sec, solver_config, checkpoint_file)
+    np.testing.assert_array_equal(x, expected)
+
+
+def test_checkpoint_round_trip(packed, solver_config, tmp_path):
+    packed_series, normalizer_sec = packed
+    checkpoint_file = str(tmp_path / "fit.npz")
+    with pytest.raises(FitCancelledError):
+        checkpointed_solve_packed(packed_series, normalizer_sec, solver_config, checkpoint_file,
+                                  stop_check=StopAfter(4))
+    checkpoint = load_checkpoint(checkpoint_file)
+    assert checkpoint.matches(packed_series, solver_config)
+    # disp and workers may differ on resume
+    assert checkpoint.matches(packed_series, get_solver_config('balanced', disp=True, workers=2, maxiter=30,
+                                                               popsize=10, seed=3))
+    assert not checkpoint.matches(packed_series, get_solver_config('balanced', maxiter=30, popsize=10, seed=4))
+
+    copy_file = str(tmp_path / "copy.npz")
+    save_checkpoint(checkpoint, copy_file)
+    copy = load_checkpoint(copy_file)
+    assert copy.rng_state == checkpoint.rng_state
+    assert (copy.generation, copy.n_evaluations) == (checkpoint.generation, checkpoint.n_evaluations)
+    np.testing.assert_array_equal(copy.population, checkpoint.population)
+    np.testing.assert_array_equal(copy.sample_index, checkpoint.sample_index)
+
+
+def test_checkpoint_of_another_fit_is_rejected(packed, solver_config, tmp_path):
+    packed_series, normalizer_sec = packed
+    checkpoint_file = str(tmp_path / "fit.npz")
+    with pytest.raises(FitCancelledError):
+        checkpointed_solve_packed(packed_series, normalizer_sec, solver_config, checkpoint_file,
+                                  stop_check=StopAfter(3))
+    other_config = get_solver_config('balanced', disp=False, maxiter=30, popsize=10, seed=4)
+    with pytest.raises(ValueError, match="another fit"):
+        checkpointed_solve_packed(packed_series, normalizer_sec, other_config, checkpoint_file)
+    assert checkpoint_path(str(tmp_path), packed_series, solver_config) \
+        != checkpoint_path(str(tmp_path), packed_series, other_config)
+
+
+def test_other_backends_are_rejected(packed, tmp_path):
+    packed_series, normalizer_sec = packed
+    with pytest.raises(ValueError, match="backend"):
+        checkpointed_solve_packed(packed_series, normalizer_sec, get_solver_config(backend='hybrid'),
+                                  str(tmp_path / "fit.npz"))
+
+
+def test_cancellation_token(packed, solver_config, tmp_path):
+    packed_series, normalizer_sec = packed
+    token = CancellationToken()
+    token()  # not cancelled: no-op
+    token.cancel()
+    assert token.cancelled
+    with pytest.raises(FitCancelledError):
+        checkpointed_solve_packed(packed_series, normalizer_sec, solver_config, str(tmp_path / "fit.npz"),
+                                  stop_check=token)
+    # cancelled before the first generation: nothing to save
+    assert not (tmp_path / "fit.npz").exists()
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from internal.cleaning import (CONDUCTIVITY_COLUMN, DATE_COLUMN, MeasurementValidationError, clean_experiment,
+                               clean_measurements, flag_outliers, measurement_frame, validate_measurements)
+
+
+def table(dates, values) -> pd.DataFrame:
+    return pd.DataFrame({DATE_COLUMN: dates, CONDUCTIVITY_COLUMN: values})
+
+
+def kinds(report):
+    return [issue.kind for issue in report.issues]
+
+
+def test_clean_table_passes_unchanged(experiments):
+    measurements = measurement_frame(experiments[0])
+    frame, report = clean_measurements(measurements)
+    assert report.ok and report.issues == []
+    assert report.n_input == report.n_output == len(measurements)
+    pd.testing.assert_frame_equal(frame, measurements, check_dtype=False)
+
+
+def test_blank_rows_are_dropped_silently():
+    frame, report = clean_measurements(table(["2024-01-01", None, "2024-02-01", None],
+                                             [0.020, None, 0.021, None]))
+    assert len(frame) == 2
+    assert report.issues == []
+
+
+def test_invalid_rows_are_dropped_with_warnings():
+    measurements = table(["2024-01-01", "not a date", "2024-02-01", "2024-03-01", "2024-04-01", "2024-05-01"],
+                         [0.020, 0.021, None, "abc", -0.01, 0.022])
+    frame, report = clean_measurements(measurements)
+    assert kinds(report) == ["missing_date", "missing_value", "invalid_value"]
+    assert [issue.rows for issue in report.issues] == [[1], [2, 3], [4]]
+    assert frame[CONDUCTIVITY_COLUMN].tolist() == [0.020, 0.022]
+    assert report.ok
+
+
+def test_rows_are_sorted_and_duplicates_merged():
+    measurements = table(["2024-03-01", "2024-01-01", "2024-02-01", "2024-02-01", "2024-01-01"],
+                         [0.023, 0.020, 0.021, 0.022, 0.020])
+    frame, report = clean_measurements(measurements)
+    assert kinds(report) == ["unsorted", "duplicate", "same_date"]
+    assert frame[DATE_COLUMN].is_monotonic_increasing
+    assert frame[CONDUCTIVITY_COLUMN].tolist() == pytest.approx([0.020, 0.0215, 0.023])
+    assert frame.index.tolist() == [0, 1, 2]
+
+
+def test_too_few_measurements_are_an_error():
+    measurements = table(["2024-01-01", "2024-01-01", None], [0.020, 0.021, None])
+    _, report = clean_measurements(measurements)
+    assert not report.ok
+    assert [issue.kind for issue in report.errors] == ["too_few"]
+    with pytest.raises(MeasurementValidationError, match="^sample: ") as excinfo:
+        validate_measurements(measurements, label="sample")
+    assert excinfo.value.report.n_output == 1
+
+
+def test_outliers_are_flagged_but_kept(experiments):
+    measurements = measurement_frame(experiments[0])
+    measurements.loc[10, CONDUCTIVITY_COLUMN] += 0.01
+    frame, report = clean_measurements(measurements)
+    assert kinds(report) == ["outlier"]
+    assert report.warnings[0].rows == [10]
+    assert len(frame) == len(measurements)
+    _, report = clean_measurements(measurements, outlier_threshold=None)
+    assert report.issues == []
+
+
+def test_flag_outliers_ignores_short_and_flat_series():
+    assert not flag_outliers(np.array([1.0, 1.0, 5.0, 1.0])).any()
+    assert not flag_outliers(np.full(10, 0.02)).any()
+
+
+def test_clean_experiment_rebuilds_the_measurements(experiments):
+    experiment = experiments[0]
+    experiment.id = "stored-id"
+    shuffled = experiments[0].measurements[::-1] + experiments[0].measurements[:1]
+    messy = type(experiment)(**{**vars(experiment), 'measurements': shuffled})
+
+    cleaned, report = clean_experiment(messy, label="sample")
+    assert kinds(report) == ["unsorted", "duplicate"]
+    assert cleaned.id == "stored-id"
+    assert cleaned.temperature == experiment.temperature
+    assert [measurement.thermal_conductivity for measurement in cleaned.measurements] \
+        == [measurement.thermal_conductivity for measurement in experiment.measurements]
+    assert [measurement.elapsed_sec for measurement in cleaned.measurements] \
+        == [measurement.elapsed_sec for measurement in experiment.measurements]
+
+
+def test_clean_experiment_rejects_unfittable_measurements(experiments):
+    del experiments[0].measurements[1:]
+    with pytest.raises(MeasurementValidationError, match="^sample: "):
+        clean_experiment(experiments[0], label="sample")
+
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from internal.calculator import ModelParams, get_solver_config
+from internal.converter import experiment_converter
+from internal.crossval import (HoldoutResult, HorizonError, leave_one_temperature_out, minimum_training_days,
+                               time_holdout)
+
+
+@pytest.fixture
+def solver_config():
+    return get_solver_config('fast', disp=False, seed=0)
+
+
+def as_series(experiments):
+    return [(*experiment_converter(experiment).as_arrays(), experiment.temperature) for experiment in experiments]
+
+
+def test_time_holdout(experiments, solver_config):
+    series = as_series(experiments)
+    results = time_holdout(series, [120, 240], solver_config, horizons_days=(60, 100), max_workers=2)
+
+    assert [result.cutoff_days for result in results] == [120, 240]
+    elapsed_days = np.concatenate([elapsed_sec / 86400 for elapsed_sec, _, _ in series])
+    for result in results:
+        lead_days = elapsed_days - result.cutoff_days
+        assert result.n_train == int(np.sum(lead_days <= 0))
+        # points beyond the last horizon are not scored
+        assert result.n_test == int(np.sum((lead_days > 0) & (lead_days <= 100)))
+        assert [horizon.n_points for horizon in result.horizons] \
+            == [int(np.sum((lead_days > 0) & (lead_days <= 60))), int(np.sum((lead_days > 60) & (lead_days <= 100)))]
+        assert max(horizon.rmse for horizon in result.horizons) < 5e-4
+        assert abs(result.lconv_change) < 1e-3
+
+
+def test_time_holdout_needs_two_training_points(experiments, solver_config):
+    with pytest.raises(ValueError, match="cutoff 5 days"):
+        time_holdout(as_series(experiments), [5, 120], solver_config, max_workers=1)
+
+
+def test_leave_one_temperature_out(make_experiment, solver_config):
+    experiments = [make_experiment(temperature, seed=seed) for seed, temperature in enumerate((23.0, 50.0, 70.0))]
+    results = leave_one_temperature_out(as_series(experiments), solver_config, max_workers=2)
+
+    assert [result.temperature for result in results] == [23.0, 50.0, 70.0]
+    assert all(result.n_train == 80 and result.n_test == 40 for result in results)
+    assert all(result.rmse < 5e-4 for result in results)
+
+
+def test_leave_one_temperature_out_guards(experiments, solver_config):
+    series = as_series(experiments)
+    with pytest.raises(ValueError, match="two temperatures"):
+        leave_one_temperature_out(series[:1], solver_config)
+    short = [series[0], (series[1][0][:1], series[1][1][:1], series[1][2])]
+    with pytest.raises(ValueError, match="without 23 °C"):
+        leave_one_temperature_out(short, solver_config)
+
+
+def test_minimum_training_days():
+    params = ModelParams(lamda_gas=0.004, e_dash=33000.0, k_0=0.1)
+
+    def result(cutoff_days, rmses):
+        horizons = [HorizonError(horizon_days=30, n_points=1 if np.isfinite(rmse) else 0, mae=rmse, rmse=rmse)
+                    for rmse in rmses]
+        return HoldoutResult(cutoff_days=cutoff_days, params=params, n_train=10, n_test=len(rmses),
+                             horizons=horizons, lconv_change=0.0)
+
+    results = [result(365, [1e-5, np.nan]), result(90, [5e-4, 1e-5]), result(180, [2e-5, 3e-5])]
+    assert minimum_training_days(results, max_rmse=5e-5) == 180
+    assert minimum_training_days(results, max_rmse=1e-6) is None
@@ -0,0 +1,87 @@
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from internal.export import (ACTUAL_CONDUCTIVITY, ELAPSED_DAYS, ESTIMATED_CONDUCTIVITY, SAMPLE, TEMPERATURE,
+                             ReportSample, export_file_name, export_sample, export_samples, read_export_metadata,
+                             sample_columns)
+from internal.synthetic import true_params
+
+
+@pytest.fixture
+def samples(experiments):
+    # The second sample has the same name as the first (names are not unique in the app)
+    experiments[1].sample_name = experiments[0].sample_name
+    return [ReportSample.from_fit(experiment, true_params()) for experiment in experiments]
+
+
+def read(buffer: io.BytesIO, fmt: str) -> pd.DataFrame:
+    if fmt == "csv":
+        return pd.read_csv(buffer, float_precision="round_trip")
+    pyarrow = pytest.importorskip("pyarrow")
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(buffer).to_pandas()
+    return pyarrow.ipc.open_file(buffer).read_pandas()
+
+
+def test_columns_match_calculate_table(samples):
+    columns = sample_columns(samples[0])
+    rows = samples[0].calculate_table.rows
+    np.testing.assert_allclose(columns[ELAPSED_DAYS], [row.elapsed_sec / 86400 for row in rows], rtol=1e-15)
+    np.testing.assert_array_equal(columns[ACTUAL_CONDUCTIVITY], [row.thermal_conductivity for row in rows])
+    np.testing.assert_allclose(columns[ESTIMATED_CONDUCTIVITY], [row.estimated_conductivity for row in rows],
+                               rtol=1e-12)
+
+
+def test_csv_is_a_plain_table(samples):
+    text = export_sample(samples[0], "csv").getvalue().decode("utf-8")
+    assert text.splitlines()[0] == ",".join([ELAPSED_DAYS, ACTUAL_CONDUCTIVITY, ESTIMATED_CONDUCTIVITY])
+    with pytest.raises(ValueError):
+        read_export_metadata(io.BytesIO(text.encode("utf-8")), "csv")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_sample_round_trip(samples, fmt):
+    frame = read(export_sample(samples[0], fmt), fmt)
+    expected = pd.DataFrame(sample_columns(samples[0]))
+    pd.testing.assert_frame_equal(frame, expected, check_exact=True)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_combined_round_trip(samples, fmt):
+    frame = read(export_samples(samples, fmt), fmt)
+    lengths = [len(sample.calculate_table.rows) for sample in samples]
+    assert len(frame) == sum(lengths)
+    assert frame[SAMPLE].astype(str).tolist() == [samples[0].experiment.sample_name] * sum(lengths)
+    assert frame[TEMPERATURE].tolist() == [23.0] * lengths[0] + [70.0] * lengths[1]
+    np.testing.assert_array_equal(frame[ACTUAL_CONDUCTIVITY],
+                                  np.concatenate([sample_columns(sample)[ACTUAL_CONDUCTIVITY] for sample in samples]))
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_metadata_round_trip(samples, fmt):
+    pytest.importorskip("pyarrow")
+    metadata = read_export_metadata(export_samples(samples, fmt), fmt)
+    assert [sample['temperature'] for sample in metadata['samples']] == [23.0, 70.0]
+    assert metadata['samples'][0]['e_dash'] == true_params().e_dash
+    assert 'fit' not in metadata
+
+
+def test_unknown_format_and_empty_export(samples):
+    with pytest.raises(ValueError, match="Unknown export format"):
+        export_sample(samples[0], "xlsx")
+    with pytest.raises(ValueError, match="No samples"):
+        export_samples([], "csv")
+
+
+def test_report_zip_holds_the_app_csv_downloads(samples):
+    from internal.report import build_csv_zip
+
+    with zipfile.ZipFile(io.BytesIO(build_csv_zip(samples))) as archive:
+        assert archive.namelist() == [export_file_name("csv", sample, index) for index, sample in enumerate(samples)]
+        for index, sample in enumerate(samples):
+            assert archive.read(archive.namelist()[index]) == export_sample(sample, "csv").getvalue()
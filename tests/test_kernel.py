@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from internal.calculator import AreaObjective, ModelParams, SolverConfig
+from internal.converter import experiment_converter
+from internal.kernel import population_area, total_area
+
+
+def reference_score(experiments, params: ModelParams) -> float:
+    """The objective of the original minimize_solver: row-by-row CalculateTable areas."""
+    total = 0.0
+    for experiment in experiments:
+        calculate_table = experiment_converter(experiment)
+        calculate_table.estimate_thermal_conductivity(params, experiment.temperature)
+        calculate_table.update_all_metrix()
+        total += calculate_table.total_area()
+    return total / experiment_converter(experiments[0]).rows[-1].elapsed_sec
+
+
+def candidates(n: int = 20) -> np.ndarray:
+    """Solver parameters spread over the default bounds."""
+    lower, upper = np.array(SolverConfig().bounds, dtype=np.float64).T
+    return lower + np.random.default_rng(1).random((n, 3)) * (upper - lower)
+
+
+@pytest.mark.parametrize("use_jit", [False, True])
+def test_objective_matches_calculate_table(experiments, packed, use_jit):
+    packed_series, normalizer_sec = packed
+    digit_conf = np.array(SolverConfig().digit_conf, dtype=np.float64)
+    objective = AreaObjective(packed_series, digit_conf, normalizer_sec, use_jit=use_jit)
+    for solver_params in candidates():
+        expected = reference_score(experiments, ModelParams.from_solver(solver_params, digit_conf))
+        assert objective(solver_params) == pytest.approx(expected, rel=1e-12, abs=0)
+
+
+@pytest.mark.parametrize("use_jit", [False, True])
+def test_population_matches_single_candidates(packed, use_jit):
+    packed_series, _ = packed
+    population = candidates() * np.array(SolverConfig().digit_conf)
+    expected = [total_area(params, packed_series, use_jit=use_jit) for params in population]
+    np.testing.assert_allclose(population_area(population, packed_series, use_jit=use_jit), expected,
+                               rtol=1e-12, atol=0)
+
+
+def test_vectorized_objective_counts_candidates(packed):
+    packed_series, normalizer_sec = packed
+    objective = AreaObjective(packed_series, np.array(SolverConfig().digit_conf), normalizer_sec)
+    population = candidates(7)
+    scores = objective(population.T)
+    assert scores.shape == (7,)
+    assert objective.n_evaluations == 7
+    np.testing.assert_allclose(scores, [objective(params) for params in population], rtol=1e-12, atol=0)
+
+
+def test_non_finite_score_is_penalized(packed):
+    packed_series, normalizer_sec = packed
+    objective = AreaObjective(packed_series, np.array(SolverConfig().digit_conf), normalizer_sec)
+    assert objective(np.array([np.nan, 1.0, 1.0])) == 1e20
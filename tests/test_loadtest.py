@@ -0,0 +1,28 @@
+import loadtest
+
+
+def test_run_sessions_counts_fits_and_errors():
+    calls = []
+
+    def submit(session, fit):
+        calls.append((session, fit))
+        if session == 1 and fit == 0:
+            raise ValueError("rejected")
+
+    result = loadtest.run_sessions(submit, n_sessions=3, n_fits=2)
+    assert sorted(calls) == [(session, fit) for session in range(3) for fit in range(2)]
+    assert (result['sessions'], result['fits'], result['errors']) == (3, 5, 1)
+    assert result['rss_peak_MiB'] >= result['rss_start_MiB'] > 0
+
+
+def test_pipeline_load_test(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # checkpoints
+    result = loadtest.pipeline_load_test(2, 1, preset="fast", n_points=10, max_workers=2)
+    assert (result['fits'], result['errors'], result['workers']) == (2, 0, 2)
+    assert result['p50_sec'] > 0
+
+
+def test_generate_command(tmp_path, capsys):
+    assert loadtest.main(["generate", "--temperatures", "23", "70", "--seed", "3",
+                          "--output-dir", str(tmp_path)]) == 0
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["synthetic_23C.json", "synthetic_70C.json"]
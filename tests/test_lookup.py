@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from internal.calculator import ModelParams, estimate_thermal_conductivity, time_to_fraction_sec
+from internal.lookup import (build_lookup_table, build_lookup_tables_from_store, load_lookup_tables,
+                             save_lookup_tables)
+from internal.store import ExperimentStore
+
+from test_store import fit_result
+
+PARAMS = ModelParams(lamda_gas=0.004, e_dash=33000.0, k_0=0.1)
+
+
+@pytest.fixture
+def table():
+    return build_lookup_table("M", PARAMS, 0.022)
+
+
+def test_conductivity_matches_model(table):
+    temperature = np.array([[-12.3], [23.0], [71.6]])
+    days = np.array([[0.5, 30.0, 365.0, 3650.0]])
+    expected = estimate_thermal_conductivity(e_dash=PARAMS.e_dash, experiment_temperature=temperature,
+                                             measurement_time_sec=days * 86400, lamda_gas=PARAMS.lamda_gas,
+                                             initial_thermal_conductivity=0.022, k_0=PARAMS.k_0)
+    np.testing.assert_allclose(table.conductivity_at(temperature, days), expected, rtol=1e-4)
+
+
+def test_time_to_fraction_matches_model(table):
+    temperature = np.array([[5.5], [40.2]])
+    fraction = np.array([[0.1, 0.5, 0.95, 0.9999]])
+    expected = time_to_fraction_sec(PARAMS, temperature, fraction) / 86400
+    np.testing.assert_allclose(table.time_to_fraction_days(temperature, fraction), expected, rtol=1e-4)
+    assert table.time_to_fraction_days(23.0, 0.0) == 0.0
+    assert table.time_to_fraction_days(23.0, 1.0) == np.inf
+    assert np.isnan(table.time_to_fraction_days(23.0, -0.1))
+
+
+def test_queries_outside_the_grid_are_nan(table):
+    assert np.isnan(table.conductivity_at(80.5, 30.0))
+    assert np.isnan(table.conductivity_at(-25.0, 30.0))
+    assert np.isnan(table.conductivity_at(23.0, 0.05))
+    assert np.isnan(table.conductivity_at(23.0, 200 * 365.0))
+    assert np.isnan(table.conductivity_at(23.0, -1.0))
+    assert table.conductivity_at(23.0, 0.0) == 0.022
+    assert np.isnan(table.conductivity_at(90.0, 0.0))
+    assert np.isnan(table.time_to_fraction_days(90.0, 0.5))
+    assert np.isnan(table.time_to_fraction_days(90.0, 0.0))
+    # Grid edges are inside
+    assert np.isfinite(table.conductivity_at(80.0, table.times_days[-1]))
+
+
+def test_tables_from_store_keyed_by_material(tmp_path, experiments, make_experiment):
+    store = ExperimentStore(":memory:")
+    for experiment in experiments:
+        experiment.sample_name = "M"
+    store.save_fit(experiments, fit_result(1e-4))
+    others = [make_experiment(23.0, seed=2), make_experiment(70.0, seed=3)]
+    store.save_fit(others, fit_result(1e-5))
+
+    tables = build_lookup_tables_from_store(store, ["M"])
+    assert list(tables) == ["M"]
+    table = tables["M"]
+    assert table.material == "M"
+    assert table.initial_thermal_conductivity == pytest.approx(np.mean(
+        [experiment.measurements[0].thermal_conductivity for experiment in experiments]))
+    with pytest.raises(ValueError, match="sample 23°C"):
+        # The other fit mixes two sample names, so neither name is a material with a fit
+        build_lookup_tables_from_store(store, ["sample 23°C"])
+    store.close()
+
+    path = tmp_path / "tables.npz"
+    save_lookup_tables(tables, path)
+    loaded = load_lookup_tables(path)["M"]
+    assert loaded.params == table.params
+    np.testing.assert_array_equal(loaded.conductivity_at(23.0, [1.0, 10.0]), table.conductivity_at(23.0, [1.0, 10.0]))
@@ -0,0 +1,53 @@
+import dataclasses
+
+import numpy as np
+
+from internal.calculator import get_solver_config, minimize_solver, resolve_seed, solve_packed
+from internal.converter import experiment_converter
+from internal.manifest import hash_inputs, read_manifest, verify_manifest, write_manifest
+
+
+def test_same_seed_reproduces_fit(packed):
+    packed_series, normalizer_sec = packed
+    solver_config = get_solver_config('fast', disp=False, seed=7)
+    x_1, manifest_1 = solve_packed(packed_series, normalizer_sec, solver_config)
+    x_2, manifest_2 = solve_packed(packed_series, normalizer_sec, solver_config)
+    np.testing.assert_array_equal(x_1, x_2)
+    assert manifest_1.solver_params == manifest_2.solver_params
+    assert manifest_1.score == manifest_2.score
+    assert manifest_1.n_evaluations == manifest_2.n_evaluations
+    assert manifest_1.input_hash == manifest_2.input_hash == hash_inputs(packed_series)
+
+
+def test_random_seed_is_recorded(experiments):
+    solver_config = get_solver_config('fast', disp=False, seed=None)
+    tables = [experiment_converter(experiment) for experiment in experiments]
+    manifest = minimize_solver(*tables, *(experiment.temperature for experiment in experiments),
+                               solver_config=solver_config).manifest
+    assert manifest.solver_config['seed'] is not None
+
+    rerun = dataclasses.replace(solver_config, seed=manifest.solver_config['seed'])
+    tables = [experiment_converter(experiment) for experiment in experiments]
+    rerun_manifest = minimize_solver(*tables, *(experiment.temperature for experiment in experiments),
+                                     solver_config=rerun).manifest
+    assert rerun_manifest.solver_params == manifest.solver_params
+    assert rerun_manifest.score == manifest.score
+
+
+def test_manifest_round_trip(packed, tmp_path):
+    packed_series, normalizer_sec = packed
+    solver_config = resolve_seed(get_solver_config('fast', disp=False))
+    _, manifest = solve_packed(packed_series, normalizer_sec, solver_config)
+    file_path = tmp_path / "manifest.json"
+    write_manifest(manifest, file_path)
+    assert read_manifest(file_path) == manifest
+    assert verify_manifest(read_manifest(file_path), packed_series, solver_config.to_dict()) == []
+
+
+def test_verify_manifest_reports_mismatches(packed):
+    packed_series, normalizer_sec = packed
+    solver_config = get_solver_config('fast', disp=False)
+    _, manifest = solve_packed(packed_series, normalizer_sec, solver_config)
+    other_series = packed_series.subset(0, 1)
+    mismatches = verify_manifest(manifest, other_series, get_solver_config('fast', disp=False, seed=1).to_dict())
+    assert mismatches == ["input data differs", "solver configuration differs"]
@@ -0,0 +1,61 @@
+import json
+import os
+import pstats
+
+import pytest
+
+from internal.calculator import get_solver_config, minimize_solver
+from internal.converter import experiment_converter
+from internal.profiling import PipelineProfiler, profiling_enabled
+from internal.scheduler import FitScheduler, schedule_table_fit
+
+
+@pytest.fixture
+def fit_inputs(experiments):
+    tables = [experiment_converter(experiment) for experiment in experiments]
+    temperatures = [experiment.temperature for experiment in experiments]
+    return tables, temperatures, get_solver_config("fast", seed=2, maxiter=10, disp=False)
+
+
+def test_profiling_enabled(monkeypatch):
+    monkeypatch.setenv("EXPOSURE_PROFILE", "0")
+    assert not profiling_enabled()
+    assert profiling_enabled(True)
+    monkeypatch.setenv("EXPOSURE_PROFILE", "1")
+    assert profiling_enabled()
+
+
+def test_stages_and_files(tmp_path, fit_inputs):
+    tables, temperatures, solver_config = fit_inputs
+    disabled = PipelineProfiler()
+    with disabled.stage("minimize_solver"):
+        pass
+    assert disabled.stages == [] and disabled.write() is None
+
+    profiler = PipelineProfiler(enabled=True, output_dir=str(tmp_path))
+    with profiler.stage("minimize_solver"):
+        minimize_solver(*tables, *temperatures, solver_config=solver_config)
+    (stage,) = profiler.stages
+    assert stage.hotspots_sec['objective'] > 0
+    assert stage.wall_time_sec >= stage.hotspots_sec['objective']
+
+    run_dir = profiler.write()
+    with open(os.path.join(run_dir, "summary.json")) as f:
+        assert [row['name'] for row in json.load(f)] == ["minimize_solver"]
+    assert pstats.Stats(stage.stats_file).total_calls > 0
+
+
+def test_scheduled_fit_is_profiled_in_the_worker(fit_inputs):
+    tables, temperatures, solver_config = fit_inputs
+    scheduler = FitScheduler(max_workers=1)
+    try:
+        profiler = PipelineProfiler(enabled=True)
+        profiled, _ = schedule_table_fit(scheduler, "a", tables, temperatures, solver_config, profiler=profiler)
+        plain, _ = schedule_table_fit(scheduler, "a", tables, temperatures, solver_config)
+        assert scheduler.metrics()['counts']['done'] == 2
+    finally:
+        scheduler.shutdown()
+    (stage,) = profiler.stages
+    assert stage.name == "minimize_solver"
+    assert stage.hotspots_sec['objective'] > 0
+    assert profiled.model_params == plain.model_params
@@ -0,0 +1,49 @@
+import io
+import re
+import zipfile
+
+import pytest
+
+from internal.calculator import ModelParams
+from internal.report import ReportSample, export_report, samples_from_store, submit_report
+from internal.store import ExperimentStore
+
+from test_store import fit_result
+
+PARAMS = ModelParams(lamda_gas=0.004, e_dash=33000.0, k_0=0.1)
+
+
+@pytest.fixture
+def samples(experiments):
+    return [ReportSample.from_fit(experiment, PARAMS) for experiment in experiments]
+
+
+def test_html_and_csv_zip_in_the_background(samples):
+    report = submit_report(samples, formats=("zip", "html")).result(timeout=60)
+    assert list(report) == ["html", "zip"]
+    page = report["html"].decode("utf-8")
+    assert page.count("<section>") == 2
+    assert all(sample.experiment.sample_name in page for sample in samples)
+    with zipfile.ZipFile(io.BytesIO(report["zip"])) as archive:
+        assert len(archive.namelist()) == 2
+
+
+def test_pdf_has_a_page_per_sample(samples):
+    pdf = export_report(samples, formats=("pdf",))["pdf"]
+    assert pdf.startswith(b"%PDF")
+    assert len(re.findall(rb"/Type\s*/Page[^s]", pdf)) == 2
+
+
+def test_unknown_format(samples):
+    with pytest.raises(ValueError, match="docx"):
+        export_report(samples, formats=("docx",))
+
+
+def test_samples_from_store(experiments):
+    store = ExperimentStore(":memory:")
+    store.save_fit(experiments, fit_result(1e-4))
+    samples = samples_from_store(store)
+    store.close()
+    assert [sample.experiment.sample_name for sample in samples] == [e.sample_name for e in experiments]
+    assert samples[0].params == fit_result(1e-4).model_params
+    assert samples[0].calculate_table.rows[-1].estimated_conductivity > samples[0].calculate_table.rows[0].thermal_conductivity
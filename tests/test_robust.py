@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from internal.calculator import get_solver_config, minimize_solver, table_fit_results
+from internal.converter import experiment_converter
+from internal.robust import reject_outliers, robust_minimize_solver
+
+# Measurements of the first experiment that get a large error
+OUTLIERS = [7, 15, 28]
+
+
+@pytest.fixture
+def solver_config():
+    return get_solver_config('balanced', disp=False, seed=0, maxiter=40)
+
+
+@pytest.fixture
+def outlying_experiments(experiments):
+    for index in OUTLIERS:
+        experiments[0].measurements[index].thermal_conductivity += 2e-3
+    return experiments
+
+
+def fit(fitter, experiments, solver_config):
+    tables = [experiment_converter(experiment) for experiment in experiments]
+    return tables, fitter(*tables, *(experiment.temperature for experiment in experiments), solver_config=solver_config)
+
+
+def test_reject_outliers():
+    residuals = np.random.default_rng(0).normal(0.0, 1e-5, 50)
+    residuals[[3, 20]] += 1e-3
+    anchors = np.zeros(50, dtype=bool)
+    anchors[[0, 25]] = True
+    residuals[0] = 1.0  # anchors are never rejected
+    assert np.flatnonzero(~reject_outliers(residuals, anchors)).tolist() == [3, 20]
+    # at most max_rejected_fraction of the measurements, the worst first
+    assert np.flatnonzero(~reject_outliers(residuals, anchors, max_rejected_fraction=0.02)).tolist() == [3]
+
+
+def test_robust_fit_rejects_outliers_and_recovers_true_params(outlying_experiments, solver_config):
+    _, robust_fit = fit(robust_minimize_solver, outlying_experiments, solver_config)
+    _, plain = fit(minimize_solver, outlying_experiments, solver_config)
+
+    rejected = robust_fit.optimized_params.manifest.rejected_points
+    assert set(OUTLIERS) <= set(rejected)
+    assert robust_fit.n_rejected == len(rejected) <= len(OUTLIERS) + 2  # plus the odd noisy point at most
+    assert not robust_fit.keep[0][OUTLIERS].any()
+    true_lamda_gas, true_e_dash, true_k_0 = 0.004, 33000.0, 0.1
+    params = robust_fit.optimized_params.model_params
+    assert params.lamda_gas == pytest.approx(true_lamda_gas, rel=0.05)
+    assert abs(params.lamda_gas - true_lamda_gas) < abs(plain.model_params.lamda_gas - true_lamda_gas)
+
+
+def test_fit_results_exclude_rejected_points(outlying_experiments, solver_config):
+    tables, robust_fit = fit(robust_minimize_solver, outlying_experiments, solver_config)
+    temperatures = [experiment.temperature for experiment in outlying_experiments]
+    optimized_params = robust_fit.optimized_params
+    results = table_fit_results(tables, temperatures, optimized_params.model_params,
+                                rejected_points=optimized_params.manifest.rejected_points)
+    all_points = table_fit_results(tables, temperatures, optimized_params.model_params)
+
+    assert results.n_points.tolist() == [40, 40]
+    assert results.n_rejected.tolist() == [int(np.sum(~keep)) for keep in robust_fit.keep]
+    assert results.sample(0)['n_rejected'] >= len(OUTLIERS)
+    assert results.rmse[0] < all_points.rmse[0] / 5
+    assert results.score == pytest.approx(optimized_params.manifest.score, rel=1e-9)
@@ -0,0 +1,106 @@
+import time
+from dataclasses import replace
+
+import pytest
+
+from internal.calculator import FitCancelledError, ModelParams, get_solver_config, pack_tables, solve_packed
+from internal.converter import experiment_converter
+from internal.scheduler import BATCH, INTERACTIVE, FitBudgetExceededError, FitScheduler, schedule_table_fit
+
+
+def sleep_job(seconds: float, stop_check):
+    # Polls stop_check like an objective evaluation would
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        stop_check()
+        time.sleep(0.01)
+    return seconds
+
+
+def busy_job(stop_check):
+    while True:
+        stop_check()
+        sum(range(10000))
+
+
+@pytest.fixture
+def make_scheduler():
+    schedulers = []
+
+    def make(**kwargs):
+        schedulers.append(FitScheduler(**kwargs))
+        return schedulers[-1]
+
+    yield make
+    for scheduler in schedulers:
+        scheduler.shutdown()
+
+
+def test_per_session_limit(make_scheduler):
+    scheduler = make_scheduler(max_workers=2, per_session_limit=1)
+    first = scheduler.submit("a", sleep_job, 0.3, supersede=False)
+    second = scheduler.submit("a", sleep_job, 0.0, supersede=False)
+    other = scheduler.submit("b", sleep_job, 0.0)
+    # the second job of session a waits although a worker is free for session b
+    assert (first.status, second.status, other.status) == ("running", "queued", "running")
+    assert [job.result(timeout=10) for job in (first, second, other)] == [0.3, 0.0, 0.0]
+    assert second.started_at >= first.finished_at
+    assert scheduler.metrics()['counts'] == {'submitted': 3, 'done': 3}
+
+
+def test_new_submission_supersedes_the_session(make_scheduler):
+    scheduler = make_scheduler(max_workers=1, per_session_limit=1)
+    running = scheduler.submit("a", sleep_job, 30.0)
+    queued = scheduler.submit("b", sleep_job, 0.0)
+    assert queued.status == "queued"
+    time.sleep(0.2)
+    latest = scheduler.submit("a", sleep_job, 0.0)
+    with pytest.raises(FitCancelledError):
+        running.result(timeout=10)
+    assert queued.result(timeout=10) == 0.0
+    assert latest.result(timeout=10) == 0.0
+    assert running.status == "cancelled"
+
+    waiting = scheduler.submit("c", sleep_job, 30.0)
+    dropped = scheduler.submit("d", sleep_job, 0.0)
+    scheduler.cancel_session("d")
+    with pytest.raises(FitCancelledError, match="before it started"):
+        dropped.result(timeout=1)
+    scheduler.cancel(waiting)
+    with pytest.raises(FitCancelledError):
+        waiting.result(timeout=10)
+
+
+def test_cpu_budget(make_scheduler):
+    scheduler = make_scheduler(max_workers=1, cpu_budget_sec=0.2)
+    job = scheduler.submit("a", busy_job)
+    with pytest.raises(FitBudgetExceededError):
+        job.result(timeout=10)
+    metrics = scheduler.metrics()
+    assert job.status == "failed" and metrics['counts']['failed'] == 1
+    assert metrics['cpu_sec_by_session']['a'] >= 0.2
+
+
+def test_interactive_jobs_start_before_batch_jobs(make_scheduler):
+    scheduler = make_scheduler(max_workers=1, per_session_limit=1)
+    blocker = scheduler.submit("blocker", sleep_job, 0.3)
+    batch = scheduler.submit("batch", sleep_job, 0.0, priority=BATCH)
+    interactive = scheduler.submit("interactive", sleep_job, 0.0, priority=INTERACTIVE)
+    assert scheduler.metrics()['queued_by_priority'] == {'batch': 1, 'interactive': 1}
+    for job in (blocker, batch, interactive):
+        job.result(timeout=10)
+    assert interactive.started_at < batch.started_at
+
+
+def test_schedule_table_fit_matches_solve_packed(make_scheduler, experiments):
+    scheduler = make_scheduler(max_workers=1)
+    solver_config = get_solver_config("fast", seed=5, maxiter=20, disp=False)
+    tables = [experiment_converter(experiment) for experiment in experiments]
+    temperatures = [experiment.temperature for experiment in experiments]
+    optimized_params, keep_masks = schedule_table_fit(scheduler, "a", tables, temperatures, solver_config)
+
+    packed, normalizer_sec = pack_tables(tables, temperatures)
+    solver_params, manifest = solve_packed(packed, normalizer_sec, replace(solver_config, workers=1))
+    assert keep_masks is None
+    assert optimized_params.manifest.score == manifest.score
+    assert optimized_params.model_params == ModelParams.from_solver(solver_params, solver_config.digit_conf)
@@ -0,0 +1,118 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+
+from internal.experiment import experiment_to_dict
+from internal.service import FitService, LocalClient
+
+
+@pytest.fixture
+def service():
+    # Fits run in a thread instead of a process pool, so the test does not spawn workers
+    service = FitService(max_workers=1, max_queue=2, executor=ThreadPoolExecutor(max_workers=1))
+    yield service
+    service.shutdown()
+
+
+def payload(experiments, seed: int = 0) -> dict:
+    return {'experiments': [experiment_to_dict(experiment) for experiment in experiments],
+            'preset': 'fast', 'seed': seed}
+
+
+def test_fit_request(service, experiments):
+    async def scenario():
+        client = LocalClient(service)
+        status, job = await client.post("/fits", payload(experiments))
+        assert status == HTTPStatus.ACCEPTED
+        await service.wait(job['job_id'])
+        return await client.get(f"/fits/{job['job_id']}")
+
+    status, job = asyncio.run(scenario())
+    assert status == HTTPStatus.OK
+    assert job['status'] == "done", job['error']
+    assert job['result']['lamda_gas'] == pytest.approx(0.004, rel=0.1)
+    assert [len(values) for values in job['result']['estimated_conductivity']] == [40, 40]
+    assert job['result']['manifest']['solver_config']['seed'] == 0
+
+
+def test_identical_requests_are_coalesced(service, experiments):
+    async def scenario():
+        client = LocalClient(service)
+        first = await client.post("/fits", payload(experiments))
+        second = await client.post("/fits", payload(experiments))
+        await service.wait(first[1]['job_id'])
+        # a finished job answers repeated requests at once
+        third = await client.post("/fits", payload(experiments))
+        return first, second, third
+
+    (status_1, job_1), (status_2, job_2), (status_3, job_3) = asyncio.run(scenario())
+    assert status_1 == status_2 == HTTPStatus.ACCEPTED
+    assert job_1['job_id'] == job_2['job_id'] == job_3['job_id']
+    assert job_2['n_requests'] == 2
+    assert status_3 == HTTPStatus.OK
+    assert job_3['n_requests'] == 3
+    assert job_3['status'] == "done"
+
+
+def test_full_queue_is_rejected(service, experiments):
+    async def scenario():
+        client = LocalClient(service)
+        # the jobs cannot start before the scenario yields to the event loop
+        responses = [await client.post("/fits", payload(experiments, seed=seed)) for seed in range(3)]
+        health = await client.get("/health")
+        for _, job in responses[:2]:
+            await service.wait(job['job_id'])
+        return responses, health, await client.post("/fits", payload(experiments, seed=2))
+
+    responses, health, retry = asyncio.run(scenario())
+    assert [status for status, _ in responses] == [HTTPStatus.ACCEPTED] * 2 + [HTTPStatus.TOO_MANY_REQUESTS]
+    assert "unfinished" in responses[2][1]['error']
+    assert health == (HTTPStatus.OK, {'unfinished': 2, 'max_queue': 2})
+    assert retry[0] == HTTPStatus.ACCEPTED
+
+
+@pytest.mark.parametrize("body", [
+    b"{not json",
+    b"[]",
+    b'{"experiments": []}',
+    b'{"experiments": [{}, {}]}',
+])
+def test_malformed_payload_is_a_bad_request(service, body):
+    status, response = asyncio.run(service.handle("POST", "/fits", body))
+    assert status == HTTPStatus.BAD_REQUEST
+    assert response['error']
+
+
+@pytest.mark.parametrize("field, value", [("seed", "abc"), ("preset", "unknown")])
+def test_invalid_settings_are_a_bad_request(service, experiments, field, value):
+    status, response = asyncio.run(LocalClient(service).post("/fits", {**payload(experiments), field: value}))
+    assert status == HTTPStatus.BAD_REQUEST
+    assert response['error']
+
+
+def test_unknown_routes_and_jobs(service):
+    client = LocalClient(service)
+    assert asyncio.run(client.get("/fits/unknown"))[0] == HTTPStatus.NOT_FOUND
+    assert asyncio.run(client.get("/other"))[0] == HTTPStatus.NOT_FOUND
+
+
+def test_requests_are_fitted_and_keyed_on_the_cleaned_measurements(service, experiments):
+    clean = payload(experiments)
+    messy = payload(experiments)
+    measurements = messy['experiments'][0]['measurements']
+    # unsorted, with a duplicate row
+    messy['experiments'][0]['measurements'] = measurements[::-1] + measurements[:1]
+
+    async def scenario():
+        client = LocalClient(service)
+        status, job = await client.post("/fits", messy)
+        assert status == HTTPStatus.ACCEPTED, job
+        await service.wait(job['job_id'])
+        return job, await client.post("/fits", clean)
+
+    job, (status, clean_job) = asyncio.run(scenario())
+    assert status == HTTPStatus.OK
+    assert clean_job['job_id'] == job['job_id']
+    assert clean_job['status'] == "done", clean_job['error']
@@ -0,0 +1,61 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from internal import shared
+from internal.calculator import get_solver_config, solve_packed
+from internal.parallel import fit_series_jobs
+from internal.shared import SharedSeries, attach_series, detach_all, detach_series
+
+
+def assert_same_series(actual, expected):
+    for name in ('elapsed_sec', 'thermal_conductivity', 'offsets', 'temperatures'):
+        np.testing.assert_array_equal(getattr(actual, name), getattr(expected, name))
+
+
+def test_attach_maps_the_shared_block(packed):
+    packed_series, _ = packed
+    with SharedSeries(packed_series) as shared_series:
+        handle = pickle.loads(pickle.dumps(shared_series.handle))
+        attached = attach_series(handle)
+        assert_same_series(attached, packed_series)
+        assert attach_series(handle) is attached
+        assert not attached.elapsed_sec.flags.writeable
+        assert_same_series(attached.subset(1, 2), packed_series.subset(1, 2))
+        del attached
+        detach_series(handle)
+        assert handle.name not in shared._attached
+
+
+def test_detach_all_releases_every_mapping(packed):
+    packed_series, _ = packed
+    with SharedSeries(packed_series) as first, SharedSeries(packed_series.subset(0, 1)) as second:
+        attach_series(first.handle)
+        attach_series(second.handle)
+        detach_all()
+        assert shared._attached == {}
+
+
+def test_parallel_jobs_match_serial_fits(packed):
+    packed_series, normalizer_sec = packed
+    solver_config = get_solver_config('fast', disp=False, seed=3)
+    series = [
+        (packed_series.elapsed_sec[start:stop], packed_series.thermal_conductivity[start:stop], temperature)
+        for start, stop, temperature in zip(packed_series.offsets[:-1], packed_series.offsets[1:],
+                                            packed_series.temperatures)
+    ]
+    results = fit_series_jobs([series, series[::-1]], solver_config, max_workers=2)
+
+    expected, manifest = solve_packed(packed_series, normalizer_sec, solver_config)
+    np.testing.assert_array_equal(results[0][0], expected)
+    assert results[0][1].score == manifest.score
+    assert results[1][1].input_hash != manifest.input_hash
+
+
+def test_population_workers_match_vectorized_fit(packed):
+    packed_series, normalizer_sec = packed
+    _, manifest = solve_packed(packed_series, normalizer_sec, get_solver_config('fast', disp=False))
+    _, parallel_manifest = solve_packed(packed_series, normalizer_sec,
+                                        get_solver_config('fast', disp=False, workers=2))
+    assert parallel_manifest.score == pytest.approx(manifest.score, rel=1e-9)
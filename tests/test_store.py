@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import pytest
+
+from internal.calculator import OptimizeParam, SolverConfig
+from internal.experiment import write_interface
+from internal.manifest import FitManifest
+from internal.store import ExperimentStore
+
+
+@pytest.fixture
+def store():
+    store = ExperimentStore(":memory:")
+    yield store
+    store.close()
+
+
+def fit_result(score: float, input_hash: str = "hash") -> OptimizeParam:
+    solver_config = SolverConfig()
+    solver_params = [40.0, 330.0, 100.0]
+    manifest = FitManifest(input_hash=input_hash, solver_config=solver_config.to_dict(), library_versions={},
+                           n_evaluations=1, wall_time_sec=0.0, solver_params=solver_params, score=score)
+    return OptimizeParam.from_solver(solver_params, solver_config.digit_conf, manifest=manifest)
+
+
+def test_experiment_round_trip(store, experiments):
+    experiment_id = store.save_experiment(experiments[0])
+    loaded = store.get_experiment(experiment_id)
+    assert loaded == experiments[0]
+    with pytest.raises(KeyError):
+        store.get_experiment("missing")
+
+
+def test_save_experiment_replaces_measurements(store, experiments):
+    experiment = experiments[0]
+    experiment_id = store.save_experiment(experiment)
+    del experiment.measurements[5:]
+    assert store.save_experiment(experiment) == experiment_id
+    assert len(store.get_experiment(experiment_id).measurements) == 5
+
+
+def test_query_experiments(store, make_experiment):
+    experiments = [make_experiment(23.0, sample_name="A"), make_experiment(70.0, sample_name="A"),
+                   make_experiment(70.0, sample_name="B")]
+    for experiment in experiments:
+        store.save_experiment(experiment)
+
+    assert {experiment.sample_name for experiment in store.query_experiments(temperature=70.0)} \
+        == {"A 70°C", "B 70°C"}
+    assert [experiment.temperature for experiment in store.query_experiments(sample_name="A 70°C", temperature=70.02)] \
+        == [70.0]
+    assert store.query_experiments(date_from=datetime(2100, 1, 1)) == []
+    pages = [store.query_experiments(limit=2, offset=offset) for offset in (0, 2)]
+    assert [len(page) for page in pages] == [2, 1]
+    assert len({experiment.id for page in pages for experiment in page}) == 3
+
+
+def test_query_fits(store, experiments):
+    first = store.save_fit(experiments, fit_result(2e-4), preset="fast")
+    second = store.save_fit(experiments, fit_result(1e-4, input_hash="other"), preset="balanced")
+    experiment_ids = [experiment.id for experiment in experiments]
+
+    by_score = store.query_fits(temperature=70.0, order_by="score")
+    assert [fit.id for fit in by_score] == [second, first]
+    assert by_score[0].experiment_ids == experiment_ids
+    assert by_score[0].manifest["score"] == 1e-4
+    assert by_score[0].preset == "balanced"
+    assert [fit.id for fit in store.query_fits(max_score=1.5e-4)] == [second]
+    assert [fit.id for fit in store.query_fits(input_hash="hash")] == [first]
+    assert store.query_fits(sample_name="other") == []
+    with pytest.raises(ValueError):
+        store.query_fits(order_by="lamda_gas")
+
+
+def test_save_fit_stores_experiments_with_unknown_ids(store, experiments):
+    # Experiments read from JSON files carry an id that is not in the store yet
+    for experiment, experiment_id in zip(experiments, ("json-a", "json-b")):
+        experiment.id = experiment_id
+    fit_id = store.save_fit(experiments, fit_result(1e-4))
+    assert store.query_fits()[0].id == fit_id
+    assert store.query_fits()[0].experiment_ids == ["json-a", "json-b"]
+    assert store.get_experiment("json-b").temperature == 70.0
+
+
+def test_import_json_files(store, experiments, tmp_path):
+    file_paths = []
+    for index, experiment in enumerate(experiments):
+        file_paths.append(tmp_path / f"experiment_{index}.json")
+        write_interface(experiment, file_paths[-1])
+    experiment_ids = store.import_json_files(file_paths)
+    assert len(experiment_ids) == 2
+    assert [store.get_experiment(experiment_id).temperature for experiment_id in experiment_ids] == [23.0, 70.0]
+
+
+def test_save_fit_keeps_stored_experiments_of_earlier_fits(store, experiments):
+    stored_ids = [store.save_experiment(experiment) for experiment in experiments]
+    first = store.save_fit(experiments, fit_result(2e-4))
+    assert [experiment.id for experiment in experiments] == stored_ids
+
+    # The first experiment is edited after loading it from the store and fitted again
+    edited = store.get_experiment(stored_ids[0])
+    edited.measurements[3].thermal_conductivity += 1e-3
+    second = store.save_fit([edited, store.get_experiment(stored_ids[1])], fit_result(1e-4))
+
+    records = {fit.id: fit for fit in store.query_fits()}
+    assert records[first].experiment_ids == stored_ids
+    assert records[second].experiment_ids == [edited.id, stored_ids[1]]
+    assert edited.id not in stored_ids
+    assert store.get_experiment(stored_ids[0]) == experiments[0]
+    assert store.get_experiment(edited.id).measurements[3].thermal_conductivity \
+        == edited.measurements[3].thermal_conductivity
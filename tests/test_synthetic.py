@@ -0,0 +1,40 @@
+import numpy as np
+
+from internal.calculator import estimate_thermal_conductivity
+from internal.synthetic import generate_experiment, generate_experiments, true_params
+
+
+def test_generate_experiment_follows_the_model():
+    params = true_params()
+    experiment = generate_experiment(params, 70.0, n_points=30, duration_days=200)
+    elapsed_sec = np.array([m.elapsed_days for m in experiment.measurements], dtype=np.float64) * 86400
+    expected = estimate_thermal_conductivity(e_dash=params.e_dash, experiment_temperature=70.0,
+                                             measurement_time_sec=elapsed_sec, lamda_gas=params.lamda_gas,
+                                             initial_thermal_conductivity=0.022, k_0=params.k_0)
+    np.testing.assert_array_equal([m.thermal_conductivity for m in experiment.measurements], expected)
+    assert experiment.measurements[-1].elapsed_days == 200
+
+
+def test_generate_experiment_noise_keeps_the_first_point():
+    experiment = generate_experiment(true_params(), 23.0, noise_std=1e-4, rng=np.random.default_rng(0))
+    assert experiment.measurements[0].thermal_conductivity == 0.022
+
+
+def test_generate_experiments_is_reproducible():
+    first, second = (generate_experiments(true_params(), (23.0, 50.0, 70.0), seed=7, noise_std=5e-5,
+                                          jitter_days=3.0) for _ in range(2))
+    assert [experiment.sample_name for experiment in first] == ["synthetic 23°C", "synthetic 50°C", "synthetic 70°C"]
+    assert first == second
+    assert first != generate_experiments(true_params(), (23.0, 50.0, 70.0), seed=8, noise_std=5e-5,
+                                         jitter_days=3.0)
+
+
+def test_outlier_fraction():
+    params = true_params()
+    clean, = generate_experiments(params, (23.0,), seed=1, n_points=41)
+    noisy, = generate_experiments(params, (23.0,), seed=1, n_points=41, outlier_fraction=0.1, outlier_std=1e-2)
+    changed = [a.thermal_conductivity != b.thermal_conductivity
+               for a, b in zip(clean.measurements, noisy.measurements)]
+    assert sum(changed) == 4 and not changed[0]
+    assert max(abs(a.thermal_conductivity - b.thermal_conductivity)
+               for a, b in zip(clean.measurements, noisy.measurements)) > 1e-3
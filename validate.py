@@ -0,0 +1,82 @@
+"""
+Validate the fitted model on held-out data.
+
+Usage:
+    python validate.py holdout sample1.json sample2.json --cutoffs 90 180 365
+    python validate.py temperatures a_23C.json a_50C.json a_70C.json
+
+``holdout`` fits on the measurements up to each cutoff and reports the forecast error of the later
+measurements per horizon. ``temperatures`` fits without each temperature in turn and reports the
+error on the left-out series. The folds run in parallel processes (``--jobs``).
+"""
+import argparse
+import sys
+
+from internal.calculator import DEFAULT_SOLVER_PRESET, SOLVER_PRESETS, get_solver_config
+from internal.cleaning import MeasurementValidationError, clean_experiment
+from internal.cli import print_table
+from internal.converter import experiment_converter
+from internal.crossval import (DEFAULT_HORIZONS_DAYS, leave_one_temperature_out, minimum_training_days,
+                               time_holdout)
+from internal.experiment import read_interface
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["holdout", "temperatures"])
+    parser.add_argument("experiments", nargs="+", help="experiment JSON files (write_interface format)")
+    parser.add_argument("--preset", choices=list(SOLVER_PRESETS), default=DEFAULT_SOLVER_PRESET,
+                        help="solver preset (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=None, help="override the solver seed")
+    parser.add_argument("--jobs", type=int, default=None, help="parallel processes (default: CPU count)")
+    parser.add_argument("--cutoffs", type=float, nargs="+", default=[90, 180, 365],
+                        help="training cutoffs [days] (holdout)")
+    parser.add_argument("--horizons", type=float, nargs="+", default=list(DEFAULT_HORIZONS_DAYS),
+                        help="forecast horizons [days] (holdout)")
+    parser.add_argument("--max-rmse", type=float, default=None,
+                        help="report the shortest cutoff whose RMSE stays below this at every horizon")
+    args = parser.parse_args(argv)
+
+    overrides = {'disp': False}
+    if args.seed is not None:
+        overrides['seed'] = args.seed
+    solver_config = get_solver_config(args.preset, **overrides)
+
+    series = []
+    for path in args.experiments:
+        try:
+            experiment, _ = clean_experiment(read_interface(path), label=path)
+        except MeasurementValidationError as e:
+            parser.error(str(e))
+        series.append((*experiment_converter(experiment).as_arrays(), experiment.temperature))
+
+    if args.command == "holdout":
+        try:
+            results = time_holdout(series, args.cutoffs, solver_config, horizons_days=args.horizons,
+                                   max_workers=args.jobs)
+        except ValueError as e:
+            parser.error(str(e))
+        print_table([
+            {'cutoff_days': result.cutoff_days, 'horizon_days': horizon.horizon_days,
+             'n_points': horizon.n_points, 'mae': horizon.mae, 'rmse': horizon.rmse,
+             'lconv_change': result.lconv_change}
+            for result in results for horizon in result.horizons
+        ])
+        if args.max_rmse is not None:
+            print(f"\nminimum training period: {minimum_training_days(results, args.max_rmse)} days")
+    else:
+        try:
+            results = leave_one_temperature_out(series, solver_config, max_workers=args.jobs)
+        except ValueError as e:
+            parser.error(str(e))
+        print_table([
+            {'temperature': result.temperature, 'n_train': result.n_train, 'n_test': result.n_test,
+             'mae': result.mae, 'rmse': result.rmse, 'lamda_gas': result.params.lamda_gas,
+             'e_dash': result.params.e_dash, 'k_0': result.params.k_0}
+            for result in results
+        ])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())